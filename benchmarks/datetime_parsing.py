@@ -0,0 +1,80 @@
+"""
+Compares :func:`emma.model.parse_datetime` and
+:func:`emma.model.parse_datetime_column` with :func:`datetime.strptime`,
+checking first that every parser gives the same results.
+
+Run from the repository root::
+
+    python -m benchmarks.datetime_parsing [count]
+
+On CPython 2.7.18 (64-bit), for 100000 values::
+
+    @D: format, all distinct
+      strptime:                8.02 us/value
+      parse_datetime:          3.00 us/value (2.7x)
+      parse_datetime_column:   2.23 us/value (3.6x)
+    @D: format, 1% distinct
+      parse_datetime_column:   0.10 us/value (76.8x)
+    alternate format, all distinct
+      strptime:                8.97 us/value
+      parse_datetime:          3.71 us/value (2.4x)
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from emma.model import (SERIALIZED_DATETIME_FORMAT,
+                        SERIALIZED_DATETIME_ALT_FORMAT, parse_datetime,
+                        parse_datetime_column)
+
+
+def column(count, date_format, distinct):
+    """A page's worth of date strings with ``distinct`` different values"""
+    start = datetime(2010, 1, 1)
+    values = [(start + timedelta(seconds=random.randint(0, 10 ** 8),
+                                 microseconds=random.randint(1, 999999)))
+              .strftime(date_format) for _ in xrange(distinct)]
+    return [random.choice(values) for _ in xrange(count)]
+
+
+def timed(func, *args):
+    """Seconds taken by one call"""
+    started = time.time()
+    func(*args)
+    return time.time() - started
+
+
+def compare(name, values, date_format):
+    expected = [datetime.strptime(x, date_format) for x in values]
+    assert [parse_datetime(x, date_format) for x in values] == expected
+    assert parse_datetime_column(values, date_format) == expected
+
+    baseline = timed(lambda: [datetime.strptime(x, date_format)
+                              for x in values])
+    fast = timed(lambda: [parse_datetime(x, date_format) for x in values])
+    batch = timed(parse_datetime_column, values, date_format)
+    per_value = 10 ** 6 / float(len(values))
+    print "%s (%d values)" % (name, len(values))
+    print "  strptime:              %6.2f us/value" % (baseline * per_value)
+    print "  parse_datetime:        %6.2f us/value (%.1fx)" % (
+        fast * per_value, baseline / fast)
+    print "  parse_datetime_column: %6.2f us/value (%.1fx)" % (
+        batch * per_value, baseline / batch)
+
+
+def main(count=100000):
+    random.seed(0)
+    compare("@D: format, all distinct",
+            column(count, SERIALIZED_DATETIME_FORMAT, count),
+            SERIALIZED_DATETIME_FORMAT)
+    compare("@D: format, 1% distinct",
+            column(count, SERIALIZED_DATETIME_FORMAT, count // 100),
+            SERIALIZED_DATETIME_FORMAT)
+    compare("alternate format, all distinct",
+            column(count, SERIALIZED_DATETIME_ALT_FORMAT, count),
+            SERIALIZED_DATETIME_ALT_FORMAT)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
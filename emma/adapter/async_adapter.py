@@ -0,0 +1,105 @@
+"""Adapter which sends requests concurrently, returning pending results"""
+
+from multiprocessing.pool import ThreadPool
+from emma.adapter import AbstractAdapter
+from emma.adapter.requests_adapter import RequestsAdapter
+
+
+def gather(pending, timeout=None):
+    """
+    Waits for a set of pending results, returning their values in order
+
+    :param pending: The pending results to wait for
+    :type pending: :class:`list` of :class:`AsyncResult`
+    :param timeout: Seconds to wait for each result
+    :type timeout: :class:`float`
+    :rtype: :class:`list`
+
+    Usage::
+
+        >>> from emma.adapter.async_adapter import gather
+        >>> gather([adptr.get('/members/200'), adptr.get('/members/201')])
+        [{...}, {...}]
+    """
+    return [x.get(timeout) for x in pending]
+
+
+class AsyncAdapter(AbstractAdapter):
+    """
+    Emma API Adapter whose verbs return immediately with a pending result
+    (:class:`multiprocessing.pool.AsyncResult`) instead of blocking
+
+    Requests run on a bounded pool of worker threads over the pooled
+    connections of a blocking adapter, so no more than ``concurrency``
+    requests are ever in flight however many are submitted.
+
+    :param auth: A dictionary with keys for your account id and public/private
+                 keys
+    :type auth: :class:`dict`
+    :param concurrency: The maximum number of requests in flight
+    :type concurrency: :class:`int`
+    :param adapter_options: Extra keyword arguments for the blocking adapter
+    :type adapter_options: :class:`dict`
+
+    Usage::
+
+        >>> from emma.adapter.async_adapter import AsyncAdapter, gather
+        >>> adptr = AsyncAdapter({
+        ...     "account_id": "1234",
+        ...     "public_key": "08192a3b4c5d6e7f",
+        ...     "private_key": "f7e6d5c4b3a29180"}, concurrency=20)
+        >>> pending = [adptr.get('/members/%s' % x) for x in range(200, 300)]
+        >>> gather(pending)
+        [{...}, {...}, ...]
+    """
+    CONCURRENCY = 10
+    blocking_adapter = RequestsAdapter
+
+    def __init__(self, auth, concurrency=None, **adapter_options):
+        self.concurrency = concurrency or self.CONCURRENCY
+        adapter_options.setdefault('pool_maxsize', self.concurrency)
+        self.adapter = self.__class__.blocking_adapter(auth, **adapter_options)
+        self.pool = ThreadPool(self.concurrency)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Runs any blocking call on the worker pool
+
+        :param func: The function to run
+        :type func: :class:`function`
+        :rtype: :class:`AsyncResult`
+        """
+        return self.pool.apply_async(func, args, kwargs)
+
+    def post(self, path, data=None):
+        """HTTP POST, see :meth:`RequestsAdapter.post`"""
+        return self.submit(self.adapter.post, path, data)
+
+    def get(self, path, params=None, context=None):
+        """HTTP GET, see :meth:`RequestsAdapter.get`"""
+        return self.submit(self.adapter.get, path, params, context)
+
+    def put(self, path, data=None):
+        """HTTP PUT, see :meth:`RequestsAdapter.put`"""
+        return self.submit(self.adapter.put, path, data)
+
+    def delete(self, path, params=None):
+        """HTTP DELETE, see :meth:`RequestsAdapter.delete`"""
+        return self.submit(self.adapter.delete, path, params)
+
+    def paginated_get(self, path, params=None, workers=None):
+        """Collects every page of a listing, see :meth:`paginated_get`"""
+        return self.submit(self.adapter.paginated_get, path, params, workers)
+
+    def iter_paginated(self, path, params=None, start=0):
+        """
+        Yields every item of a listing. Iteration blocks page by page in the
+        calling thread, just as it does for the blocking adapter.
+        """
+        return self.adapter.iter_paginated(path, params, start)
+
+    def close(self):
+        """Waits for requests in flight, then releases the workers"""
+        self.pool.close()
+        self.pool.join()
+        self.adapter.close()
@@ -0,0 +1,276 @@
+"""Response caches for GET requests"""
+
+import collections
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+
+def cache_key(url, params=None):
+    """
+    Identifies a GET request by its full URL and (order-independent) params,
+    including any pagination window already merged into them
+
+    :param url: The URL requested
+    :type url: :class:`str`
+    :param params: The HTTP parameters sent
+    :type params: :class:`dict`
+    :rtype: :class:`str`
+    """
+    return "%s?%s" % (url, json.dumps(params or {}, sort_keys=True))
+
+
+def resources(path):
+    """
+    The named (non-numeric) segments of a path. A write to a path may change
+    any listing rooted at one of them: ``PUT /members/200/groups`` affects
+    both ``/members`` and ``/groups``.
+
+    :param path: The path portion of a URL
+    :type path: :class:`str`
+    :rtype: :class:`set` of :class:`str`
+    """
+    return set(x for x in path.strip('/').split('/') if x and not x.isdigit())
+
+
+# The resources whose listings include (or are filtered by) another's
+# objects, such as ``/groups/N/members`` for members
+LISTED_UNDER = {
+    'members': ('groups', 'mailings', 'searches'),
+    'groups': ('members', 'mailings'),
+    'mailings': ('members',),
+    'searches': ('mailings',),
+    'fields': ('members',),
+}
+
+
+def affected(path):
+    """
+    The resources whose cached listings a write to a path may change: those
+    it names, and those listing their objects. ``POST /members`` affects
+    ``/members`` and also ``/groups/N/members``, ``/mailings/N/members`` and
+    ``/searches/N/members``.
+
+    :param path: The path portion of a URL
+    :type path: :class:`str`
+    :rtype: :class:`set` of :class:`str`
+    """
+    names = resources(path)
+    for name in list(names):
+        names.update(LISTED_UNDER.get(name, ()))
+    return names
+
+
+def resource(path):
+    """
+    The top-level resource a path belongs to
+
+    :param path: The path portion of a URL
+    :type path: :class:`str`
+    :rtype: :class:`str`
+    """
+    return path.strip('/').split('/')[0]
+
+
+class CacheEntry(object):
+    """
+    A decoded response together with the validators needed to revalidate it
+
+    :param value: The decoded response
+    :type value: :class:`object`
+    :param etag: The response's ``ETag`` header
+    :type etag: :class:`str`
+    :param last_modified: The response's ``Last-Modified`` header
+    :type last_modified: :class:`str`
+    """
+    def __init__(self, value, etag=None, last_modified=None, stored=None):
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored = time.time() if stored is None else stored
+
+    def is_fresh(self, ttl, now=None):
+        """
+        Whether the entry may be served without asking the API
+
+        :param ttl: Seconds an entry stays fresh (``None`` never expires)
+        :type ttl: :class:`float`
+        :rtype: :class:`bool`
+        """
+        if ttl is None:
+            return True
+        return (time.time() if now is None else now) - self.stored < ttl
+
+    def conditional_headers(self):
+        """
+        Headers asking the API to answer 304 if the entry is still current
+
+        :rtype: :class:`dict`
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def refreshed(self):
+        """A copy of the entry, stored again as of now"""
+        return CacheEntry(self.value, self.etag, self.last_modified)
+
+
+class ResponseCache(object):
+    """
+    Stores :class:`CacheEntry` objects by key within groups, so that every
+    entry in a group can be dropped at once when its resource is written to
+
+    :param ttl: Seconds an entry is served without revalidation
+    :type ttl: :class:`float`
+    """
+    TTL = 60
+
+    def __init__(self, ttl=None):
+        self.ttl = self.TTL if ttl is None else ttl
+
+    def get(self, group, key):
+        """The stored :class:`CacheEntry`, fresh or stale, or :class:`None`"""
+        raise NotImplementedError()
+
+    def set(self, group, key, entry):
+        """Stores a :class:`CacheEntry`"""
+        raise NotImplementedError()
+
+    def invalidate(self, group):
+        """Drops every entry in a group"""
+        raise NotImplementedError()
+
+    def clear(self):
+        """Drops every entry"""
+        raise NotImplementedError()
+
+
+class MemoryCache(ResponseCache):
+    """
+    An in-process cache which drops the least recently used entries once it
+    holds ``max_entries``
+
+    :param ttl: Seconds an entry is served without revalidation
+    :type ttl: :class:`float`
+    :param max_entries: The most entries kept
+    :type max_entries: :class:`int`
+
+    Usage::
+
+        >>> from emma.adapter.cache import MemoryCache
+        >>> from emma.model.account import Account
+        >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180",
+        ...                cache=MemoryCache(ttl=300, max_entries=500))
+    """
+    MAX_ENTRIES = 1000
+
+    def __init__(self, ttl=None, max_entries=None):
+        super(MemoryCache, self).__init__(ttl)
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, group, key):
+        with self._lock:
+            entry = self._entries.pop((group, key), None)
+            if entry is not None:
+                self._entries[(group, key)] = entry
+            return entry
+
+    def set(self, group, key, entry):
+        with self._lock:
+            self._entries.pop((group, key), None)
+            self._entries[(group, key)] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, group):
+        with self._lock:
+            for x in [x for x in self._entries if x[0] == group]:
+                del self._entries[x]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCache(ResponseCache):
+    """
+    A cache kept on disk (one directory per group), so that entries survive
+    restarts and may be shared by several processes. Entries are stored as
+    JSON, so a file which is corrupt (or was planted) is treated as missing
+    rather than being run.
+
+    :param directory: Where to keep entries
+    :type directory: :class:`str`
+    :param ttl: Seconds an entry is served without revalidation
+    :type ttl: :class:`float`
+
+    Usage::
+
+        >>> from emma.adapter.cache import DiskCache
+        >>> from emma.model.account import Account
+        >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180",
+        ...                cache=DiskCache('/var/cache/emma', ttl=3600))
+    """
+    def __init__(self, directory, ttl=None):
+        super(DiskCache, self).__init__(ttl)
+        self.directory = directory
+
+    def _group_path(self, group):
+        """The directory holding a group's entries"""
+        name = re.sub(r'[^\w.-]+', '_', group)[-64:]
+        return os.path.join(
+            self.directory,
+            "%s-%s" % (name, hashlib.sha1(group).hexdigest()[:12]))
+
+    def _entry_path(self, group, key):
+        """The file holding an entry"""
+        return os.path.join(
+            self._group_path(group), hashlib.sha1(key).hexdigest())
+
+    def get(self, group, key):
+        try:
+            with open(self._entry_path(group, key), 'rb') as stored:
+                entry = json.load(stored)
+            return CacheEntry(
+                entry['value'], entry['etag'], entry['last_modified'],
+                float(entry['stored']))
+        except (IOError, OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def set(self, group, key, entry):
+        directory = self._group_path(group)
+        try:
+            os.makedirs(directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+        handle, temporary = tempfile.mkstemp(dir=directory)
+        with os.fdopen(handle, 'wb') as stored:
+            json.dump({'value': entry.value,
+                       'etag': entry.etag,
+                       'last_modified': entry.last_modified,
+                       'stored': entry.stored}, stored)
+        os.rename(temporary, self._entry_path(group, key))
+
+    def invalidate(self, group):
+        shutil.rmtree(self._group_path(group), ignore_errors=True)
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                shutil.rmtree(
+                    os.path.join(self.directory, name), ignore_errors=True)
@@ -0,0 +1,105 @@
+"""Client-side rate limiting for API requests"""
+
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    A thread-safe token bucket: tokens accrue at ``rate`` per second up to
+    ``capacity``, and each request spends one. Sustained throughput therefore
+    settles at ``rate`` while still allowing short bursts of ``capacity``.
+
+    A bucket may be shared by any number of adapters (and so accounts) to
+    limit their combined request rate.
+
+    :param rate: Tokens added per second
+    :type rate: :class:`float`
+    :param capacity: The most tokens the bucket holds (defaults to ``rate``,
+                     a one second burst, but never less than one token)
+    :type capacity: :class:`float`
+
+    Usage::
+
+        >>> from emma.adapter.ratelimit import TokenBucket
+        >>> bucket = TokenBucket(10)
+        >>> bucket.acquire()
+        True
+        >>> bucket.acquire(blocking=False) # returns at once either way
+        True
+        >>> bucket.wait_time() # seconds until a token is free
+        0.0
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(rate, 1))
+        self.tokens = self.capacity
+        self._lock = threading.Lock()
+        self._updated = self.clock()
+
+    def clock(self):
+        """The current time in seconds"""
+        return time.time()
+
+    def sleep(self, seconds):
+        """Waits for tokens to accrue"""
+        time.sleep(seconds)
+
+    def _refill(self, now):
+        """Adds the tokens accrued since the last update"""
+        elapsed = max(0.0, now - self._updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self._updated = now
+
+    def _check(self, tokens):
+        """Refuses a request the bucket could never satisfy"""
+        if tokens > self.capacity:
+            raise ValueError("%s tokens exceed the bucket's capacity of %s"
+                             % (tokens, self.capacity))
+
+    def wait_time(self, tokens=1):
+        """
+        Seconds until ``tokens`` could be acquired, without acquiring them.
+        Lets an event loop or scheduler wait without blocking a thread.
+
+        :param tokens: The number of tokens wanted
+        :type tokens: :class:`int`
+        :rtype: :class:`float`
+        :raises: :class:`ValueError` if the bucket can never hold ``tokens``
+        """
+        self._check(tokens)
+        with self._lock:
+            self._refill(self.clock())
+            return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def acquire(self, tokens=1, blocking=True, timeout=None):
+        """
+        Takes ``tokens`` from the bucket
+
+        :param tokens: The number of tokens wanted
+        :type tokens: :class:`int`
+        :param blocking: Wait for tokens to accrue if there are too few now;
+                         otherwise return :class:`False` straight away
+        :type blocking: :class:`bool`
+        :param timeout: The most seconds to wait when blocking
+        :type timeout: :class:`float`
+        :rtype: :class:`bool`
+        :raises: :class:`ValueError` if the bucket can never hold ``tokens``
+        """
+        self._check(tokens)
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                # Tolerate rounding, or a sleep too short to move the clock
+                if self.tokens >= tokens - 1e-9:
+                    self.tokens = max(0.0, self.tokens - tokens)
+                    return True
+                wait = (tokens - self.tokens) / self.rate
+
+            if not blocking:
+                return False
+            if deadline is not None and now + wait > deadline:
+                return False
+            self.sleep(wait)
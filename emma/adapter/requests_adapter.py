@@ -1,12 +1,25 @@
 """Adapter for the Requests Library"""
 
+import copy
+from datetime import datetime
+import email.utils
 import json
+import threading
+import time
 import requests
+import requests.adapters
 import requests.auth
+import requests.exceptions
 from emma import exceptions as ex
-from emma.adapter import AbstractAdapter
+from emma.adapter import AbstractAdapter, RequestContext
+from emma.adapter.cache import CacheEntry, affected, cache_key, resource
+from emma.adapter.retry import RetryPolicy
 
 
+# What a request may raise when it fails: an error the API answered with,
+# or no answer at all
+REQUEST_ERRORS = (ex.ApiRequestFailed, requests.exceptions.RequestException)
+
 def process_response(response):
     """Takes a :class:`Response` and produces python built-ins"""
     if response.status_code == 400:
@@ -24,9 +37,33 @@ class RequestsAdapter(AbstractAdapter):
     Emma API Adapter for the `Requests Library
     <http://docs.python-requests.org/>`_
 
+    Every request is sent through a single :class:`requests.Session`, so
+    keep-alive connections to the API are pooled and reused by every
+    collection hanging off the same :class:`Account`.
+
     :param auth: A dictionary with keys for your account id and public/private
                  keys
     :type auth: :class:`dict`
+    :param pool_connections: The number of per-host connection pools to keep
+    :type pool_connections: :class:`int`
+    :param pool_maxsize: The maximum number of connections kept per host
+    :type pool_maxsize: :class:`int`
+    :param idle_timeout: Seconds after which idle connections are discarded
+                         rather than reused (``None`` never evicts)
+    :type idle_timeout: :class:`int`
+    :param retry: Decides which failed requests are sent again; each adapter
+                  gets its own :class:`RetryPolicy` (and budget) by default
+    :type retry: :class:`RetryPolicy`
+    :param rate_limit: Limits the request rate of this adapter alone
+    :type rate_limit: :class:`TokenBucket` or :class:`float`
+    :param cache: Serves repeated GETs locally, revalidating stale entries
+                  with conditional requests; writes drop the cached listings
+                  of every resource they touch and of those listing its
+                  objects (see :func:`emma.adapter.cache.affected`). Reports
+                  under ``/response`` and changes made outside this adapter
+                  (by the API itself, or another process) are only seen
+                  once entries go stale.
+    :type cache: :class:`ResponseCache`
 
     Usage::
 
@@ -39,17 +76,193 @@ class RequestsAdapter(AbstractAdapter):
         <RequestsAdapter>
 
     """
-    def __init__(self, auth):
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 10
+    IDLE_TIMEOUT = 60
+
+    def __init__(self, auth, pool_connections=None, pool_maxsize=None,
+                 idle_timeout=None, retry=None, rate_limit=None, cache=None):
         super(RequestsAdapter, self).__init__()
         self.auth = requests.auth.HTTPBasicAuth(
             auth['public_key'],
             auth['private_key'])
         self.url = "https://api.e2ma.net/%s" % auth['account_id']
+        self.pool_connections = pool_connections or self.POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or self.POOL_MAXSIZE
+        self.idle_timeout = (self.IDLE_TIMEOUT if idle_timeout is None
+                             else idle_timeout)
+        self.retry = retry or RetryPolicy()
+        self.set_rate_limit(rate_limit)
+        self.cache = cache
+
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        self.http = requests.adapters.HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize)
+        self.session.mount('https://', self.http)
+        self.session.mount('http://', self.http)
+
+        self._lock = threading.Lock()
+        self._last_used = time.time()
+        self._requests = 0
+        self._retired_connections = 0
+        self._clock_offset = None
+
+    def _live_pools(self):
+        """The connection pools currently held by the pool manager"""
+        pools = self.http.poolmanager.pools
+        return [pools[x] for x in pools.keys()]
+
+    def _evict_idle(self, now):
+        """Drop pooled connections that sat unused past the idle timeout"""
+        if self.idle_timeout and now - self._last_used > self.idle_timeout:
+            self._retired_connections += sum(
+                x.num_connections for x in self._live_pools())
+            self.http.close()
+
+    def _send(self, method, path, **kwargs):
+        """Send a single request through the pooled session"""
+        self.throttle()
+        with self._lock:
+            now = time.time()
+            self._evict_idle(now)
+            self._last_used = now
+            self._requests += 1
+
+        response = self.session.request(
+            method, self.url + "%s" % path, **kwargs)
+        date = response.headers.get('Date') if response.headers else None
+        parsed = email.utils.parsedate_tz(date) if date else None
+        if parsed is not None:
+            # The header is truncated to the second, so this errs early
+            self._clock_offset = email.utils.mktime_tz(parsed) - time.time()
+        return response
+
+    def server_time(self):
+        """
+        The API's current time, as a naive UTC :class:`datetime`, judged
+        from the ``Date`` header of the latest response. With no response
+        yet, the member count (the cheapest request) is asked for first.
+
+        :rtype: :class:`datetime`
+        """
+        if self._clock_offset is None:
+            self.get('/members', {}, RequestContext(count_only=True))
+        if self._clock_offset is None:
+            return None
+        return datetime.utcfromtimestamp(
+            int(time.time() + self._clock_offset))
+
+    def _request(self, method, path, **kwargs):
+        """
+        Send a request, retrying transient failures as the retry policy
+        allows. Only the failing request is repeated, so a paginated listing
+        carries on from the window which failed.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self._send(method, path, **kwargs)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout):
+                if not self.retry.allow_retry(method, attempt):
+                    raise
+                self.retry.sleep(self.retry.delay(attempt))
+            else:
+                if response.status_code < 400:
+                    self.retry.record_success()
+                    return response
+                if not self.retry.allow_retry(method, attempt, response):
+                    return response
+                self.retry.sleep(self.retry.delay(attempt, response))
+            attempt += 1
+
+    def _cache_group(self, name):
+        """The cache group holding this account's listings of a resource"""
+        return "%s/%s" % (self.url, name)
+
+    def _cached_get(self, path, params):
+        """
+        Serve a GET from the cache while fresh; otherwise revalidate the
+        stored entry (if any) and store the answer. Models keep (and change)
+        the values they are given, so the cache holds its own copy and hands
+        out a fresh one on every hit.
+        """
+        group = self._cache_group(resource(path))
+        key = cache_key(self.url + path, params)
+        entry = self.cache.get(group, key)
+        if entry is not None and entry.is_fresh(self.cache.ttl):
+            return copy.deepcopy(entry.value)
+
+        headers = entry.conditional_headers() if entry is not None else {}
+        if headers:
+            response = self._request(
+                'GET', path, params=params, headers=headers)
+        else:
+            response = self._request('GET', path, params=params)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.set(group, key, entry.refreshed())
+            return copy.deepcopy(entry.value)
+
+        value = process_response(response)
+        if value is not None:
+            self.cache.set(group, key, CacheEntry(
+                copy.deepcopy(value),
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified')))
+        return value
+
+    def _write(self, method, path, **kwargs):
+        """
+        Send a request which changes data, dropping cached listings of every
+        resource it affects whether or not it succeeds
+        """
+        try:
+            return process_response(self._request(method, path, **kwargs))
+        finally:
+            if self.cache is not None:
+                for name in affected(path):
+                    self.cache.invalidate(self._cache_group(name))
+
+    def connection_stats(self):
+        """
+        Reports how well pooled connections are being reused
+
+        :rtype: :class:`dict`
+
+        Usage::
+
+            >>> from emma.adapter.requests_adapter import RequestsAdapter
+            >>> adptr = RequestsAdapter({
+            ...     "account_id": "1234",
+            ...     "public_key": "08192a3b4c5d6e7f",
+            ...     "private_key": "f7e6d5c4b3a29180"})
+            >>> adptr.connection_stats()
+            {'requests': 400, 'connections': 2, 'reused': 398}
+        """
+        with self._lock:
+            opened = self._retired_connections + sum(
+                x.num_connections for x in self._live_pools())
+            return {
+                'requests': self._requests,
+                'connections': opened,
+                'reused': max(self._requests - opened, 0)
+            }
+
+    def close(self):
+        """Release every pooled connection"""
+        with self._lock:
+            self._retired_connections += sum(
+                x.num_connections for x in self._live_pools())
+            self.session.close()
 
     def post(self, path, data=None):
         """
         Takes an effective path (portion after https://api.e2ma.net/:account_id)
-        and a parameter dictionary, then passes these to :func:`requests.post`
+        and a parameter dictionary, then passes these to the pooled
+        :class:`requests.Session`
 
         :param path: The path portion of a URL
         :type path: :class:`str`
@@ -67,25 +280,25 @@ class RequestsAdapter(AbstractAdapter):
             >>> adptr.post('/members', {...})
             {'import_id': 2001}
         """
-        return process_response(
-            requests.post(
-                self.url + "%s" % path,
-                data=json.dumps(data),
-                auth=self.auth))
+        return self._write('POST', path, data=json.dumps(data))
 
-    def get(self, path, params=None):
+    def get(self, path, params=None, context=None):
         """
         Takes an effective path (portion after https://api.e2ma.net/:account_id)
-        and a parameter dictionary, then passes these to :func:`requests.get`
+        and a parameter dictionary, then passes these to the pooled
+        :class:`requests.Session`
 
         :param path: The path portion of a URL
         :type path: :class:`str`
         :param params: The dictionary of HTTP parameters to encode
         :type params: :class:`dict`
+        :param context: The pagination window or count mode for this call
+        :type context: :class:`RequestContext`
         :rtype: JSON-encoded value or None (if 404)
 
         Usage::
 
+            >>> from emma.adapter import RequestContext
             >>> from emma.adapter.requests_adapter import RequestsAdapter
             >>> adptr = RequestsAdapter({
             ...     "account_id": "1234",
@@ -93,28 +306,25 @@ class RequestsAdapter(AbstractAdapter):
             ...     "private_key": "f7e6d5c4b3a29180"})
             >>> adptr.get('/members', {...})
             [{...}, {...}, ...] # first 500 only
-            >>> adptr.count_only = True
-            >>> adptr.get('/members', {...})
+            >>> adptr.get('/members', {...}, RequestContext(count_only=True))
             999
-            >>> adptr.start = 500
-            >>> adptr.end = 1000
-            >>> adptr.get('/members', {...})
+            >>> adptr.get('/members', {...}, RequestContext(500, 1000))
             [{...}, {...}, ...] # 500-999
         """
 
-        params = params or {}
-        params.update(self.pagination_add_ons())
+        params = dict(params or {})
+        params.update(self.pagination_add_ons(context))
 
+        if self.cache is not None:
+            return self._cached_get(path, params)
         return process_response(
-            requests.get(
-                self.url + "%s" % path,
-                params=params,
-                auth=self.auth))
+            self._request('GET', path, params=params))
 
     def put(self, path, data=None):
         """
         Takes an effective path (portion after https://api.e2ma.net/:account_id)
-        and a parameter dictionary, then passes these to :func:`requests.put`
+        and a parameter dictionary, then passes these to the pooled
+        :class:`requests.Session`
 
         :param path: The path portion of a URL
         :type path: :class:`str`
@@ -132,16 +342,13 @@ class RequestsAdapter(AbstractAdapter):
             >>> adptr.put('/members/email/optout/test@example.com')
             True
         """
-        return process_response(
-            requests.put(
-                self.url + "%s" % path,
-                data=json.dumps(data),
-                auth=self.auth))
+        return self._write('PUT', path, data=json.dumps(data))
 
     def delete(self, path, params=None):
         """
         Takes an effective path (portion after https://api.e2ma.net/:account_id)
-        and a parameter dictionary, then passes these to :func:`requests.delete`
+        and a parameter dictionary, then passes these to the pooled
+        :class:`requests.Session`
 
         :param path: The path portion of a URL
         :type path: :class:`str`
@@ -159,8 +366,4 @@ class RequestsAdapter(AbstractAdapter):
             >>> adptr.delete('/members/123')
             True
         """
-        return process_response(
-            requests.delete(
-                self.url + "%s" % path,
-                params=params,
-                auth=self.auth))
+        return self._write('DELETE', path, params=params)
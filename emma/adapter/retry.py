@@ -0,0 +1,141 @@
+"""Retry policy for transient API failures"""
+
+import email.utils
+import random
+import threading
+import time
+
+
+def retry_after(response):
+    """
+    Seconds the API asked us to wait before trying again, if it said
+
+    :param response: The response to inspect
+    :type response: :class:`Response`
+    :rtype: :class:`float` or :class:`None`
+    """
+    value = response.headers.get('Retry-After') if response.headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        parsed = email.utils.parsedate_tz(value)
+        if parsed is None:
+            return None
+        return max(0.0, email.utils.mktime_tz(parsed) - time.time())
+
+
+class RetryPolicy(object):
+    """
+    Decides whether, and after how long, a failed request is sent again
+
+    Only idempotent methods are retried unless told otherwise, delays grow
+    exponentially with full jitter (or follow the API's ``Retry-After``), and
+    every retry is paid for from a budget which successful requests slowly
+    refill. Give each :class:`Account` its own policy so that one struggling
+    account cannot spend another's budget.
+
+    :param max_attempts: How many times a request may be sent in total
+    :type max_attempts: :class:`int`
+    :param backoff: The base delay, in seconds, before the first retry
+    :type backoff: :class:`float`
+    :param max_backoff: The longest delay, in seconds, between attempts
+                        when backing off exponentially
+    :type max_backoff: :class:`float`
+    :param statuses: HTTP statuses worth retrying
+    :type statuses: :class:`tuple` of :class:`int`
+    :param methods: HTTP methods which are safe to retry
+    :type methods: :class:`tuple` of :class:`str`
+    :param budget: The most retries that may be spent before successes
+                   earn more
+    :type budget: :class:`float`
+    :param budget_refill: The retries earned back by each success
+    :type budget_refill: :class:`float`
+    :param max_retry_after: The longest delay, in seconds, the API may ask
+                            for with ``Retry-After``
+    :type max_retry_after: :class:`float`
+
+    Usage::
+
+        >>> from emma.adapter.retry import RetryPolicy
+        >>> from emma.model.account import Account
+        >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180",
+        ...                retry=RetryPolicy(max_attempts=3, budget=20))
+    """
+    MAX_ATTEMPTS = 5
+    BACKOFF = 0.5
+    MAX_BACKOFF = 30.0
+    MAX_RETRY_AFTER = 300.0
+    STATUSES = (429, 500, 502, 503, 504)
+    METHODS = ('GET', 'PUT', 'DELETE')
+    BUDGET = 100.0
+    BUDGET_REFILL = 0.1
+
+    def __init__(self, max_attempts=None, backoff=None, max_backoff=None,
+                 statuses=None, methods=None, budget=None,
+                 budget_refill=None, max_retry_after=None):
+        self.max_attempts = max_attempts or self.MAX_ATTEMPTS
+        self.backoff = self.BACKOFF if backoff is None else backoff
+        self.max_backoff = (self.MAX_BACKOFF if max_backoff is None
+                            else max_backoff)
+        self.max_retry_after = (self.MAX_RETRY_AFTER
+                                if max_retry_after is None
+                                else max_retry_after)
+        self.statuses = self.STATUSES if statuses is None else statuses
+        self.methods = self.METHODS if methods is None else methods
+        self.budget = float(self.BUDGET if budget is None else budget)
+        self.budget_refill = (self.BUDGET_REFILL if budget_refill is None
+                              else budget_refill)
+        self.tokens = self.budget
+        self._lock = threading.Lock()
+
+    def allow_retry(self, method, attempt, response=None):
+        """
+        Whether a request which failed on its ``attempt``-th try (counting
+        from zero) should be sent again. Spends from the budget if so.
+
+        :param method: The HTTP method of the request
+        :type method: :class:`str`
+        :param attempt: The number of retries already made
+        :type attempt: :class:`int`
+        :param response: The failed response, or :class:`None` if no response
+                         arrived at all
+        :type response: :class:`Response`
+        :rtype: :class:`bool`
+        """
+        if attempt + 1 >= self.max_attempts or method not in self.methods:
+            return False
+        if response is not None and response.status_code not in self.statuses:
+            return False
+
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def record_success(self):
+        """Earns back part of a retry for a request that went through"""
+        with self._lock:
+            self.tokens = min(self.budget, self.tokens + self.budget_refill)
+
+    def delay(self, attempt, response=None):
+        """
+        Seconds to wait before the next attempt
+
+        :param attempt: The number of retries already made
+        :type attempt: :class:`int`
+        :param response: The failed response, if any
+        :type response: :class:`Response`
+        :rtype: :class:`float`
+        """
+        requested = retry_after(response) if response is not None else None
+        if requested is not None:
+            return min(requested, self.max_retry_after)
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def sleep(self, seconds):
+        """Waits between attempts"""
+        time.sleep(seconds)
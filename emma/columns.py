@@ -0,0 +1,276 @@
+"""
+Columnar views of list reports, for vectorized analytics. NumPy (1.9 or
+later) is used when it is installed (columns are then arrays) and plain
+lists otherwise.
+"""
+
+import calendar
+import collections
+from datetime import datetime, timedelta
+import itertools
+import re
+from emma import iter_report
+from emma.model import parse_datetime_column
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NUMPY_VERSION = (1, 9)
+if numpy is not None and tuple(
+        int(x) for x in numpy.__version__.split('.')[:2]) < NUMPY_VERSION:
+    numpy = None
+
+
+MISSING_ID = -1
+SAMPLE_SIZE = 100
+CHUNK_SIZE = 10000
+
+_EPOCH = datetime(1970, 1, 1)
+_ID_TYPES = frozenset([int, long, type(None)])
+_TIMESTAMP = re.compile(r"@D:\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\Z")
+
+
+def _kind(name, values):
+    """
+    How a column is stored (``datetime``, ``id`` or ``object``), judged
+    from its first :data:`SAMPLE_SIZE` values
+    """
+    present = list(itertools.islice(
+        (x for x in values if x is not None), SAMPLE_SIZE))
+    if not present:
+        return 'object'
+    if all(isinstance(x, basestring) and _TIMESTAMP.match(x)
+           for x in present):
+        return 'datetime'
+    if name.endswith('_id') and all(
+            isinstance(x, (int, long)) and not isinstance(x, bool)
+            for x in present):
+        return 'id'
+    return 'object'
+
+
+def _seconds(value):
+    """Seconds since the epoch of a naive (UTC) :class:`datetime`"""
+    return calendar.timegm(value.timetuple())
+
+
+class ReportColumns(object):
+    """
+    A list report (or any list of rows) held column by column. Timestamps
+    are parsed and ids kept as integers: with NumPy, as ``datetime64[s]``
+    (missing values are ``NaT``) and ``int64`` (missing values are
+    :data:`MISSING_ID`) arrays; without it, as lists of :class:`datetime`
+    and :class:`int` (missing values are :class:`None`). Other columns are
+    kept as they are, as is any column with a value which does not fit the
+    kind its first values suggested.
+
+    :param rows: The rows, such as from :func:`emma.iter_report`
+    :type rows: :class:`iterable` of :class:`dict`
+    :param fields: The columns to keep (defaults to every key seen)
+    :type fields: :class:`list` of :class:`str`
+
+    Usage::
+
+        >>> from emma.columns import ReportColumns
+        >>> from emma.enumerations import Report
+        >>> from emma.model.account import Account
+        >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+        >>> clicks = ReportColumns.fetch(acct, Report.ClickList, 123)
+        >>> len(clicks)
+        10000000
+        >>> clicks['member_id']
+        array([200, 201, 200, ...])
+        >>> clicks.count_by('link_id')
+        {300: 6120331, 301: 3879669}
+        >>> clicks.bucket('timestamp', 3600)
+        OrderedDict([(datetime.datetime(2013, 6, 1, 12, 0), 81234), ...])
+    """
+    def __init__(self, rows, fields=None):
+        values = collections.OrderedDict((x, []) for x in fields or [])
+        rows = iter(rows)
+        size = 0
+        while True:
+            chunk = list(itertools.islice(rows, CHUNK_SIZE))
+            if not chunk:
+                break
+            if fields is None and set().union(*chunk).difference(values):
+                for row in chunk:
+                    for name in row:
+                        if name not in values:
+                            values[name] = [None] * size
+            for name, column in values.items():
+                column.extend([x.get(name) for x in chunk])
+            size += len(chunk)
+        self.size = size
+        self.kinds = {}
+        self.columns = collections.OrderedDict()
+        for name, column in values.iteritems():
+            kind = _kind(name, column)
+            try:
+                self.columns[name] = self._column(kind, column)
+            except (TypeError, ValueError):
+                kind = 'object'
+                self.columns[name] = self._column(kind, column)
+            self.kinds[name] = kind
+
+    @classmethod
+    def fetch(cls, account, report, id=None, params=None, fields=None):
+        """
+        Streams a list report (see :func:`emma.iter_report`) into columns,
+        a page at a time
+
+        :param account: The account for which these reports apply
+        :type account: :class:`Account`
+        :param report: The report (from enumerations.Report)
+        :type report: :class:`int`
+        :param id: The mailing reported on
+        :type id: :class:`int`
+        :param params: Optional parameters to pass
+        :type params: :class:`dict`
+        :param fields: The columns to keep (defaults to every key seen)
+        :type fields: :class:`list` of :class:`str`
+        :rtype: :class:`ReportColumns`
+        """
+        return cls(iter_report(account, report, id, params), fields)
+
+    @staticmethod
+    def _column(kind, values):
+        """
+        Stores one column's values, raising :class:`ValueError` or
+        :class:`TypeError` if one does not fit its kind
+        """
+        if kind == 'id' and not set(map(type, values)) <= _ID_TYPES:
+            raise TypeError("Not every value is an id")
+        if kind == 'datetime':
+            if numpy is None:
+                return parse_datetime_column(values)
+            return numpy.fromiter(
+                ('NaT' if x is None else x[3:] for x in values),
+                dtype='S19', count=len(values)).astype('datetime64[s]')
+        if numpy is None:
+            return values
+        if kind == 'id':
+            return numpy.fromiter(
+                (MISSING_ID if x is None else x for x in values),
+                dtype=numpy.int64, count=len(values))
+        column = numpy.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __setitem__(self, name, column):
+        if len(column) != self.size:
+            raise ValueError("A column needs %s values" % self.size)
+        self.kinds.setdefault(name, 'object')
+        self.columns[name] = column
+
+    def _values(self, column):
+        """A column, given either its name or its values"""
+        if isinstance(column, basestring):
+            return self.columns[column], self.kinds[column]
+        return column, 'object'
+
+    def domains(self, name='email'):
+        """
+        The (lower case) domain of every address in a column, such as for
+        :meth:`count_by`
+
+        :param name: The column of email addresses
+        :type name: :class:`str`
+        :rtype: A column of :class:`str`
+        """
+        column = [x.rsplit('@', 1)[1].lower()
+                  if isinstance(x, basestring) and '@' in x else None
+                  for x in self.columns[name]]
+        return self._column('object', column)
+
+    def count_by(self, column):
+        """
+        Counts the rows for each value of a column, such as per member, per
+        link or (given :meth:`domains`) per domain. Missing values are not
+        counted.
+
+        :param column: A column's name, or a column of values
+        :type column: :class:`str` or a column
+        :rtype: :class:`dict`
+        """
+        values, kind = self._values(column)
+        if numpy is None or kind == 'object':
+            return dict(collections.Counter(
+                x for x in values if x is not None))
+        if kind == 'datetime':
+            times = values.astype(numpy.int64)
+            keys, counts = numpy.unique(
+                times[times != numpy.iinfo(numpy.int64).min],
+                return_counts=True)
+            return dict((_EPOCH + timedelta(seconds=int(x)), int(y))
+                        for x, y in zip(keys, counts))
+        keys, counts = numpy.unique(values[values != MISSING_ID],
+                                    return_counts=True)
+        return dict((int(x), int(y)) for x, y in zip(keys, counts))
+
+    def bucket(self, name, seconds):
+        """
+        Counts the rows falling into each interval of a timestamp column
+
+        :param name: The timestamp column
+        :type name: :class:`str`
+        :param seconds: The width of each interval (3600 buckets by hour)
+        :type seconds: :class:`int`
+        :rtype: :class:`collections.OrderedDict` of counts by the start of
+                each (non-empty) interval
+        """
+        column = self.columns[name]
+        if numpy is None:
+            starts = collections.Counter(
+                _seconds(x) // seconds * seconds
+                for x in column if x is not None)
+            keys = sorted(starts)
+            counts = [starts[x] for x in keys]
+        else:
+            times = column.astype(numpy.int64)
+            times = times[times != numpy.iinfo(numpy.int64).min]
+            keys, counts = numpy.unique(
+                times // seconds * seconds, return_counts=True)
+        return collections.OrderedDict(
+            (_EPOCH + timedelta(seconds=int(x)), int(y))
+            for x, y in zip(keys, counts))
+
+    def elapsed(self, name, since):
+        """
+        Seconds from ``since`` to each time in a timestamp column, such as
+        the latency of each click after a mailing's ``delivery_ts``
+
+        :param name: The timestamp column
+        :type name: :class:`str`
+        :param since: Another timestamp column's name, or a single time
+        :type since: :class:`str` or :class:`datetime`
+        :rtype: A column of :class:`float` (``nan`` or :class:`None` where
+                either time is missing)
+        """
+        column = self.columns[name]
+        if isinstance(since, basestring):
+            since = self.columns[since]
+        elif numpy is None:
+            since = [since] * self.size
+        if numpy is None:
+            return [(x - y).total_seconds()
+                    if x is not None and y is not None else None
+                    for x, y in zip(column, since)]
+        since = numpy.asarray(since, dtype='datetime64[s]')
+        missing = numpy.iinfo(numpy.int64).min
+        times = column.astype(numpy.int64)
+        starts = since.astype(numpy.int64)
+        result = (times - starts).astype(numpy.float64)
+        result[(times == missing) | (starts == missing)] = numpy.nan
+        return result
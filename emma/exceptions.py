@@ -20,6 +20,25 @@ class ImportDeleteError(ApiRequestFailed):
     pass
 
 
+class ImportSubmitError(ApiRequestFailed):
+    """
+    Some chunks of a bulk import were not accepted. ``import_ids`` holds the
+    imports which were, and ``failures`` a (members, exception) pair for each
+    chunk which was not, so that only those members need be sent again.
+    """
+    def __init__(self, import_ids, failures):
+        super(ImportSubmitError, self).__init__(import_ids, failures)
+        self.import_ids = import_ids
+        self.failures = failures
+
+
+class ImportTimeoutError(ApiRequestFailed):
+    """
+    Imports were still running when the wait for them to finish timed out
+    """
+    pass
+
+
 class MemberChangeStatusError(ApiRequestFailed):
     """
     The API call to change a member's status did not complete correctly
@@ -2,28 +2,342 @@
 
 import collections
 from datetime import datetime
+from itertools import chain, izip
+import re
+import threading
+import weakref
 
 
 SERIALIZED_DATETIME_FORMAT = "@D:%Y-%m-%dT%H:%M:%S"
 SERIALIZED_DATETIME_ALT_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
 
 
+_DATETIME_LAYOUTS = {
+    SERIALIZED_DATETIME_FORMAT: re.compile(
+        r"@D:(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)\Z"),
+    SERIALIZED_DATETIME_ALT_FORMAT: re.compile(
+        r"(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)\.(\d{1,6})\Z"),
+}
+
+
+def parse_datetime(value, date_format=SERIALIZED_DATETIME_FORMAT):
+    """
+    Parses an Emma date string to a :class:`datetime`. The API's own layouts
+    are read directly; anything else (including malformed input) goes
+    through :func:`datetime.strptime`, so results and errors are the same.
+
+    :param value: The date string
+    :type value: :class:`str`
+    :param date_format: The format the API sends it in
+    :type date_format: :class:`str`
+    :rtype: :class:`datetime`
+
+    Usage::
+
+        >>> from emma.model import parse_datetime
+        >>> parse_datetime("@D:2013-06-01T12:30:00")
+        datetime.datetime(2013, 6, 1, 12, 30)
+    """
+    layout = _DATETIME_LAYOUTS.get(date_format)
+    found = (layout.match(value)
+             if layout is not None and isinstance(value, basestring)
+             else None)
+    if found is not None:
+        parts = found.groups()
+        if len(parts) == 7:
+            parts = parts[:6] + (parts[6].ljust(6, '0'),)
+        try:
+            return datetime(*map(int, parts))
+        except ValueError:
+            pass
+    return datetime.strptime(value, date_format)
+
+
+def parse_datetime_column(values, date_format=SERIALIZED_DATETIME_FORMAT):
+    """
+    Parses a whole column of Emma date strings (such as one field across a
+    page of results) in one pass. :class:`None` stays :class:`None`, and
+    repeated strings are parsed once.
+
+    :param values: The date strings
+    :type values: :class:`list` of :class:`str`
+    :param date_format: The format the API sends them in
+    :type date_format: :class:`str`
+    :rtype: :class:`list` of :class:`datetime`
+
+    Usage::
+
+        >>> from emma.model import parse_datetime_column
+        >>> parse_datetime_column(["@D:2013-06-01T12:30:00", None])
+        [datetime.datetime(2013, 6, 1, 12, 30), None]
+    """
+    parsed = {None: None}
+    column = []
+    for value in values:
+        if value not in parsed:
+            parsed[value] = parse_datetime(value, date_format)
+        column.append(parsed[value])
+    return column
+
+
 def str_fields_to_datetime(fields, raw):
     """Parses Emma date fields to :class:`datetime` objects"""
-    return dict((x[0], datetime.strptime(x[1], SERIALIZED_DATETIME_FORMAT))
+    return dict((x[0], parse_datetime(x[1], SERIALIZED_DATETIME_FORMAT))
         for x in raw.items() if x[0] in fields and x[1] is not None)
 
 
 def str_fields_to_datetime_alt(fields, raw):
     """Parses Emma date fields to :class:`datetime` objects"""
-    return dict((x[0], datetime.strptime(x[1], SERIALIZED_DATETIME_ALT_FORMAT))
+    return dict((x[0], parse_datetime(x[1], SERIALIZED_DATETIME_ALT_FORMAT))
                 for x in raw.items() if x[0] in fields and x[1] is not None)
 
 
+def datetime_fields(fields, date_format=SERIALIZED_DATETIME_FORMAT):
+    """
+    Declares the Emma date fields of a model, which are parsed to
+    :class:`datetime` objects when first read rather than when loaded
+
+    :param fields: The names of the date fields
+    :type fields: :class:`list` of :class:`str`
+    :param date_format: The format the API sends them in
+    :type date_format: :class:`str`
+    :rtype: :class:`dict`
+    """
+    return dict.fromkeys(fields, date_format)
+
+
+class Schema(object):
+    """
+    An append-only list of field names, shared by many
+    :class:`CompactRecord` objects so each need only hold its values
+    """
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self._lock = threading.Lock()
+
+    def position(self, name):
+        """The position of ``name`` in each record, adding it if new"""
+        try:
+            return self.index[name]
+        except KeyError:
+            with self._lock:
+                if name not in self.index:
+                    self.names.append(name)
+                    self.index[name] = len(self.names) - 1
+                return self.index[name]
+
+
+_MISSING = object()
+
+
+class CompactRecord(collections.MutableMapping):
+    """
+    A mapping which keeps only a list of values, looking field names up in a
+    shared :class:`Schema`. Records of the same shape cost a fraction of an
+    equivalent :class:`dict`.
+
+    :param schema: The field names shared with similar records
+    :type schema: :class:`Schema`
+    :param raw: The initial values
+    :type raw: :class:`dict`
+    """
+    __slots__ = ('_schema', '_values')
+
+    def __init__(self, schema, raw=None):
+        self._schema = schema
+        self._values = []
+        if raw:
+            positions = [(schema.position(x), y) for x, y in raw.iteritems()]
+            self._values = [_MISSING] * (max(x for x, _ in positions) + 1)
+            for position, value in positions:
+                self._values[position] = value
+
+    def __getitem__(self, key):
+        position = self._schema.index.get(key)
+        if position is None or position >= len(self._values):
+            raise KeyError(key)
+        value = self._values[position]
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        position = self._schema.position(key)
+        if position >= len(self._values):
+            self._values.extend([_MISSING] * (position + 1 - len(self._values)))
+        self._values[position] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._values[self._schema.index[key]] = _MISSING
+
+    def __contains__(self, key):
+        position = self._schema.index.get(key)
+        return (position is not None and position < len(self._values)
+                and self._values[position] is not _MISSING)
+
+    def __iter__(self):
+        return (x for x, y in izip(self._schema.names, self._values)
+                if y is not _MISSING)
+
+    def __len__(self):
+        return sum(1 for x in self._values if x is not _MISSING)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def items(self):
+        return [(x, y) for x, y in izip(self._schema.names, self._values)
+                if y is not _MISSING]
+
+    def values(self):
+        return [x for x in self._values if x is not _MISSING]
+
+    def copy(self):
+        """A plain :class:`dict` of the same items"""
+        return dict(self.items())
+
+
+class ResultSets(object):
+    """
+    Remembers which ids each distinct set of listing parameters returned,
+    dropping the least recently used listings beyond ``max_entries`` (a
+    collection then drops their items, unless another listing has them)
+
+    :param max_entries: The most listings remembered
+    :type max_entries: :class:`int`
+    """
+    MAX_ENTRIES = 16
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """The ids listed for ``key``, or :class:`None`"""
+        with self._lock:
+            ids = self._entries.pop(key, None)
+            if ids is not None:
+                self._entries[key] = ids
+            return ids
+
+    def put(self, key, ids):
+        """
+        Remembers the ids listed for ``key``
+
+        :rtype: :class:`list` of the ids of each listing dropped
+        """
+        evicted = []
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = tuple(ids)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[1])
+        return evicted
+
+    def items(self):
+        """Every remembered listing, most recently used first"""
+        with self._lock:
+            return list(reversed(self._entries.items()))
+
+
+class IdentityMap(object):
+    """
+    Holds the one instance of each API object an account has loaded, by
+    model class and primary key, so that every collection reaching the same
+    member (or group, or mailing) shares it and sees its changes. Instances
+    are weakly referenced, and forgotten once nothing else holds them.
+
+    Usage::
+
+        >>> from emma.model.account import Account
+        >>> from emma.model.member import Member
+        >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+        >>> acct.members[123] is acct.groups[1024].members.fetch_all()[123]
+        True
+        >>> acct.identities.get(Member, 123)
+        <Member>
+    """
+    def __init__(self):
+        self._instances = weakref.WeakValueDictionary()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._instances)
+
+    def get(self, cls, key):
+        """The loaded instance of ``cls`` with primary key ``key``, if any"""
+        return self._instances.get((cls, key))
+
+    def load(self, cls, account, raw):
+        """
+        The instance of ``cls`` for ``raw``: the one already loaded, brought
+        up to date with ``raw``, or else a new one
+
+        :param cls: The model class
+        :type cls: :class:`type`
+        :param account: The Account which owns the instance
+        :type account: :class:`Account`
+        :param raw: The raw values of the instance
+        :type raw: :class:`dict`
+        :rtype: An instance of ``cls``
+        """
+        key = (cls, raw[cls._primary_key])
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is None:
+                instance = self._instances[key] = cls(account, raw)
+                instance.mark_clean()
+            else:
+                instance._refresh(raw)
+            return instance
+
+
 class BaseApiModel(collections.MutableMapping):
-    """Creates a model with dictionary access"""
+    """
+    Creates a model with dictionary access. Collections may be used from
+    several threads at once: API requests run unlocked, and only the merge
+    of their results into the cache holds ``_merging``, which is shared by
+    every model as it is held so briefly.
+    """
+    _merging = threading.RLock()
+    _datetime_fields = {}
+    _result_sets = None
+    _primary_key = None
+    _track_changes = False
+    _changed = None
+
+    @classmethod
+    def load(cls, account, raw):
+        """
+        An instance for raw API values, shared through the account's
+        :class:`IdentityMap` when the model has a primary key. Unlike one
+        constructed directly, it starts with no changes.
+
+        :param account: The Account which owns the instance
+        :type account: :class:`Account`
+        :param raw: The raw values of the instance
+        :type raw: :class:`dict`
+        :rtype: An instance of this class
+        """
+        identities = getattr(account, 'identities', None)
+        if (identities is None or cls._primary_key is None
+                or cls._primary_key not in raw):
+            instance = cls(account, raw)
+            instance.mark_clean()
+            return instance
+        return identities.load(cls, account, raw)
+
     def __init__(self, raw=None):
         self._dict = self._parse_raw(raw) if raw else {}
+        if self._track_changes and self._dict:
+            self._changed = set(self._dict)
 
     def __len__(self):
         return self._dict.__len__()
@@ -31,9 +345,18 @@ class BaseApiModel(collections.MutableMapping):
     def __getitem__(self, key):
         if key not in self._dict:
             raise KeyError(key)
-        return self._dict.__getitem__(key)
+        value = self._dict.__getitem__(key)
+        if key in self._datetime_fields and isinstance(value, basestring):
+            value = parse_datetime(value, self._datetime_fields[key])
+            self._dict[key] = value
+        return value
 
     def __setitem__(self, key, value):
+        if self._track_changes and (key not in self._dict
+                                    or self[key] != value):
+            if self._changed is None:
+                self._changed = set()
+            self._changed.add(key)
         self._dict.__setitem__(key, value)
 
     def __delitem__(self, key):
@@ -50,19 +373,135 @@ class BaseApiModel(collections.MutableMapping):
 
     def clear(self):
         self._dict = {}
+        self._result_sets = None
+
+    def _fetch_keyed(self, key, fetch, narrow=None):
+        """
+        Answers a listing from the ids remembered for ``key``, else by
+        narrowing a remembered superset, else by calling ``fetch``. Items
+        of a listing which is forgotten are dropped too, unless another
+        remembered listing has them or they have unsaved changes; items
+        cached only by looking them up one at a time are kept until
+        :meth:`clear`.
+
+        :param key: Identifies the listing parameters
+        :type key: :class:`tuple`
+        :param fetch: Downloads the listing as a :class:`dict` of items by id
+        :type fetch: :class:`function`
+        :param narrow: Given a remembered key, ``key`` and the remembered
+                       ``(id, item)`` pairs, returns the ids matching ``key``
+                       or :class:`None` if they cannot be told apart locally
+        :type narrow: :class:`function`
+        :rtype: :class:`dict`
+        """
+        with self._merging:
+            if self._result_sets is None:
+                self._result_sets = ResultSets()
+            result_sets = self._result_sets
+
+        ids = result_sets.get(key)
+        if ids is None and narrow is not None:
+            for known, known_ids in result_sets.items():
+                ids = narrow(known, key, [
+                    (x, self._dict[x]) for x in known_ids if x in self._dict])
+                if ids is not None:
+                    break
+        if ids is None:
+            items = fetch()
+            self._replace_all(items)
+            ids = items.keys()
+
+        evicted = result_sets.put(key, ids)
+        found = self._dict
+        listed = dict((x, found[x]) for x in ids if x in found)
+        if evicted:
+            self._drop_unlisted(evicted, result_sets)
+        return listed
+
+    def _drop_unlisted(self, evicted, result_sets):
+        """
+        Drops the clean items of forgotten listings which no remembered
+        listing has
+        """
+        kept = set(chain.from_iterable(x for _, x in result_sets.items()))
+        with self._merging:
+            drop = set(
+                x for x in chain.from_iterable(evicted)
+                if x not in kept and x in self._dict
+                and not self._dict[x].is_dirty())
+            if drop:
+                self._dict = dict(
+                    x for x in self._dict.items() if x[0] not in drop)
 
     def _replace_all(self, items):
         """Update the internal :class:`dict` with matching items provided"""
         is_new = lambda x: x[0] not in self._dict
         replace = lambda x: (x[0], x[1] if x[0] not in items else items[x[0]])
 
-        if not self._dict:
-            self._dict = items
+        with self._merging:
+            if not self._dict:
+                self._dict = items
+            else:
+                self._dict = dict(
+                    [replace(x) for x in self._dict.items()]
+                    + [x for x in items.items() if is_new(x)]
+                )
+
+    def is_dirty(self):
+        """
+        Whether any value has been set since this model was loaded or saved.
+        A model constructed with raw values (rather than loaded from the
+        API) has every value set.
+
+        :rtype: :class:`bool`
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> mbr = acct.members[123]
+            >>> mbr.is_dirty()
+            False
+            >>> mbr['first_name'] = u"Emma"
+            >>> mbr.is_dirty()
+            True
+        """
+        return bool(self._changed)
+
+    def dirty_keys(self):
+        """
+        The keys set since this model was loaded or saved
+
+        :rtype: :class:`frozenset`
+        """
+        return frozenset(self._changed or ())
+
+    def mark_clean(self, keys=None):
+        """
+        Forget which keys have been set, as once they are saved
+
+        :param keys: Forget only these keys, the ones actually sent
+        :type keys: :class:`iterable` of :class:`str`
+        """
+        if keys is None or not self._changed:
+            self._changed = None
         else:
-            self._dict = dict(
-                [replace(x) for x in self._dict.items()]
-                + [x for x in items.items() if is_new(x)]
-            )
+            self._changed.difference_update(keys)
+
+    def _changes(self, extracted):
+        """The part of an extract whose keys have been set since loading"""
+        changed = self._changed or ()
+        return dict(x for x in extracted.items() if x[0] in changed)
+
+    def _refresh(self, raw):
+        """
+        Takes newer raw values from the API over the current ones, keeping
+        any set locally and not yet saved
+        """
+        changed = self._changed or ()
+        for key, value in self._parse_raw(raw).items():
+            if key not in changed:
+                self._dict[key] = value
 
     def _parse_raw(self, raw):
         """
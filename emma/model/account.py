@@ -1,11 +1,19 @@
 """The aggregate root (Account) and collections owned by the root"""
 
+from datetime import timedelta
+import json
+from itertools import izip
+import emma
 from emma import exceptions as ex
-from emma.adapter.requests_adapter import RequestsAdapter
-from emma.model import BaseApiModel
-from emma.enumerations import MemberStatus
+from emma.adapter import RequestContext, imap_bounded, map_concurrently
+from emma.adapter.async_adapter import AsyncAdapter
+from emma.adapter.requests_adapter import REQUEST_ERRORS, RequestsAdapter
+from emma.model import (BaseApiModel, IdentityMap, Schema,
+                        SERIALIZED_DATETIME_FORMAT)
+from emma.enumerations import (GroupType, MailingStatus, MailingType,
+                               MemberStatus)
 import emma.model.mailing
-from emma.model.member import Member
+from emma.model.member import Member, normalize_email
 import emma.model.member_import
 import emma.model.field
 import emma.model.group
@@ -13,6 +21,7 @@ import emma.model.search
 import emma.model.trigger
 import emma.model.webhook
 import emma.model.automation
+from emma.query.factory import QueryFactory
 
 
 class Account(object):
@@ -25,6 +34,11 @@ class Account(object):
     :type public_key: :class:`str`
     :param private_key: Your private key
     :type private_key: :class:`str`
+    :param adapter: An existing adapter to use instead of creating one
+    :type adapter: :class:`AbstractAdapter`
+    :param adapter_options: Extra keyword arguments for the adapter, such as
+                            connection pool sizing
+    :type adapter_options: :class:`dict`
 
     Usage::
 
@@ -38,15 +52,19 @@ class Account(object):
         <AccountMailingCollection>
         >>> acct.members
         <AccountMemberCollection>
+        >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180",
+        ...                pool_maxsize=20)
     """
     default_adapter = RequestsAdapter
 
-    def __init__(self, account_id, public_key, private_key):
-        self.adapter = self.__class__.default_adapter({
+    def __init__(self, account_id, public_key, private_key, adapter=None,
+                 **adapter_options):
+        self.adapter = adapter or self.__class__.default_adapter({
             "account_id": "%s" % account_id,
             "public_key": public_key,
             "private_key": private_key
-        })
+        }, **adapter_options)
+        self.identities = IdentityMap()
         self.fields = AccountFieldCollection(self)
         self.groups = AccountGroupCollection(self)
         self.imports = AccountImportCollection(self)
@@ -58,6 +76,103 @@ class Account(object):
         self.workflows = AccountWorkflowCollect(self)
 
 
+class AsyncAccount(object):
+    """
+    Aggregate root for the API context whose collection methods return a
+    pending result (:class:`multiprocessing.pool.AsyncResult`) rather than
+    blocking. Calls run concurrently on the bounded worker pool of an
+    :class:`AsyncAdapter` (see :class:`AsyncCollection`).
+
+    :param account_id: Your account identifier
+    :type account_id: :class:`int` or :class:`str`
+    :param public_key: Your public key
+    :type public_key: :class:`str`
+    :param private_key: Your private key
+    :type private_key: :class:`str`
+    :param adapter_options: Extra keyword arguments for the adapter, such as
+                            ``concurrency``
+    :type adapter_options: :class:`dict`
+
+    Usage::
+
+        >>> from emma.adapter.async_adapter import gather
+        >>> from emma.model.account import AsyncAccount
+        >>> acct = AsyncAccount(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180",
+        ...                     concurrency=50)
+        >>> gather([acct.members.find_many_by_member_id(ids),
+        ...         acct.groups.fetch_all(), acct.mailings.fetch_all()])
+        [{200: <Member>, ...}, {300: <Group>, ...}, {400: <Mailing>, ...}]
+        >>> acct.get_report(Report.MailingSummary, 123).get()
+        {...}
+    """
+    default_adapter = AsyncAdapter
+
+    def __init__(self, account_id, public_key, private_key, **adapter_options):
+        self.adapter = self.__class__.default_adapter({
+            "account_id": "%s" % account_id,
+            "public_key": public_key,
+            "private_key": private_key
+        }, **adapter_options)
+        self.account = Account(account_id, public_key, private_key,
+                               adapter=self.adapter.adapter)
+        self.fields = AsyncCollection(self.account.fields, self.adapter)
+        self.groups = AsyncCollection(self.account.groups, self.adapter)
+        self.imports = AsyncCollection(self.account.imports, self.adapter)
+        self.mailings = AsyncCollection(self.account.mailings, self.adapter)
+        self.members = AsyncCollection(self.account.members, self.adapter)
+        self.searches = AsyncCollection(self.account.searches, self.adapter)
+        self.triggers = AsyncCollection(self.account.triggers, self.adapter)
+        self.webhooks = AsyncCollection(self.account.webhooks, self.adapter)
+        self.workflows = AsyncCollection(self.account.workflows, self.adapter)
+
+    def get_report(self, report, id=None, params=None, workers=None):
+        """
+        Gets a response report, see :func:`emma.get_report`
+
+        :rtype: :class:`AsyncResult`
+        """
+        return self.adapter.submit(
+            emma.get_report, self.account, report, id, params, workers)
+
+    def close(self):
+        """Waits for calls in flight, then releases the adapter"""
+        self.adapter.close()
+
+
+class AsyncCollection(object):
+    """
+    Wraps a collection of an :class:`Account` so that each of its methods runs
+    on a worker pool and returns a pending result. Methods which never touch
+    the API, such as ``factory``, are passed straight through.
+
+    Calls run side by side, on one collection as on several: each makes
+    its requests unlocked, and only merges the results into the
+    collection's cache under a lock (see :class:`BaseApiModel`).
+
+    :param collection: The blocking collection to wrap
+    :type collection: :class:`BaseApiModel`
+    :param adapter: The adapter whose workers run each call
+    :type adapter: :class:`AsyncAdapter`
+    """
+    local_methods = ('factory', 'iter_all')
+
+    def __init__(self, collection, adapter):
+        self.collection = collection
+        self.adapter = adapter
+
+    def __getattr__(self, name):
+        attr = getattr(self.collection, name)
+        if not callable(attr) or name in self.local_methods:
+            return attr
+
+        def submit(*args, **kwargs):
+            return self.adapter.submit(attr, *args, **kwargs)
+        return submit
+
+    def __repr__(self):
+        return "".join(['<Async', self.collection.__class__.__name__, '>'])
+
+
 class AccountFieldCollection(BaseApiModel):
     """
     Encapsulates operations for the set of :class:`Field` objects of an
@@ -68,6 +183,7 @@ class AccountFieldCollection(BaseApiModel):
     """
     def __init__(self, account):
         self.account = account
+        self._shortcuts = None
         super(AccountFieldCollection, self).__init__()
 
     def __getitem__(self, key):
@@ -76,9 +192,17 @@ class AccountFieldCollection(BaseApiModel):
             raise KeyError(key)
         return item
 
+    def __setitem__(self, key, value):
+        super(AccountFieldCollection, self).__setitem__(key, value)
+        self.invalidate_shortcuts()
+
     def __delitem__(self, key):
         self._dict[key].delete()
 
+    def clear(self):
+        super(AccountFieldCollection, self).clear()
+        self.invalidate_shortcuts()
+
     def factory(self, raw=None):
         """
         New :class:`Field` factory
@@ -98,12 +222,14 @@ class AccountFieldCollection(BaseApiModel):
         """
         return emma.model.field.Field(self.account, raw)
 
-    def fetch_all(self, deleted=False):
+    def fetch_all(self, deleted=False, workers=None):
         """
         Lazy-loads the full set of :class:`Field` objects
 
         :param deleted: Whether to include deleted fields
         :type deleted: :class:`bool`
+        :param workers: Fetch pages concurrently on this many threads
+        :type workers: :class:`int`
         :rtype: :class:`dict` of :class:`Field` objects
 
         Usage::
@@ -117,8 +243,10 @@ class AccountFieldCollection(BaseApiModel):
         params = {"deleted":True} if deleted else {}
         if not self._dict:
             self._dict = dict(
-                (x['field_id'], emma.model.field.Field(self.account, x))
-                    for x in self.account.adapter.paginated_get(path, params))
+                (x['field_id'], emma.model.field.Field.load(self.account, x))
+                    for x in self.account.adapter.paginated_get(
+                        path, params, workers))
+            self.invalidate_shortcuts()
         return self._dict
 
     def find_one_by_field_id(self, field_id, deleted=False):
@@ -149,9 +277,18 @@ class AccountFieldCollection(BaseApiModel):
             field = emma.model.field
             raw = self.account.adapter.get(path, params)
             if raw:
-                self._dict[field_id] = field.Field(self.account, raw)
+                self._dict[field_id] = field.Field.load(self.account, raw)
+                self.invalidate_shortcuts()
         return (field_id in self._dict) and self._dict[field_id] or None
 
+    def _shortcut_names(self):
+        """The shortcut names, worked out once until invalidated"""
+        shortcuts = self._shortcuts
+        if shortcuts is None:
+            names = tuple(x['shortcut_name'] for x in self.fetch_all().values())
+            shortcuts = self._shortcuts = (names, frozenset(names))
+        return shortcuts
+
     def export_shortcuts(self):
         """
         Get a :class:`list` of shortcut names for this account
@@ -165,7 +302,28 @@ class AccountFieldCollection(BaseApiModel):
             >>> acct.fields.export_shortcuts()
             ["first_name", "last_name", ...]
         """
-        return [x['shortcut_name'] for x in self.fetch_all().values()]
+        return list(self._shortcut_names()[0])
+
+    def shortcut_set(self):
+        """
+        Get the shortcut names for this account as a :class:`frozenset`, for
+        fast membership tests. It is worked out once and kept until a field
+        is added, renamed or removed.
+
+        :rtype: :class:`frozenset` of :class:`str`
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> "first_name" in acct.fields.shortcut_set()
+            True
+        """
+        return self._shortcut_names()[1]
+
+    def invalidate_shortcuts(self):
+        """Forget the shortcut names, so they are worked out afresh"""
+        self._shortcuts = None
 
 
 class AccountGroupCollection(BaseApiModel):
@@ -208,10 +366,17 @@ class AccountGroupCollection(BaseApiModel):
         """
         return emma.model.group.Group(self.account, raw)
 
-    def fetch_all(self, group_types=None):
+    def fetch_all(self, group_types=None, workers=None):
         """
-        Lazy-loads the full set of :class:`Group` objects
+        Lazy-loads the full set of :class:`Group` objects, remembering the
+        listing separately for each combination of ``group_types``. A listing
+        of more types answers a request for fewer without another download.
 
+        :param group_types: Limit to these group types (regular groups only
+                            by default)
+        :type group_types: :class:`list` of :class:`str`
+        :param workers: Fetch pages concurrently on this many threads
+        :type workers: :class:`int`
         :rtype: :class:`dict` of :class:`Group` objects
 
         Usage::
@@ -226,11 +391,39 @@ class AccountGroupCollection(BaseApiModel):
         """
         path = '/groups'
         params = {'group_types': group_types} if group_types else {}
-        if not self._dict:
-            self._dict = dict(
-                (x['member_group_id'], emma.model.group.Group(self.account, x))
-                    for x in self.account.adapter.paginated_get(path, params))
-        return self._dict
+        key = frozenset(group_types or [GroupType.RegularGroup])
+        return self._fetch_keyed(key, lambda: dict(
+            (x['member_group_id'], emma.model.group.Group.load(self.account, x))
+                for x in self.account.adapter.paginated_get(
+                    path, params, workers)), self._narrow)
+
+    @staticmethod
+    def _narrow(known, wanted, items):
+        """Picks the groups of the wanted types from a wider listing"""
+        if not wanted <= known or any('group_type' not in x for _, x in items):
+            return None
+        return [x for x, group in items if group['group_type'] in wanted]
+
+    def iter_all(self, group_types=None):
+        """
+        Streams the full set of :class:`Group` objects a page at a time,
+        without caching them in this collection
+
+        :param group_types: Limit to these group types
+        :type group_types: :class:`list` of :class:`str`
+        :rtype: :class:`generator` of :class:`Group` objects
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> for group in acct.groups.iter_all():
+            ...     print group['group_name']
+        """
+        path = '/groups'
+        params = {'group_types': group_types} if group_types else {}
+        return (emma.model.group.Group.load(self.account, x)
+                for x in self.account.adapter.iter_paginated(path, params))
 
     def find_one_by_group_id(self, group_id):
         """
@@ -257,7 +450,7 @@ class AccountGroupCollection(BaseApiModel):
             group = emma.model.group
             raw = self.account.adapter.get(path)
             if raw:
-                self._dict[group_id] = group.Group(self.account, raw)
+                self._dict[group_id] = group.Group.load(self.account, raw)
 
         return (group_id in self._dict) and self._dict[group_id] or None
 
@@ -287,8 +480,9 @@ class AccountGroupCollection(BaseApiModel):
         data = {'groups': [x.extract() for x in groups]}
         added = self.account.adapter.post(path, data)
         self._dict.update(dict(
-            (x['member_group_id'], emma.model.group.Group(self.account, x))
+            (x['member_group_id'], emma.model.group.Group.load(self.account, x))
                 for x in added))
+        self._result_sets = None
 
 
 class AccountImportCollection(BaseApiModel):
@@ -312,10 +506,12 @@ class AccountImportCollection(BaseApiModel):
     def __delitem__(self, key):
         self.delete([key])
 
-    def fetch_all(self):
+    def fetch_all(self, workers=None):
         """
         Lazy-loads the full set of :class:`Import` objects
 
+        :param workers: Fetch pages concurrently on this many threads
+        :type workers: :class:`int`
         :rtype: :class:`dict` of :class:`Import` objects
 
         Usage::
@@ -331,7 +527,8 @@ class AccountImportCollection(BaseApiModel):
             import_ = emma.model.member_import
             self._dict = dict(
                 (x['import_id'], import_.MemberImport(self.account, x))
-                    for x in self.account.adapter.paginated_get(path, {}))
+                    for x in self.account.adapter.paginated_get(
+                        path, {}, workers))
         return self._dict
 
     def find_one_by_import_id(self, import_id):
@@ -363,6 +560,49 @@ class AccountImportCollection(BaseApiModel):
 
         return (import_id in self._dict) and self._dict[import_id] or None
 
+    def track(self, import_ids, **options):
+        """
+        Watches imports until they finish, see :class:`ImportTracker`
+
+        :param import_ids: The imports to watch
+        :type import_ids: :class:`list` of :class:`int`
+        :param options: Polling options for the :class:`ImportTracker`
+        :type options: :class:`dict`
+        :rtype: :class:`ImportTracker`
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> tracker = acct.imports.track([2001, 2002], max_interval=30)
+            >>> tracker.wait()
+            {2001: <MemberImport>, 2002: <MemberImport>}
+        """
+        return emma.model.member_import.ImportTracker(
+            self, import_ids, **options)
+
+    def wait(self, import_ids, timeout=None, **options):
+        """
+        Blocks until every import has finished
+
+        :param import_ids: The imports to wait for
+        :type import_ids: :class:`list` of :class:`int`
+        :param timeout: Give up (raising :class:`ImportTimeoutError`) after
+                        this many seconds
+        :type timeout: :class:`float`
+        :param options: Polling options for the :class:`ImportTracker`
+        :type options: :class:`dict`
+        :rtype: :class:`dict` of :class:`MemberImport` objects
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> acct.imports.wait([2001, 2002], timeout=600)
+            {2001: <MemberImport>, 2002: <MemberImport>}
+        """
+        return self.track(import_ids, **options).wait(timeout)
+
     def delete(self, import_ids=None):
         """
         :param import_ids: Set of import identifiers to delete
@@ -397,8 +637,18 @@ class AccountMemberCollection(BaseApiModel):
     :param account: The Account which owns this collection
     :type account: :class:`Account`
     """
+    IMPORT_CHUNK_SIZE = 5000
+    IMPORT_CHUNK_BYTES = 8 * 1024 * 1024
+    IMPORT_WORKERS = 4
+    LOOKUP_WORKERS = 8
+    SYNC_OVERLAP = timedelta(seconds=1)
+
     def __init__(self, account):
         self.account = account
+        self.schema = Schema()
+        self.sync_mark = None
+        self._emails = None
+        self._emails_of = None
         super(AccountMemberCollection, self).__init__()
 
     def __getitem__(self, key):
@@ -410,9 +660,41 @@ class AccountMemberCollection(BaseApiModel):
             raise KeyError(key)
         return item
 
+    def __setitem__(self, key, value):
+        with self._merging:
+            super(AccountMemberCollection, self).__setitem__(key, value)
+            if 'email' in value:
+                self._email_index()[normalize_email(value['email'])] = key
+
     def __delitem__(self, key):
         self._dict[key].delete()
-        super(AccountMemberCollection, self).__delitem__(key)
+        with self._merging:
+            if 'email' in self._dict[key]:
+                self._email_index().pop(
+                    normalize_email(self._dict[key]['email']), None)
+            super(AccountMemberCollection, self).__delitem__(key)
+
+    def clear(self):
+        super(AccountMemberCollection, self).clear()
+        self.invalidate_emails()
+
+    def _email_index(self):
+        """
+        Maps each cached member's normalized email to its member id. The
+        index is built when first needed, and again whenever the cache is
+        replaced wholesale (as fetching and bulk deletes do).
+        """
+        with self._merging:
+            if self._emails is None or self._emails_of is not self._dict:
+                self._emails = dict(
+                    (normalize_email(x['email']), member_id)
+                    for member_id, x in self._dict.items() if 'email' in x)
+                self._emails_of = self._dict
+            return self._emails
+
+    def invalidate_emails(self):
+        """Forget the email index, so it is built afresh"""
+        self._emails = None
 
     def factory(self, raw=None):
         """
@@ -433,12 +715,16 @@ class AccountMemberCollection(BaseApiModel):
         """
         return Member(self.account, raw)
 
-    def fetch_all(self, deleted=False):
+    def fetch_all(self, deleted=False, workers=None):
         """
-        Lazy-loads the full set of :class:`Member` objects
+        Lazy-loads the full set of :class:`Member` objects, remembering the
+        listing separately for each value of ``deleted``. A listing which
+        includes deleted members answers one which excludes them.
 
         :param deleted: Whether to include deleted members
         :type deleted: :class:`bool`
+        :param workers: Fetch pages concurrently on this many threads
+        :type workers: :class:`int`
         :rtype: :class:`dict` of :class:`Member` objects
 
         Usage::
@@ -450,11 +736,115 @@ class AccountMemberCollection(BaseApiModel):
         """
         path = '/members'
         params = {"deleted": True} if deleted else {}
-        if not self._dict:
-            self._dict = dict(
-                (x['member_id'], Member(self.account, x)) for x in
-                    self.account.adapter.paginated_get(path, params))
-        return self._dict
+        return self._fetch_keyed(bool(deleted), lambda: dict(
+            (x['member_id'], Member.load(self.account, x)) for x in
+                self.account.adapter.paginated_get(path, params, workers)),
+            self._narrow)
+
+    @staticmethod
+    def _narrow(known, wanted, items):
+        """Picks the current members from a listing including deleted ones"""
+        if wanted or not known:
+            return None
+        if any('deleted_at' not in x for _, x in items):
+            return None
+        return [x for x, member in items if not member.is_deleted()]
+
+    def iter_all(self, deleted=False):
+        """
+        Streams the full set of :class:`Member` objects a page at a time,
+        without caching them in this collection
+
+        :param deleted: Whether to include deleted members
+        :type deleted: :class:`bool`
+        :rtype: :class:`generator` of :class:`Member` objects
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> for member in acct.members.iter_all():
+            ...     print member['email']
+        """
+        path = '/members'
+        params = {"deleted": True} if deleted else {}
+        return (Member.load(self.account, x)
+                for x in self.account.adapter.iter_paginated(path, params))
+
+    def sync(self, since=None, in_last=None):
+        """
+        Brings the cache up to date with the members changed since the last
+        sync, rather than fetching them all again. Changes are found with a
+        temporary member search on ``last_modified_at``. The API's time when
+        the sync began (see :meth:`AbstractAdapter.server_time`) becomes the
+        mark (``sync_mark``) for the next one, so a change made while it
+        runs is found again next time; an adapter which cannot tell the time
+        leaves the newest ``last_modified_at`` seen as the mark instead.
+        With no mark yet, every member is fetched afresh from the API.
+
+        A member search never returns deleted members, so deletions are not
+        found: members deleted since the mark stay cached until the cache is
+        cleared (see :meth:`clear`).
+
+        :param since: Look for changes after this time instead of the mark
+        :type since: :class:`datetime`
+        :param in_last: Look for changes within this interval instead, such
+                        as ``{"day": 1}``
+        :type in_last: :class:`dict`
+        :rtype: :class:`dict` of the ``updated`` member ids
+        :raises: :class:`ValueError` if both ``since`` and ``in_last`` are
+                 given
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> acct.members.sync() # first run fetches every member
+            {'updated': [123, 124, ...]}
+            >>> acct.members.sync()
+            {'updated': [124]}
+            >>> acct.members.sync_mark
+            datetime.datetime(2012, 5, 1, 9, 30, 12)
+        """
+        if since is not None and in_last is not None:
+            raise ValueError("Give either since or in_last, not both")
+        since = since or self.sync_mark
+        started = self.account.adapter.server_time()
+        updated = []
+        if since is None and in_last is None:
+            self._result_sets = None
+            members = self.fetch_all().values()
+            updated = [x['member_id'] for x in members]
+        else:
+            qf = QueryFactory
+            if in_last is not None:
+                criteria = qf.in_last('last_modified_at', in_last)
+            else:
+                criteria = qf.gt(
+                    'last_modified_at',
+                    (since - self.SYNC_OVERLAP).strftime(
+                        SERIALIZED_DATETIME_FORMAT))
+            search = emma.model.search.Search(self.account, {
+                'name': u"sync %s" % (since or in_last),
+                'criteria': criteria.to_tuple()})
+            search.save()
+            try:
+                members = list(search.members.iter_all())
+            finally:
+                search.delete()
+            for member in members:
+                self[member['member_id']] = member
+                updated.append(member['member_id'])
+            self._result_sets = None
+
+        marks = [started] if started is not None else [
+            x['last_modified_at'] for x in members
+            if x.get('last_modified_at')]
+        if since is not None:
+            marks.append(since)
+        if marks:
+            self.sync_mark = max(marks)
+        return {'updated': updated}
 
     def fetch_all_by_import_id(self, import_id):
         """
@@ -474,7 +864,7 @@ class AccountMemberCollection(BaseApiModel):
         """
         path = '/members/imports/%s/members' % import_id
         members = dict(
-            (x['member_id'], Member(self.account, x))
+            (x['member_id'], Member.load(self.account, x))
                 for x in self.account.adapter.get(path))
         self._replace_all(members)
         return members
@@ -506,7 +896,7 @@ class AccountMemberCollection(BaseApiModel):
         if member_id not in self._dict:
             raw = self.account.adapter.get(path, params)
             if raw:
-                self._dict[member_id] = Member(self.account, raw)
+                self[member_id] = Member.load(self.account, raw)
 
         return (member_id in self._dict) and self._dict[member_id] or None
 
@@ -533,20 +923,140 @@ class AccountMemberCollection(BaseApiModel):
         """
         path = '/members/email/%s' % email
         params = {"deleted":True} if deleted else {}
-        members = [x for x in self._dict.values() if x['email'] == email]
-        if not members:
-            member = self.account.adapter.get(path, params)
-            if member is not None:
-                self._dict[member['member_id']] = \
-                    Member(self.account, member)
-                return self._dict[member['member_id']]
-        else:
-            member = members[0]
+        member_id = self._email_index().get(normalize_email(email))
+        if member_id in self._dict:
+            return self._dict[member_id]
+        member = self.account.adapter.get(path, params)
+        if member is not None:
+            self[member['member_id']] = Member.load(self.account, member)
+            return self._dict[member['member_id']]
         return member
 
+    def _find_many(self, keys, lookup, cached, path, deleted, workers):
+        """
+        Serves what it can of ``keys`` from the cache, then fetches the rest
+        concurrently, or in a single walk of the listing when the batch is
+        so large a share of the audience that walking its pages takes fewer
+        rounds of requests. ``lookup`` gives the value a key (or a fetched
+        member) is matched on, and ``cached`` the cached member for a key,
+        if any.
+        """
+        found = {}
+        wanted = {}
+        for key in keys:
+            member = cached(key)
+            if member is not None:
+                found[key] = member
+            else:
+                wanted.setdefault(lookup(key), []).append(key)
+        if not wanted:
+            return found
+
+        def keep(requested, member):
+            self[member['member_id']] = member
+            for key in requested:
+                found[key] = member
+
+        workers = workers or self.LOOKUP_WORKERS
+        params = {"deleted": True} if deleted else {}
+        if (len(wanted) > workers
+                and self._listing_pages(params) * workers < len(wanted)):
+            for member in self.iter_all(deleted):
+                requested = wanted.pop(lookup(member), None)
+                if requested is not None:
+                    keep(requested, member)
+                    if not wanted:
+                        break
+            return found
+
+        requested = wanted.values()
+        raws = map_concurrently(
+            lambda x: self.account.adapter.get(path % x[0], params),
+            requested,
+            workers)
+        for keys, raw in izip(requested, raws):
+            if raw:
+                keep(keys, Member.load(self.account, raw))
+        return found
+
+    def _listing_pages(self, params):
+        """The number of pages in the listing of members, by a count request"""
+        size = self.account.adapter.__class__.MAX_PAGE_SIZE
+        total = self.account.adapter.get(
+            '/members', params, RequestContext(count_only=True)) or 0
+        return -(-total // size)
+
+    def find_many_by_member_id(self, member_ids, deleted=False, workers=None):
+        """
+        Lazy-loads a batch of :class:`Member` objects by id. Cached members
+        are served directly, and the rest fetched concurrently (or, for a
+        batch which is a large share of the audience, picked out of the
+        full listing).
+
+        :param member_ids: The member identifiers
+        :type member_ids: :class:`list` of :class:`int`
+        :param deleted: Whether to include deleted members
+        :type deleted: :class:`bool`
+        :param workers: The most requests in flight at once
+        :type workers: :class:`int`
+        :rtype: :class:`dict` of the :class:`Member` objects found
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> acct.members.find_many_by_member_id([123, 124, 999])
+            {123: <Member>, 124: <Member>}
+        """
+        return self._find_many(
+            member_ids,
+            lambda x: x['member_id'] if isinstance(x, Member) else x,
+            self._dict.get,
+            '/members/%s',
+            deleted,
+            workers)
+
+    def find_many_by_email(self, emails, deleted=False, workers=None):
+        """
+        Lazy-loads a batch of :class:`Member` objects by email address,
+        see :meth:`find_many_by_member_id`
+
+        :param emails: The email addresses
+        :type emails: :class:`list` of :class:`str`
+        :param deleted: Whether to include deleted members
+        :type deleted: :class:`bool`
+        :param workers: The most requests in flight at once
+        :type workers: :class:`int`
+        :rtype: :class:`dict` of the :class:`Member` objects found, by the
+                email address asked for
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> acct.members.find_many_by_email(
+            ...     ["test@example.com", "null@example.com"])
+            {'test@example.com': <Member>}
+        """
+        def lookup(x):
+            if isinstance(x, Member):
+                return normalize_email(x['email']) if 'email' in x else None
+            return normalize_email(x)
+
+        def cached(email):
+            return self._dict.get(self._email_index().get(lookup(email)))
+
+        return self._find_many(
+            emails, lookup, cached, '/members/email/%s', deleted, workers)
+
     def save(self, members=None, filename=None, add_only=False,
              group_ids=None):
         """
+        Uploads the given members in full, and the changes made to cached
+        members. Only emails and fields can be uploaded this way; other
+        changes (such as to ``member_status_id``) stay unsaved until the
+        member's own :meth:`Member.save`.
+
         :param members: List of :class:`Member` objects to save
         :type members: :class:`list` of :class:`Member` objects
         :param filename: An arbitrary string to associate with this import
@@ -573,15 +1083,28 @@ class AccountMemberCollection(BaseApiModel):
             ... ])
             2002
         """
-        if not members and (not self._dict or add_only) :
+        dirty = ([] if add_only
+                 else [x for x in self._dict.values() if x.is_dirty()])
+        if not members and not dirty:
+            return None
+
+        shortcuts = self.account.fields.shortcut_set()
+        changed = []
+        for member in dirty:
+            extracted = member.extract(shortcuts, changes_only=True)
+            sent = (set(extracted) - set(['fields'])
+                    | set(extracted.get('fields', ())))
+            # Some changes (such as member_status_id) cannot be sent
+            if sent & member.dirty_keys():
+                changed.append((member, extracted, sent))
+        if not members and not changed:
             return None
 
         path = '/members'
         data = {
             'members': (
-                ([] if not members else [x.extract() for x in members])
-                + ([] if add_only
-                   else [x.extract() for x in self._dict.values()]))
+                ([] if not members else [x.extract(shortcuts) for x in members])
+                + [x[1] for x in changed])
         }
         if add_only:
             data['add_only'] = add_only
@@ -589,7 +1112,111 @@ class AccountMemberCollection(BaseApiModel):
             data['filename'] = filename
         if group_ids:
             data['group_ids'] = group_ids
-        return self.account.adapter.post(path, data)
+        self._result_sets = None
+        outcome = self.account.adapter.post(path, data)
+        for member, _, sent in changed:
+            member.mark_clean(sent)
+        return outcome
+
+    def _import_chunks(self, members, chunk_size, chunk_bytes):
+        """
+        Extracts members lazily, grouping them into chunks of at most
+        ``chunk_size`` members and (roughly) ``chunk_bytes`` of JSON
+        """
+        shortcuts = self.account.fields.shortcut_set()
+        chunk, size = [], 0
+        for member in members:
+            extracted = member.extract(shortcuts)
+            length = len(json.dumps(extracted)) + 2
+            if chunk and (len(chunk) >= chunk_size
+                          or size + length > chunk_bytes):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(extracted)
+            size += length
+        if chunk:
+            yield chunk
+
+    def bulk_import(self, members, filename=None, add_only=False,
+                    group_ids=None, chunk_size=None, chunk_bytes=None,
+                    workers=None, wait=False, timeout=None):
+        """
+        Imports any number of members as a series of smaller imports, which
+        are submitted concurrently. Members are drawn from ``members`` only
+        as each chunk is built, so a generator over a large file never needs
+        to be held in memory at once.
+
+        :param members: The :class:`Member` objects to save
+        :type members: :class:`iterable` of :class:`Member` objects
+        :param filename: An arbitrary string to associate with each import
+        :type filename: :class:`str`
+        :param add_only: Only add new members, ignore existing members
+        :type add_only: :class:`bool`
+        :param group_ids: Add imported members to this list of groups
+        :type group_ids: :class:`list`
+        :param chunk_size: The most members sent in one import
+        :type chunk_size: :class:`int`
+        :param chunk_bytes: The most (JSON encoded) bytes sent in one import
+        :type chunk_bytes: :class:`int`
+        :param workers: The most imports submitted at once
+        :type workers: :class:`int`
+        :param wait: Block until every import has finished
+        :type wait: :class:`bool`
+        :param timeout: Seconds to wait for the imports to finish
+        :type timeout: :class:`float`
+        :rtype: :class:`list` of :class:`int` import identifiers
+        :raises: :class:`ImportSubmitError` (once every chunk has been
+                 tried) if any chunk was not accepted; it carries the ids
+                 of the imports which were, and the members of those which
+                 were not
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> acct.members.bulk_import(
+            ...     (acct.members.factory({'email': x}) for x in emails),
+            ...     chunk_size=1000, workers=4)
+            [2001, 2002, 2003]
+            >>> acct.members.bulk_import(members, wait=True, timeout=3600)
+            [2004, 2005]
+        """
+        chunk_size = chunk_size or self.IMPORT_CHUNK_SIZE
+        chunk_bytes = chunk_bytes or self.IMPORT_CHUNK_BYTES
+        workers = workers or self.IMPORT_WORKERS
+        extra = {}
+        if add_only:
+            extra['add_only'] = add_only
+        if filename:
+            extra['filename'] = filename
+        if group_ids:
+            extra['group_ids'] = group_ids
+
+        def submit(chunk):
+            try:
+                result = self.account.adapter.post(
+                    '/members', dict(extra, members=chunk))
+            except REQUEST_ERRORS as error:
+                return chunk, None, error
+            if not result or 'import_id' not in result:
+                return chunk, None, ex.NoImportIdError(result)
+            return chunk, result['import_id'], None
+
+        self._result_sets = None
+        import_ids, failures = [], []
+        for chunk, import_id, error in imap_bounded(
+                submit,
+                self._import_chunks(members, chunk_size, chunk_bytes),
+                workers):
+            if error is None:
+                import_ids.append(import_id)
+            else:
+                failures.append((chunk, error))
+        if failures:
+            raise ex.ImportSubmitError(import_ids, failures)
+        if wait and import_ids:
+            self.account.imports.wait(import_ids, timeout)
+        return import_ids
 
     def delete_by_status(self, status):
         """
@@ -741,12 +1368,41 @@ class AccountMailingCollection(BaseApiModel):
             raise KeyError(key)
         return item
 
+    DEFAULT_MAILING_TYPES = (MailingType.Standard, MailingType.Test)
+    DEFAULT_MAILING_STATUSES = (
+        MailingStatus.Pending, MailingStatus.Paused, MailingStatus.Sending,
+        MailingStatus.Canceled, MailingStatus.Complete, MailingStatus.Failed)
+
+    @staticmethod
+    def _fetch_params(include_archived, mailing_types, mailing_statuses,
+                      is_scheduled, with_html_body, with_plaintext):
+        """Builds the HTTP parameters for a mailing listing"""
+        params = {}
+        if include_archived:
+            params['include_archived'] = True
+        if mailing_types:
+            params['mailing_types'] = mailing_types
+        if mailing_statuses:
+            params['mailing_statuses'] = mailing_statuses
+        if is_scheduled:
+            params['is_scheduled'] = True
+        if with_html_body:
+            params['with_html_body'] = True
+        if with_plaintext:
+            params['with_plaintext'] = True
+        return params
+
     def fetch_all(self, include_archived=False, mailing_types=None,
                   mailing_statuses=None, is_scheduled=False,
-                  with_html_body=False, with_plaintext=False):
+                  with_html_body=False, with_plaintext=False, workers=None):
         """
-        Lazy-loads the full set of :class:`Mailing` objects
+        Lazy-loads the full set of :class:`Mailing` objects, remembering the
+        listing separately for each combination of parameters. A listing of
+        more types or statuses (with the other parameters alike) answers a
+        request for fewer without another download.
 
+        :param workers: Fetch pages concurrently on this many threads
+        :type workers: :class:`int`
         :rtype: :class:`dict` of :class:`Mailing` objects
 
         Usage::
@@ -758,25 +1414,55 @@ class AccountMailingCollection(BaseApiModel):
 
         """
         path = '/mailings'
-        params = {}
-        if include_archived:
-            params['include_archived'] = True
-        if mailing_types:
-            params['mailing_types'] = mailing_types
-        if mailing_statuses:
-            params['mailing_statuses'] = mailing_statuses
-        if is_scheduled:
-            params['is_scheduled'] = True
-        if with_html_body:
-            params['with_html_body'] = True
-        if with_plaintext:
-            params['with_plaintext'] = True
-        if not self._dict:
-            mailing = emma.model.mailing
-            self._dict = dict(
-                (x['mailing_id'], mailing.Mailing(self.account, x))
-                    for x in self.account.adapter.paginated_get(path, params))
-        return self._dict
+        params = self._fetch_params(include_archived, mailing_types,
+                                    mailing_statuses, is_scheduled,
+                                    with_html_body, with_plaintext)
+        key = (
+            frozenset(mailing_types or self.DEFAULT_MAILING_TYPES),
+            frozenset(mailing_statuses or self.DEFAULT_MAILING_STATUSES),
+            bool(include_archived), bool(is_scheduled),
+            bool(with_html_body), bool(with_plaintext))
+        mailing = emma.model.mailing
+        return self._fetch_keyed(key, lambda: dict(
+            (x['mailing_id'], mailing.Mailing.load(self.account, x))
+                for x in self.account.adapter.paginated_get(
+                    path, params, workers)), self._narrow)
+
+    @staticmethod
+    def _narrow(known, wanted, items):
+        """Picks the wanted types and statuses from a wider listing"""
+        if (known[2:] != wanted[2:] or not wanted[0] <= known[0]
+                or not wanted[1] <= known[1]):
+            return None
+        if any('mailing_type' not in x or 'mailing_status' not in x
+               for _, x in items):
+            return None
+        return [x for x, mailing in items
+                if mailing['mailing_type'] in wanted[0]
+                and mailing['mailing_status'] in wanted[1]]
+
+    def iter_all(self, include_archived=False, mailing_types=None,
+                 mailing_statuses=None, is_scheduled=False,
+                 with_html_body=False, with_plaintext=False):
+        """
+        Streams the full set of :class:`Mailing` objects a page at a time,
+        without caching them in this collection
+
+        :rtype: :class:`generator` of :class:`Mailing` objects
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> for mailing in acct.mailings.iter_all():
+            ...     print mailing['subject']
+        """
+        path = '/mailings'
+        params = self._fetch_params(include_archived, mailing_types,
+                                    mailing_statuses, is_scheduled,
+                                    with_html_body, with_plaintext)
+        return (emma.model.mailing.Mailing.load(self.account, x)
+                for x in self.account.adapter.iter_paginated(path, params))
 
     def find_one_by_mailing_id(self, mailing_id):
         """
@@ -803,7 +1489,7 @@ class AccountMailingCollection(BaseApiModel):
             mailing = emma.model.mailing
             raw = self.account.adapter.get(path)
             if raw:
-                self._dict[mailing_id] = mailing.Mailing(self.account, raw)
+                self._dict[mailing_id] = mailing.Mailing.load(self.account, raw)
 
         return (mailing_id in self._dict) and self._dict[mailing_id] or None
 
@@ -863,12 +1549,15 @@ class AccountSearchCollection(BaseApiModel):
     def __delitem__(self, key):
         self._dict[key].delete()
 
-    def fetch_all(self, deleted=False):
+    def fetch_all(self, deleted=False, workers=None):
         """
-        Lazy-loads the full set of :class:`Search` objects
+        Lazy-loads the full set of :class:`Search` objects, remembering the
+        listing separately for each value of ``deleted``
 
         :param deleted: Whether to include deleted fields
         :type deleted: :class:`bool`
+        :param workers: Fetch pages concurrently on this many threads
+        :type workers: :class:`int`
         :rtype: :class:`dict` of :class:`Search` objects
 
         Usage::
@@ -881,11 +1570,31 @@ class AccountSearchCollection(BaseApiModel):
         search = emma.model.search
         path = '/searches'
         params = {"deleted":True} if deleted else {}
-        if not self._dict:
-            self._dict = dict(
-                (x['search_id'], search.Search(self.account, x))
-                    for x in self.account.adapter.paginated_get(path, params))
-        return self._dict
+        return self._fetch_keyed(bool(deleted), lambda: dict(
+            (x['search_id'], search.Search.load(self.account, x))
+                for x in self.account.adapter.paginated_get(
+                    path, params, workers)))
+
+    def iter_all(self, deleted=False):
+        """
+        Streams the full set of :class:`Search` objects a page at a time,
+        without caching them in this collection
+
+        :param deleted: Whether to include deleted searches
+        :type deleted: :class:`bool`
+        :rtype: :class:`generator` of :class:`Search` objects
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> for search in acct.searches.iter_all():
+            ...     print search['name']
+        """
+        path = '/searches'
+        params = {"deleted": True} if deleted else {}
+        return (emma.model.search.Search.load(self.account, x)
+                for x in self.account.adapter.iter_paginated(path, params))
 
     def find_one_by_search_id(self, search_id, deleted=False):
         """
@@ -915,7 +1624,7 @@ class AccountSearchCollection(BaseApiModel):
             search = emma.model.search
             raw = self.account.adapter.get(path, params)
             if raw:
-                self._dict[search_id] = search.Search(self.account, raw)
+                self._dict[search_id] = search.Search.load(self.account, raw)
 
         return (search_id in self._dict) and self._dict[search_id] or None
 
@@ -960,10 +1669,12 @@ class AccountTriggerCollection(BaseApiModel):
         """
         return emma.model.trigger.Trigger(self.account, raw)
 
-    def fetch_all(self):
+    def fetch_all(self, workers=None):
         """
         Lazy-loads the full set of :class:`Trigger` objects
 
+        :param workers: Fetch pages concurrently on this many threads
+        :type workers: :class:`int`
         :rtype: :class:`dict` of :class:`Trigger` objects
 
         Usage::
@@ -977,8 +1688,9 @@ class AccountTriggerCollection(BaseApiModel):
         path = '/triggers'
         if not self._dict:
             self._dict = dict(
-                (x['trigger_id'], trigger.Trigger(self.account, x))
-                    for x in self.account.adapter.paginated_get(path))
+                (x['trigger_id'], trigger.Trigger.load(self.account, x))
+                    for x in self.account.adapter.paginated_get(
+                        path, workers=workers))
         return self._dict
 
     def find_one_by_trigger_id(self, trigger_id):
@@ -1006,7 +1718,7 @@ class AccountTriggerCollection(BaseApiModel):
             trigger = emma.model.trigger
             raw = self.account.adapter.get(path)
             if raw:
-                self._dict[trigger_id] = trigger.Trigger(self.account, raw)
+                self._dict[trigger_id] = trigger.Trigger.load(self.account, raw)
 
         return (trigger_id in self._dict) and self._dict[trigger_id] or None
 
@@ -1051,10 +1763,12 @@ class AccountWebHookCollection(BaseApiModel):
         """
         return emma.model.webhook.WebHook(self.account, raw)
 
-    def fetch_all(self):
+    def fetch_all(self, workers=None):
         """
         Lazy-loads the full set of :class:`WebHook` objects
 
+        :param workers: Fetch pages concurrently on this many threads
+        :type workers: :class:`int`
         :rtype: :class:`dict` of :class:`WebHook` objects
 
         Usage::
@@ -1069,7 +1783,8 @@ class AccountWebHookCollection(BaseApiModel):
         if not self._dict:
             self._dict = dict(
                 (x['webhook_id'], webhook.WebHook(self.account, x))
-                    for x in self.account.adapter.paginated_get(path))
+                    for x in self.account.adapter.paginated_get(
+                        path, workers=workers))
         return self._dict
 
     def find_one_by_webhook_id(self, webhook_id):
@@ -1168,10 +1883,12 @@ class AccountWorkflowCollect(BaseApiModel):
         """
         return emma.model.automation.Workflow(self.account, raw)
 
-    def fetch_all(self):
+    def fetch_all(self, workers=None):
         """
         Lazy-loads the full set of :class:`Workflow` objects
 
+        :param workers: Fetch pages concurrently on this many threads
+        :type workers: :class:`int`
         :rtype: :class:`dict` of :class:`Workflow` objects
 
         Usage::
@@ -1186,7 +1903,8 @@ class AccountWorkflowCollect(BaseApiModel):
         if not self._dict:
             self._dict = dict(
                 (x['workflow_id'], automation.Workflow(self.account, x))
-                for x in self.account.adapter.paginated_get(path))
+                for x in self.account.adapter.paginated_get(
+                    path, workers=workers))
         return self._dict
 
     def find_one_by_workflow_id(self, workflow_id):
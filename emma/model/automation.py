@@ -1,6 +1,7 @@
 """Automation models"""
 
-from emma.model import BaseApiModel, str_fields_to_datetime_alt
+from emma.model import (BaseApiModel, SERIALIZED_DATETIME_ALT_FORMAT,
+                        datetime_fields)
 
 
 class Workflow(BaseApiModel):
@@ -20,17 +21,12 @@ class Workflow(BaseApiModel):
         >>> auto
         <Workflow>
     """
+    _datetime_fields = datetime_fields(
+        ['created_at', 'updated_at'], SERIALIZED_DATETIME_ALT_FORMAT)
+
     def __init__(self, account, raw=None):
         self.account = account
         super(Workflow, self).__init__(raw)
 
     # def __repr__(self):
     #     return '<Workflow: {}>'.format(self.workflow_id)
-
-    def _parse_raw(self, raw):
-        raw.update(
-            str_fields_to_datetime_alt(
-                ['created_at', 'updated_at'], raw
-            )
-        )
-        return raw
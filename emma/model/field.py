@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from emma import exceptions as ex
-from emma.model import BaseApiModel, str_fields_to_datetime
+from emma.model import BaseApiModel, datetime_fields
 
 
 class Field(BaseApiModel):
@@ -22,13 +22,17 @@ class Field(BaseApiModel):
         >>> fld
         <Field>
     """
+    _track_changes = True
+    _datetime_fields = datetime_fields(['deleted_at'])
+
     def __init__(self, account, raw=None):
         self.account = account
         super(Field, self).__init__(raw)
 
-    def _parse_raw(self, raw):
-        raw.update(str_fields_to_datetime(['deleted_at'], raw))
-        return raw
+    def __setitem__(self, key, value):
+        super(Field, self).__setitem__(key, value)
+        if key == 'shortcut_name':
+            self.account.fields.invalidate_shortcuts()
 
     def is_deleted(self):
         """
@@ -73,6 +77,7 @@ class Field(BaseApiModel):
             self._dict['deleted_at'] = datetime.now()
         if self._dict['field_id'] in self.account.fields:
             del(self.account.fields._dict[self._dict['field_id']])
+            self.account.fields.invalidate_shortcuts()
 
     def extract(self):
         """
@@ -99,12 +104,17 @@ class Field(BaseApiModel):
         data = self.extract()
         self._dict['field_id'] = self.account.adapter.post(path, data)
         self.account.fields._dict[self._dict['field_id']] = self
+        self.account.fields.invalidate_shortcuts()
+        self.mark_clean()
 
     def _update(self):
-        """Update a single field"""
+        """Update a single field, sending only what has changed"""
         path = '/fields/%s' % self._dict['field_id']
-        data = self.extract()
+        data = self._changes(self.extract()) if self.is_dirty() else {}
+        if not data:
+            return None
         self.account.adapter.put(path, data)
+        self.mark_clean(data.keys() + ['field_id'])
 
     def save(self):
         """
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from emma import exceptions as ex
-from emma.model import BaseApiModel, str_fields_to_datetime
+from emma.model import BaseApiModel, datetime_fields
 import emma.model.member
 
 
@@ -23,15 +23,15 @@ class Group(BaseApiModel):
         >>> grp
         <Group>
     """
+    _track_changes = True
+    _primary_key = 'member_group_id'
+    _datetime_fields = datetime_fields(['deleted_at'])
+
     def __init__(self, account, raw=None):
         self.account = account
         self.members = GroupMemberCollection(self)
         super(Group, self).__init__(raw)
 
-    def _parse_raw(self, raw):
-        raw.update(str_fields_to_datetime(['deleted_at'], raw))
-        return raw
-
     def is_deleted(self):
         """
         Whether a group has been deleted
@@ -100,13 +100,17 @@ class Group(BaseApiModel):
     def _add(self):
         """Add a single group"""
         self.account.groups.save([self])
+        self.mark_clean()
 
     def _update(self):
-        """Update a single group"""
+        """Update a single group, sending only what has changed"""
         path = "/groups/%s" % self._dict['member_group_id']
-        data = self.extract()
+        data = self._changes(self.extract()) if self.is_dirty() else {}
+        if not data:
+            return None
         if not self.account.adapter.put(path, data):
             raise ex.GroupUpdateError()
+        self.mark_clean(data.keys() + ['member_group_id'])
 
     def save(self):
         """
@@ -171,10 +175,36 @@ class GroupMemberCollection(BaseApiModel):
         params = {'deleted': True} if deleted else {}
         if not self._dict:
             self._dict = dict(
-                (x['member_id'], member.Member(self.group.account, x))
+                (x['member_id'], member.Member.load(self.group.account, x))
                     for x in self.group.account.adapter.paginated_get(path, params))
         return self._dict
 
+    def iter_all(self, deleted=False):
+        """
+        Streams the set of :class:`Member` objects a page at a time, without
+        caching them in this collection
+
+        :param deleted: Include deleted members
+        :type deleted: :class:`bool`
+        :rtype: :class:`generator` of :class:`Member` objects
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> grp = acct.groups[1024]
+            >>> for member in grp.members.iter_all():
+            ...     print member['email']
+        """
+        if not 'member_group_id' in self.group:
+            raise ex.NoGroupIdError()
+
+        account = self.group.account
+        path = '/groups/%s/members' % self.group['member_group_id']
+        params = {'deleted': True} if deleted else {}
+        return (emma.model.member.Member.load(account, x)
+                for x in account.adapter.iter_paginated(path, params))
+
     def add_by_id(self, member_ids=None):
         """
         Makes given members part of this group
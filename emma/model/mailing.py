@@ -3,7 +3,7 @@
 from datetime import datetime
 from emma import exceptions as ex
 from emma.enumerations import MailingStatus
-from emma.model import BaseApiModel, str_fields_to_datetime
+from emma.model import BaseApiModel, datetime_fields
 import emma.model.group
 import emma.model.member
 import emma.model.search
@@ -27,6 +27,12 @@ class Mailing(BaseApiModel):
         >>> mlng
         <Mailing>
     """
+    _primary_key = 'mailing_id'
+    _datetime_fields = datetime_fields(
+        ['clicked', 'opened', 'delivery_ts', 'forwarded', 'shared', 'sent',
+         'send_finished', 'send_at', 'archived_ts', 'send_started',
+         'started_or_finished'])
+
     def __init__(self, account, raw=None):
         self.account = account
         super(Mailing, self).__init__(raw)
@@ -35,14 +41,6 @@ class Mailing(BaseApiModel):
         self.messages = MailingMessageCollection(self)
         self.searches = MailingSearchCollection(self)
 
-    def _parse_raw(self, raw):
-        raw.update(str_fields_to_datetime(
-            ['clicked', 'opened', 'delivery_ts', 'forwarded', 'shared', 'sent',
-             'send_finished', 'send_at', 'archived_ts', 'send_started',
-             'started_or_finished'],
-            raw))
-        return raw
-
     def update_status(self, status):
         """
         Update status of a current mailing.
@@ -92,6 +90,24 @@ class Mailing(BaseApiModel):
         """
         return 'archived_ts' in self._dict and bool(self._dict['archived_ts'])
 
+    def is_finished(self):
+        """
+        Whether a mailing has finished sending, so that its reports can no
+        longer change
+
+        :rtype: :class:`bool`
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> mlng = acct.mailings[123]
+            >>> mlng.is_finished()
+            True
+        """
+        return (self._dict.get('mailing_status') == MailingStatus.Complete
+                and bool(self._dict.get('send_finished')))
+
     def archive(self):
         """
         Sets archived timestamp for a mailing.
@@ -260,7 +276,7 @@ class MailingGroupCollection(BaseApiModel):
         path = '/mailings/%s/groups' % self.mailing['mailing_id']
         if not self._dict:
             self._dict = dict(
-                (x['group_id'], group.Group(self.mailing.account, x))
+                (x['group_id'], group.Group.load(self.mailing.account, x))
                     for x in self.mailing.account.adapter.paginated_get(path))
         return self._dict
 
@@ -298,7 +314,7 @@ class MailingMemberCollection(BaseApiModel):
         path = '/mailings/%s/members' % self.mailing['mailing_id']
         if not self._dict:
             self._dict = dict(
-                (x['member_id'], member.Member(self.mailing.account, x))
+                (x['member_id'], member.Member.load(self.mailing.account, x))
                     for x in self.mailing.account.adapter.paginated_get(path))
         return self._dict
 
@@ -336,7 +352,7 @@ class MailingSearchCollection(BaseApiModel):
         path = '/mailings/%s/searches' % self.mailing['mailing_id']
         if not self._dict:
             self._dict = dict(
-                (x['search_id'], search.Search(self.mailing.account, x))
+                (x['search_id'], search.Search.load(self.mailing.account, x))
                     for x in self.mailing.account.adapter.paginated_get(path))
         return self._dict
 
@@ -3,11 +3,23 @@
 from datetime import datetime
 from emma import exceptions as ex
 from emma.enumerations import MemberStatus
-from emma.model import BaseApiModel, str_fields_to_datetime
+from emma.model import BaseApiModel, CompactRecord, Schema, datetime_fields
 import emma.model.group
 import emma.model.mailing
 
 
+def normalize_email(email):
+    """
+    The form of an email address used to match members by email, ignoring
+    case and stray whitespace
+
+    :param email: The email address
+    :type email: :class:`str`
+    :rtype: :class:`str`
+    """
+    return email.strip().lower()
+
+
 class Member(BaseApiModel):
     """
     Encapsulates operations for a :class:`Member`
@@ -17,6 +29,14 @@ class Member(BaseApiModel):
     :param raw: The raw values of this :class:`Member`
     :type raw: :class:`dict`
 
+    Members are kept compactly, as audiences run to millions: values are
+    held in a :class:`CompactRecord` against a schema of field names shared
+    by every member of the account, and the group and mailing collections
+    are only created when first used. Every attribute is a slot, so no
+    instance dictionary is ever allocated; the ``__dict__`` and
+    ``__weakref__`` pointers remain, as the mapping base classes declare no
+    slots (and :class:`IdentityMap` needs weak references).
+
     Usage::
 
         >>> from emma.model.account import Account
@@ -29,20 +49,56 @@ class Member(BaseApiModel):
         >>> mbr.mailings
         <MemberMailingCollection>
     """
+    __slots__ = ('account', '_dict', '_groups', '_mailings', '_changed')
+    # For members made without an account's member collection
+    schema = Schema()
+    _primary_key = 'member_id'
+    _track_changes = True
+    _datetime_fields = datetime_fields(
+        ['last_modified_at', 'member_since', 'deleted_at'])
+
     def __init__(self, account, raw=None):
         self.account = account
-        self.groups = MemberGroupCollection(self)
-        self.mailings = MemberMailingCollection(self)
+        self._groups = None
+        self._mailings = None
+        self._changed = None
         super(Member, self).__init__(raw)
 
+    def __setitem__(self, key, value):
+        super(Member, self).__setitem__(key, value)
+        if key == 'email':
+            self.account.members.invalidate_emails()
+
+    @property
+    def groups(self):
+        """The :class:`MemberGroupCollection` of this member"""
+        if self._groups is None:
+            self._groups = MemberGroupCollection(self)
+        return self._groups
+
+    @property
+    def mailings(self):
+        """The :class:`MemberMailingCollection` of this member"""
+        if self._mailings is None:
+            self._mailings = MemberMailingCollection(self)
+        return self._mailings
+
+    def _refresh(self, raw):
+        email = self._dict.get('email')
+        super(Member, self)._refresh(raw)
+        if self._dict.get('email') != email:
+            self.account.members.invalidate_emails()
+
     def _parse_raw(self, raw):
         if 'fields' in raw:
             raw.update(raw['fields'])
             del(raw['fields'])
-        raw.update(str_fields_to_datetime(
-            ['last_modified_at', 'member_since', 'deleted_at'],
-            raw))
-        return raw
+        return CompactRecord(self._schema(), raw)
+
+    def _schema(self):
+        """The field names shared by the members of this member's account"""
+        members = getattr(self.account, 'members', None)
+        return getattr(members, 'schema', None) or Member.schema
 
     def opt_out(self):
         """
@@ -108,10 +164,13 @@ class Member(BaseApiModel):
             raise ex.NoMemberStatusError()
         return self._dict['member_status_id'] == MemberStatus.OptOut
 
-    def extract(self):
+    def extract(self, shortcuts=None, changes_only=False):
         """
         Extracts data from the model in a format suitable for using with the API
 
+        :param shortcuts: The account's field shortcut names, when extracting
+                          many members at once
+        :type shortcuts: :class:`frozenset` of :class:`str`
         :rtype: :class:`dict`
 
         Usage::
@@ -127,8 +186,14 @@ class Member(BaseApiModel):
 
         extracted = dict(x for x in self._dict.items()
             if x[0] in ['member_id', 'email'])
-        fields = dict(x for x in self._dict.items()
-            if x[0] in self.account.fields.export_shortcuts())
+        if shortcuts is None:
+            shortcuts = self.account.fields.shortcut_set()
+        if changes_only:
+            fields = dict(
+                (x, self._dict[x]) for x in self._changed or ()
+                if x in shortcuts and x in self._dict)
+        else:
+            fields = dict(x for x in self._dict.items() if x[0] in shortcuts)
         if fields:
             extracted['fields'] = fields
 
@@ -147,16 +212,31 @@ class Member(BaseApiModel):
         self['member_status_id'] = outcome['status']
         if 'member_id' in outcome:
             self['member_id'] = outcome['member_id']
+        self.mark_clean()
 
     def _update(self):
-        """Update a single member"""
+        """Update a single member, sending only what has changed"""
+        if not self.is_dirty():
+            return None
         path = "/members/%s" % self._dict['member_id']
-        data = self.extract()
-        if self._dict['member_status_id'] in (
-            MemberStatus.Active, MemberStatus.Error, MemberStatus.OptOut):
+        changes = self.extract(changes_only=True)
+        data = self._changes(changes)
+        if 'fields' in changes:
+            data['fields'] = changes['fields']
+        if ('member_status_id' in self._changed
+                and self._dict['member_status_id'] in (
+                    MemberStatus.Active, MemberStatus.Error,
+                    MemberStatus.OptOut)):
             data['status_to'] = self._dict['member_status_id']
+        if not data:
+            return None
         if not self.account.adapter.put(path, data):
             raise ex.MemberUpdateError()
+        # Changes which cannot be sent this way stay dirty
+        self.mark_clean(
+            [x for x in ('member_id', 'email') if x in data]
+            + data.get('fields', {}).keys()
+            + (['member_status_id'] if 'status_to' in data else []))
 
     def save(self, signup_form_id=None, group_ids=None):
         """
@@ -296,7 +376,7 @@ class MemberMailingCollection(BaseApiModel):
         path = '/members/%s/mailings' % self.member['member_id']
         if not self._dict:
             self._dict = dict(
-                (x['mailing_id'], mailing.Mailing(self.member.account, x))
+                (x['mailing_id'], mailing.Mailing.load(self.member.account, x))
                     for x in self.member.account.adapter.paginated_get(path))
         return self._dict
 
@@ -355,7 +435,7 @@ class MemberGroupCollection(BaseApiModel):
         path = '/members/%s/groups' % self.member['member_id']
         if not self._dict:
             self._dict = dict(
-                (x['member_group_id'], group.Group(self.member.account, x))
+                (x['member_group_id'], group.Group.load(self.member.account, x))
                     for x in self.member.account.adapter.paginated_get(path))
         return self._dict
 
@@ -1,7 +1,12 @@
 """Audience import models"""
 
+import collections
+import threading
+import time
+from multiprocessing.pool import ThreadPool
 from emma import exceptions as ex
-from emma.model import BaseApiModel, str_fields_to_datetime
+from emma.enumerations import ImportStatus
+from emma.model import BaseApiModel, datetime_fields
 from emma.model.member import Member
 
 
@@ -22,15 +27,201 @@ class MemberImport(BaseApiModel):
         >>> mprt
         <MemberImport>
     """
+    _datetime_fields = datetime_fields(['import_started', 'import_finished'])
+
     def __init__(self, account, raw=None):
         self.account = account
         super(MemberImport, self).__init__(raw)
         self.members = ImportMemberCollection(self)
 
-    def _parse_raw(self, raw):
-        raw.update(
-            str_fields_to_datetime(['import_started', 'import_finished'], raw))
-        return raw
+    def is_finished(self):
+        """
+        Whether the API has finished processing this import
+
+        :rtype: :class:`bool`
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> mprt = acct.imports[123]
+            >>> mprt.is_finished()
+            True
+        """
+        return (bool(self._dict.get('import_finished'))
+                or self._dict.get('status') == ImportStatus.Error)
+
+
+class ImportTracker(object):
+    """
+    Watches a set of imports until the API has finished them all. While
+    several are running, one listing of ``/members/imports`` checks on all
+    of them at once, and the time between checks doubles (up to
+    ``max_interval``) for as long as none of them finish.
+
+    :param imports: The collection the imports belong to, which is kept
+                    up to date with their latest status
+    :type imports: :class:`AccountImportCollection`
+    :param import_ids: The imports to watch
+    :type import_ids: :class:`list` of :class:`int`
+    :param interval: Seconds before the next check once an import finishes
+    :type interval: :class:`float`
+    :param max_interval: The longest wait, in seconds, between checks
+    :type max_interval: :class:`float`
+    :param backoff: How much longer to wait after each fruitless check
+    :type backoff: :class:`float`
+
+    Usage::
+
+        >>> from emma.model.account import Account
+        >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+        >>> tracker = acct.imports.track([2001, 2002])
+        >>> tracker.wait(timeout=600)
+        {2001: <MemberImport>, 2002: <MemberImport>}
+        >>> pending = tracker.wait_async(callback=notify)
+        >>> pending.get()
+        {2001: <MemberImport>, 2002: <MemberImport>}
+        >>> for member in tracker.iter_members():
+        ...     print member['email']
+    """
+    INTERVAL = 1.0
+    MAX_INTERVAL = 60.0
+    BACKOFF = 2.0
+
+    def __init__(self, imports, import_ids, interval=None, max_interval=None,
+                 backoff=None):
+        self.imports = imports
+        self.interval = self.INTERVAL if interval is None else interval
+        self.max_interval = (self.MAX_INTERVAL if max_interval is None
+                             else max_interval)
+        self.backoff = self.BACKOFF if backoff is None else backoff
+        self.pending = [int(x) for x in import_ids]
+        self.finished = collections.OrderedDict()
+        self.delay = self.interval
+        self._lock = threading.Lock()
+
+    def clock(self):
+        """The current time in seconds"""
+        return time.time()
+
+    def sleep(self, seconds):
+        """Waits between checks"""
+        time.sleep(seconds)
+
+    def _statuses(self, import_ids):
+        """
+        The latest :class:`MemberImport` for each import, read from the
+        listing when there are several and requested one by one otherwise
+        """
+        account = self.imports.account
+        found = {}
+        if len(import_ids) > 1:
+            wanted = set(import_ids)
+            for raw in account.adapter.iter_paginated('/members/imports'):
+                if raw.get('import_id') in wanted:
+                    found[raw['import_id']] = MemberImport(account, raw)
+                    if len(found) == len(wanted):
+                        break
+        for import_id in import_ids:
+            if import_id not in found:
+                raw = account.adapter.get('/members/imports/%s' % import_id)
+                if raw:
+                    found[import_id] = MemberImport(account, raw)
+        return found
+
+    def poll(self):
+        """
+        Checks once on every import still running
+
+        :rtype: :class:`list` of the :class:`MemberImport` objects found to
+                have finished
+        """
+        with self._lock:
+            if not self.pending:
+                return []
+            latest = self._statuses(self.pending)
+            done = []
+            for import_id in self.pending:
+                if import_id not in latest:
+                    continue
+                self.imports._dict[import_id] = latest[import_id]
+                if latest[import_id].is_finished():
+                    self.finished[import_id] = latest[import_id]
+                    done.append(latest[import_id])
+            self.pending = [x for x in self.pending if x not in self.finished]
+            if done:
+                self.delay = self.interval
+            else:
+                self.delay = min(self.max_interval, self.delay * self.backoff)
+            return done
+
+    def iter_finished(self, timeout=None):
+        """
+        Yields each import as it finishes (those already finished first),
+        checking on the rest with adaptive backoff
+
+        :param timeout: Give up (raising :class:`ImportTimeoutError`) after
+                        this many seconds
+        :type timeout: :class:`float`
+        :rtype: :class:`generator` of :class:`MemberImport` objects
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        for member_import in list(self.finished.values()):
+            yield member_import
+        checked = False
+        while self.pending:
+            if checked:
+                wait = self.delay
+                if deadline is not None:
+                    wait = min(wait, deadline - self.clock())
+                    if wait <= 0:
+                        raise ex.ImportTimeoutError(list(self.pending))
+                self.sleep(wait)
+            checked = True
+            for member_import in self.poll():
+                yield member_import
+
+    def wait(self, timeout=None, callback=None):
+        """
+        Blocks until every import has finished
+
+        :param timeout: Give up (raising :class:`ImportTimeoutError`) after
+                        this many seconds
+        :type timeout: :class:`float`
+        :param callback: Called with each :class:`MemberImport` as it finishes
+        :type callback: :class:`function`
+        :rtype: :class:`dict` of :class:`MemberImport` objects
+        """
+        for member_import in self.iter_finished(timeout):
+            if callback is not None:
+                callback(member_import)
+        return dict(self.finished)
+
+    def wait_async(self, timeout=None, callback=None):
+        """
+        Waits (see :meth:`wait`) on a background thread
+
+        :rtype: :class:`AsyncResult` whose value is the :class:`dict` of
+                :class:`MemberImport` objects
+        """
+        pool = ThreadPool(1)
+        try:
+            return pool.apply_async(self.wait, (timeout, callback))
+        finally:
+            pool.close()
+
+    def iter_members(self, timeout=None):
+        """
+        Streams the members of each import as soon as it finishes
+
+        :param timeout: Give up (raising :class:`ImportTimeoutError`) after
+                        this many seconds
+        :type timeout: :class:`float`
+        :rtype: :class:`generator` of :class:`Member` objects
+        """
+        for member_import in self.iter_finished(timeout):
+            for member in member_import.members.iter_all():
+                yield member
 
 
 class ImportMemberCollection(BaseApiModel):
@@ -65,6 +256,29 @@ class ImportMemberCollection(BaseApiModel):
         path = '/members/imports/%s/members' % self.member_import['import_id']
         if not self._dict:
             self._dict = dict(
-                (x['member_id'], Member(self.member_import.account, x))
+                (x['member_id'], Member.load(self.member_import.account, x))
                     for x in self.member_import.account.adapter.paginated_get(path))
         return self._dict
+
+    def iter_all(self):
+        """
+        Streams the full set of :class:`Member` objects a page at a time,
+        without caching them in this collection
+
+        :rtype: :class:`generator` of :class:`Member` objects
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> imprt = acct.imports[1024]
+            >>> for member in imprt.members.iter_all():
+            ...     print member['email']
+        """
+        if not 'import_id' in self.member_import:
+            raise ex.NoImportIdError()
+
+        account = self.member_import.account
+        path = '/members/imports/%s/members' % self.member_import['import_id']
+        return (Member.load(account, x)
+                for x in account.adapter.iter_paginated(path))
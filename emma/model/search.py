@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from emma import exceptions as ex
-from emma.model import BaseApiModel, str_fields_to_datetime
+from emma.model import BaseApiModel, datetime_fields
 import emma.model.member
 
 
@@ -23,15 +23,14 @@ class Search(BaseApiModel):
         >>> srch
         <Search>
     """
+    _track_changes = True
+    _datetime_fields = datetime_fields(['deleted_at', 'last_run_at'])
+
     def __init__(self, account, raw=None):
         self.account = account
         super(Search, self).__init__(raw)
         self.members = SearchMemberCollection(self)
 
-    def _parse_raw(self, raw):
-        raw.update(str_fields_to_datetime(['deleted_at', 'last_run_at'], raw))
-        return raw
-
     def is_deleted(self):
         """
         Whether a search has been deleted
@@ -100,12 +99,16 @@ class Search(BaseApiModel):
         data = self.extract()
         self._dict['search_id'] = self.account.adapter.post(path, data)
         self.account.searches._dict[self._dict['search_id']] = self
+        self.mark_clean()
 
     def _update(self):
-        """Update a single search"""
+        """Update a single search, sending only what has changed"""
         path = '/searches/%s' % self._dict['search_id']
-        data = self.extract()
+        data = self._changes(self.extract()) if self.is_dirty() else {}
+        if not data:
+            return None
         self.account.adapter.put(path, data)
+        self.mark_clean(data.keys() + ['search_id'])
 
     def save(self):
         """
@@ -169,6 +172,29 @@ class SearchMemberCollection(BaseApiModel):
         if not self._dict:
             member = emma.model.member
             self._dict = dict(
-                (x['member_id'], member.Member(self.search.account, x))
+                (x['member_id'], member.Member.load(self.search.account, x))
                     for x in self.search.account.adapter.paginated_get(path))
         return self._dict
+
+    def iter_all(self):
+        """
+        Streams the full set of :class:`Member` objects a page at a time,
+        without caching them in this collection
+
+        :rtype: :class:`generator` of :class:`Member` objects
+
+        Usage::
+
+            >>> from emma.model.account import Account
+            >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+            >>> srch = acct.searches[1024]
+            >>> for member in srch.members.iter_all():
+            ...     print member['email']
+        """
+        if not 'search_id' in self.search:
+            raise ex.NoSearchIdError()
+
+        member = emma.model.member
+        path = '/searches/%s/members' % self.search['search_id']
+        return (member.Member.load(self.search.account, x)
+                for x in self.search.account.adapter.iter_paginated(path))
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from emma import exceptions as ex
-from emma.model import BaseApiModel, str_fields_to_datetime
+from emma.model import BaseApiModel, datetime_fields
 import emma.model.mailing
 
 
@@ -22,16 +22,18 @@ class Trigger(BaseApiModel):
         >>> acct.triggers[123]
         <Trigger>
     """
+    _track_changes = True
+    _datetime_fields = datetime_fields(['deleted_at', 'start_ts'])
+
     def __init__(self, account, raw=None):
         self.account = account
         super(Trigger, self).__init__(raw)
         self.mailings = TriggerMailingCollection(self)
 
     def _parse_raw(self, raw):
-        raw.update(str_fields_to_datetime(['deleted_at', 'start_ts'], raw))
         if 'parent_mailing' in raw:
             mailing = emma.model.mailing
-            raw['parent_mailing'] = mailing.Mailing(
+            raw['parent_mailing'] = mailing.Mailing.load(
                 self.account,
                 raw['parent_mailing'])
         return raw
@@ -105,12 +107,16 @@ class Trigger(BaseApiModel):
         data = self.extract()
         self._dict['trigger_id'] = self.account.adapter.post(path, data)
         self.account.triggers._dict[self._dict['trigger_id']] = self
+        self.mark_clean()
 
     def _update(self):
-        """Update a single trigger"""
+        """Update a single trigger, sending only what has changed"""
         path = '/triggers/%s' % self._dict['trigger_id']
-        data = self.extract()
+        data = self._changes(self.extract()) if self.is_dirty() else {}
+        if not data:
+            return None
         self.account.adapter.put(path, data)
+        self.mark_clean(data.keys() + ['trigger_id'])
 
     def save(self):
         """
@@ -177,6 +183,6 @@ class TriggerMailingCollection(BaseApiModel):
         if not self._dict:
             mailing = emma.model.mailing
             self._dict = dict(
-                (x['mailing_id'], mailing.Mailing(self.trigger.account, x))
+                (x['mailing_id'], mailing.Mailing.load(self.trigger.account, x))
                     for x in self.trigger.account.adapter.paginated_get(path))
         return self._dict
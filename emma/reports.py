@@ -0,0 +1,130 @@
+"""Harvesting response reports for many mailings at once"""
+
+import time
+from emma import LIST_REPORTS, _report_path
+from emma.adapter import RequestContext, map_concurrently
+from emma.adapter.requests_adapter import REQUEST_ERRORS
+
+
+WORKERS = 10
+
+
+class HarvestedReport(object):
+    """
+    One report of one mailing, as harvested by :func:`harvest_reports`
+
+    :param mailing_id: The mailing reported on
+    :type mailing_id: :class:`int`
+    :param report: The report (from enumerations.Report)
+    :type report: :class:`int`
+
+    ``data`` holds the report (every row, for a list report), or
+    :class:`None` if a request failed, in which case ``error`` holds the
+    exception raised. ``requests`` counts the requests made for the report
+    and ``seconds`` the time spent in them.
+    """
+    def __init__(self, mailing_id, report):
+        self.mailing_id = mailing_id
+        self.report = report
+        self.data = None
+        self.error = None
+        self.requests = 0
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return "<HarvestedReport %s/%s: %s requests, %.3fs>" % (
+            self.mailing_id, self.report, self.requests, self.seconds)
+
+
+def harvest_reports(account, mailing_ids, reports, params=None, workers=None):
+    """
+    Fetches every report for every mailing concurrently, never running
+    more than ``workers`` requests at once in total. Summary reports and
+    the length of each list report are fetched first, then the pages of
+    every list together, so that long lists are paged in parallel too. A
+    failed request is kept with its report; any other error is raised.
+
+    :param account: The account for which these reports apply
+    :type account: :class:`Account`
+    :param mailing_ids: The mailings to report on
+    :type mailing_ids: :class:`list` of :class:`int`
+    :param reports: The reports (from enumerations.Report) to fetch
+    :type reports: :class:`list` of :class:`int`
+    :param params: Optional parameters to pass with every report
+    :type params: :class:`dict`
+    :param workers: The most requests in flight at once
+    :type workers: :class:`int`
+    :rtype: :class:`dict` of :class:`dict` of :class:`HarvestedReport`
+            objects, by mailing id then report
+
+    Usage::
+
+        >>> from emma.enumerations import Report
+        >>> from emma.model.account import Account
+        >>> from emma.reports import harvest_reports
+        >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+        >>> harvested = harvest_reports(
+        ...     acct, acct.mailings.fetch_all().keys(),
+        ...     [Report.MailingSummary, Report.OpenList], workers=20)
+        >>> harvested[123][Report.OpenList]
+        <HarvestedReport 123/4: 7 requests, 1.284s>
+        >>> harvested[123][Report.OpenList].data
+        [{...}, {...}, ...]
+    """
+    adapter = account.adapter
+    size = adapter.__class__.MAX_PAGE_SIZE
+    params = params if params else {}
+    workers = workers or WORKERS
+    jobs = [HarvestedReport(x, y) for x in mailing_ids for y in reports]
+
+    def request(job, context=None):
+        started = time.time()
+        try:
+            value = adapter.get(
+                _report_path(job.report, job.mailing_id), params, context)
+        except REQUEST_ERRORS as error:
+            value = error
+        return job, value, time.time() - started
+
+    def record(results):
+        for job, value, seconds in results:
+            job.requests += 1
+            job.seconds += seconds
+            if isinstance(value, Exception) and job.error is None:
+                job.error = value
+        return [x for x in results if x[0].error is None]
+
+    # Summaries, and the length of each list
+    windows = []
+    for job, value, _ in record(map_concurrently(
+            lambda x: request(x, RequestContext(count_only=True)
+                              if x.report in LIST_REPORTS else None),
+            jobs,
+            workers)):
+        if job.report not in LIST_REPORTS:
+            job.data = value
+        else:
+            job.data = []
+            windows += [(job, x) for x in xrange(0, value or 0, size)]
+
+    # Every page of every list, under the same cap
+    for job, page, _ in record(map_concurrently(
+            lambda x: request(x[0], adapter.window(x[1])), windows, workers)):
+        job.data += page or []
+
+    for job in jobs:
+        # The listing may have grown since it was counted: read on while
+        # the last page came back full
+        while (job.error is None and job.report in LIST_REPORTS
+                and job.data and len(job.data) % size == 0):
+            page = record([request(job, adapter.window(len(job.data)))])
+            if not page or not page[0][1]:
+                break
+            job.data += page[0][1]
+        if job.error is not None:
+            job.data = None
+
+    harvested = {}
+    for job in jobs:
+        harvested.setdefault(job.mailing_id, {})[job.report] = job
+    return harvested
@@ -0,0 +1,171 @@
+"""Per-member engagement timelines, joined across a mailing's reports"""
+
+import collections
+from emma import iter_report
+from emma.enumerations import Report
+from emma.model import parse_datetime
+
+
+STAGES = collections.OrderedDict([
+    (Report.SentList, 'sent'),
+    (Report.DeliveredList, 'delivered'),
+    (Report.OpenList, 'opened'),
+    (Report.ClickList, 'clicked'),
+    (Report.ForwardList, 'forwarded'),
+    (Report.OptOutList, 'opted_out'),
+])
+
+
+class MemberEngagement(object):
+    """
+    How far one member got with a mailing. Each stage (``sent``,
+    ``delivered``, ``opened``, ``clicked``, ``forwarded``, ``opted_out``)
+    holds the time the member first reached it, or :class:`None`; as some
+    reports carry no time, use :meth:`reached` to ask whether a stage was
+    reached at all. ``opens`` and ``clicks`` count every open and click.
+
+    :param member_id: The member
+    :type member_id: :class:`int`
+    """
+    __slots__ = (('member_id', 'email', '_reached', 'opens', 'clicks')
+                 + tuple(STAGES.values()))
+
+    def __init__(self, member_id):
+        self.member_id = member_id
+        self.email = None
+        self._reached = 0
+        self.opens = 0
+        self.clicks = 0
+        for stage in STAGES.values():
+            setattr(self, stage, None)
+
+    def __repr__(self):
+        return "<MemberEngagement %s: %s>" % (
+            self.member_id,
+            ", ".join(x for x in STAGES.values() if self.reached(x)))
+
+    def reached(self, stage):
+        """
+        Whether the member reached a stage
+
+        :param stage: The stage's name, such as ``opened``
+        :type stage: :class:`str`
+        :rtype: :class:`bool`
+        """
+        return bool(self._reached & 1 << STAGES.values().index(stage))
+
+    def _record(self, bit, stage, timestamp):
+        """Notes one row of a stage's report"""
+        self._reached |= bit
+        if timestamp is not None:
+            first = getattr(self, stage)
+            if first is None or timestamp < first:
+                setattr(self, stage, timestamp)
+
+
+class EngagementTimeline(object):
+    """
+    The engagement of every member with one mailing, by member id
+
+    :param mailing_id: The mailing
+    :type mailing_id: :class:`int`
+    """
+    def __init__(self, mailing_id):
+        self.mailing_id = mailing_id
+        self.members = {}
+
+    def __len__(self):
+        return len(self.members)
+
+    def __iter__(self):
+        return self.members.itervalues()
+
+    def __contains__(self, member_id):
+        return member_id in self.members
+
+    def __getitem__(self, member_id):
+        return self.members[member_id]
+
+    def add(self, report, rows, timestamp_field='timestamp'):
+        """
+        Merges a report's rows into the timeline, one pass and one lookup
+        by member id per row
+
+        :param report: The report (a key of :data:`STAGES`)
+        :type report: :class:`int`
+        :param rows: The report's rows
+        :type rows: :class:`iterable` of :class:`dict`
+        :param timestamp_field: The field holding each row's time
+        :type timestamp_field: :class:`str`
+        """
+        stage = STAGES[report]
+        bit = 1 << STAGES.keys().index(report)
+        members = self.members
+        for row in rows:
+            member_id = row.get('member_id')
+            if member_id is None:
+                continue
+            member = members.get(member_id)
+            if member is None:
+                member = members[member_id] = MemberEngagement(member_id)
+            if member.email is None:
+                member.email = row.get('email')
+            timestamp = row.get(timestamp_field)
+            if isinstance(timestamp, basestring):
+                timestamp = parse_datetime(timestamp)
+            member._record(bit, stage, timestamp)
+            if report == Report.OpenList:
+                member.opens += 1
+            elif report == Report.ClickList:
+                member.clicks += 1
+
+    def funnel(self):
+        """
+        How many members reached each stage
+
+        :rtype: :class:`collections.OrderedDict` of counts by stage
+        """
+        counts = [0] * len(STAGES)
+        for member in self.members.itervalues():
+            for i in xrange(len(STAGES)):
+                if member._reached & 1 << i:
+                    counts[i] += 1
+        return collections.OrderedDict(zip(STAGES.values(), counts))
+
+
+def engagement_timeline(account, mailing_id, reports=None, params=None):
+    """
+    Streams a mailing's sent, delivered, open, click, forward and opt-out
+    reports (see :func:`emma.iter_report`) and joins them by member id into
+    an :class:`EngagementTimeline`. Each report is read once, a page at a
+    time, so time grows linearly with the rows and memory with the members
+    (whose rows are reduced to one compact record each as they arrive).
+
+    :param account: The account for which these reports apply
+    :type account: :class:`Account`
+    :param mailing_id: The mailing
+    :type mailing_id: :class:`int`
+    :param reports: The reports to join (defaults to every key of
+                    :data:`STAGES`)
+    :type reports: :class:`list` of :class:`int`
+    :param params: Optional parameters to pass with every report
+    :type params: :class:`dict`
+    :rtype: :class:`EngagementTimeline`
+
+    Usage::
+
+        >>> from emma.model.account import Account
+        >>> from emma.timeline import engagement_timeline
+        >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+        >>> timeline = engagement_timeline(acct, 123)
+        >>> timeline[200]
+        <MemberEngagement 200: sent, delivered, opened, clicked>
+        >>> timeline[200].clicked - timeline[200].opened
+        datetime.timedelta(0, 95)
+        >>> timeline.funnel()
+        OrderedDict([('sent', 1000000), ('delivered', 987011), ...])
+    """
+    timeline = EngagementTimeline(mailing_id)
+    for report in reports or STAGES.keys():
+        timeline.add(report, iter_report(account, report, mailing_id, params))
+    return timeline
@@ -0,0 +1,266 @@
+"""A local store of response reports"""
+
+import json
+import sqlite3
+import threading
+import time
+from emma import LIST_REPORTS, get_report
+from emma.adapter import map_concurrently
+from emma.model.mailing import Mailing
+from emma.reports import WORKERS, harvest_reports
+
+
+class ReportWarehouse(object):
+    """
+    Keeps response reports in a SQLite database, by mailing and report.
+    Reports on mailings which have finished sending can no longer change,
+    so they are served from the database for good; those on mailings still
+    in flight are fetched afresh (and stored again) every time.
+
+    :param path: The database file, or ``:memory:`` for one which lasts
+                 only as long as the warehouse
+    :type path: :class:`str`
+
+    Usage::
+
+        >>> from emma.enumerations import Report
+        >>> from emma.model.account import Account
+        >>> from emma.warehouse import ReportWarehouse
+        >>> acct = Account(1234, "08192a3b4c5d6e7f", "f7e6d5c4b3a29180")
+        >>> warehouse = ReportWarehouse('/var/lib/emma/reports.db')
+        >>> warehouse.get_report(acct, Report.OpenList, 123)
+        [{...}, {...}, ...]
+        >>> warehouse.refresh(acct, acct.mailings.fetch_all().keys(),
+        ...                   [Report.MailingSummary, Report.OpenList])
+        >>> for mailing_id, row in warehouse.rows(Report.OpenList):
+        ...     print mailing_id, row['email']
+    """
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS reports (
+            mailing_id INTEGER NOT NULL,
+            report INTEGER NOT NULL,
+            params TEXT NOT NULL,
+            final INTEGER NOT NULL,
+            fetched REAL NOT NULL,
+            PRIMARY KEY (mailing_id, report, params))""",
+        """CREATE TABLE IF NOT EXISTS report_rows (
+            mailing_id INTEGER NOT NULL,
+            report INTEGER NOT NULL,
+            params TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (mailing_id, report, params, position))""",
+    )
+    BATCH_SIZE = 1000
+    MAX_IDS = 900
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            with self.connection:
+                for statement in self.SCHEMA:
+                    self.connection.execute(statement)
+
+    @staticmethod
+    def _params_key(params):
+        """Identifies a set of report parameters"""
+        return json.dumps(params or {}, sort_keys=True)
+
+    def is_final(self, mailing_id, report, params=None):
+        """
+        Whether a report is stored for good
+
+        :rtype: :class:`bool`
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT final FROM reports"
+                " WHERE mailing_id = ? AND report = ? AND params = ?",
+                (mailing_id, report, self._params_key(params))).fetchone()
+        return bool(row and row[0])
+
+    def load(self, mailing_id, report, params=None):
+        """
+        A stored report, or :class:`None` if there is none
+
+        :param mailing_id: The mailing reported on
+        :type mailing_id: :class:`int`
+        :param report: The report (from enumerations.Report)
+        :type report: :class:`int`
+        :param params: The parameters the report was fetched with
+        :type params: :class:`dict`
+        :rtype: :class:`list` for a list report, else :class:`dict`
+        """
+        key = (mailing_id, report, self._params_key(params))
+        with self._lock:
+            if not self.connection.execute(
+                    "SELECT 1 FROM reports"
+                    " WHERE mailing_id = ? AND report = ? AND params = ?",
+                    key).fetchone():
+                return None
+            data = [json.loads(x[0]) for x in self.connection.execute(
+                "SELECT data FROM report_rows"
+                " WHERE mailing_id = ? AND report = ? AND params = ?"
+                " ORDER BY position",
+                key)]
+        if report in LIST_REPORTS:
+            return data
+        return data[0] if data else None
+
+    def store(self, mailing_id, report, data, final, params=None):
+        """
+        Stores a report, replacing any stored before
+
+        :param mailing_id: The mailing reported on
+        :type mailing_id: :class:`int`
+        :param report: The report (from enumerations.Report)
+        :type report: :class:`int`
+        :param data: The report as the API returned it
+        :type data: :class:`list` or :class:`dict`
+        :param final: Whether the report can no longer change
+        :type final: :class:`bool`
+        :param params: The parameters the report was fetched with
+        :type params: :class:`dict`
+        """
+        key = (mailing_id, report, self._params_key(params))
+        rows = data if report in LIST_REPORTS else [data]
+        with self._lock:
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM report_rows"
+                    " WHERE mailing_id = ? AND report = ? AND params = ?",
+                    key)
+                self.connection.executemany(
+                    "INSERT INTO report_rows VALUES (?, ?, ?, ?, ?)",
+                    (key + (i, json.dumps(x))
+                     for i, x in enumerate(rows or [])))
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?)",
+                    key + (int(bool(final)), time.time()))
+
+    def _is_finished(self, account, mailing_id):
+        """Asks the API whether a mailing has finished sending"""
+        raw = account.adapter.get('/mailings/%s' % mailing_id)
+        return bool(raw) and Mailing.load(account, raw).is_finished()
+
+    def get_report(self, account, report, mailing_id, params=None,
+                   workers=None):
+        """
+        A report, from the warehouse if it is final and otherwise from the
+        API (see :func:`emma.get_report`). A report the API does not find is
+        not stored.
+
+        :param account: The account for which these reports apply
+        :type account: :class:`Account`
+        :param report: The report (from enumerations.Report)
+        :type report: :class:`int`
+        :param mailing_id: The mailing reported on
+        :type mailing_id: :class:`int`
+        :param params: Optional parameters to pass
+        :type params: :class:`dict`
+        :param workers: Fetch the pages of a list report concurrently on
+                        this many threads
+        :type workers: :class:`int`
+        :rtype: :class:`list` for a list report, else :class:`dict`
+        """
+        if self.is_final(mailing_id, report, params):
+            return self.load(mailing_id, report, params)
+        # Checked first, so that the report fetched is at least as new
+        final = self._is_finished(account, mailing_id)
+        data = get_report(account, report, mailing_id, params, workers)
+        if data is not None:
+            self.store(mailing_id, report, data, final, params)
+        return data
+
+    def refresh(self, account, mailing_ids, reports, params=None,
+                workers=None):
+        """
+        Harvests (see :func:`emma.reports.harvest_reports`) every report
+        not yet stored for good. Whether each mailing has finished sending
+        is asked first, under the same cap on requests in flight.
+
+        :param account: The account for which these reports apply
+        :type account: :class:`Account`
+        :param mailing_ids: The mailings to report on
+        :type mailing_ids: :class:`list` of :class:`int`
+        :param reports: The reports (from enumerations.Report) to store
+        :type reports: :class:`list` of :class:`int`
+        :param params: Optional parameters to pass with every report
+        :type params: :class:`dict`
+        :param workers: The most requests in flight at once
+        :type workers: :class:`int`
+        :rtype: :class:`list` of the :class:`HarvestedReport` objects which
+                failed
+        """
+        stale = [x for x in mailing_ids
+                 if not all(self.is_final(x, y, params) for y in reports)]
+        finished = dict(zip(stale, map_concurrently(
+            lambda x: self._is_finished(account, x), stale,
+            workers or WORKERS)))
+        failed = []
+        harvested = harvest_reports(account, stale, reports, params, workers)
+        for mailing_id, by_report in harvested.items():
+            for report, result in by_report.items():
+                if result.error is not None:
+                    failed.append(result)
+                elif (result.data is not None
+                        and not self.is_final(mailing_id, report, params)):
+                    self.store(mailing_id, report, result.data,
+                               finished[mailing_id], params)
+        return failed
+
+    def rows(self, report, mailing_ids=None, params=None):
+        """
+        Every stored row of a report, across mailings. Rows are read
+        :attr:`BATCH_SIZE` at a time, and the mailings asked for
+        :attr:`MAX_IDS` at a time, so that no more than a batch is held in
+        memory and no query has more parameters than SQLite allows.
+
+        :param report: The report (from enumerations.Report)
+        :type report: :class:`int`
+        :param mailing_ids: Only rows for these mailings
+        :type mailing_ids: :class:`list` of :class:`int`
+        :param params: The parameters the reports were fetched with
+        :type params: :class:`dict`
+        :rtype: :class:`generator` of (mailing id, row) :class:`tuple`
+        """
+        if mailing_ids is None:
+            chunks = [None]
+        else:
+            mailing_ids = sorted(set(mailing_ids))
+            chunks = [mailing_ids[x:x + self.MAX_IDS]
+                      for x in xrange(0, len(mailing_ids), self.MAX_IDS)]
+        for chunk in chunks:
+            query = ("SELECT mailing_id, position, data FROM report_rows"
+                     " WHERE report = ? AND params = ?")
+            args = [report, self._params_key(params)]
+            if chunk is not None:
+                query += " AND mailing_id IN (%s)" % ", ".join(
+                    "?" * len(chunk))
+                args += chunk
+            last = None
+            while True:
+                # Each batch resumes after the last row read rather than
+                # holding a cursor open, as storing a report meanwhile
+                # would reset it
+                after, after_args = "", []
+                if last is not None:
+                    after = (" AND (mailing_id > ?"
+                             " OR (mailing_id = ? AND position > ?))")
+                    after_args = [last[0], last[0], last[1]]
+                with self._lock:
+                    batch = self.connection.execute(
+                        query + after
+                        + " ORDER BY mailing_id, position LIMIT ?",
+                        args + after_args + [self.BATCH_SIZE]).fetchall()
+                for mailing_id, _, data in batch:
+                    yield mailing_id, json.loads(data)
+                if len(batch) < self.BATCH_SIZE:
+                    break
+                last = batch[-1][:2]
+
+    def close(self):
+        """Closes the database"""
+        self.connection.close()
@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+from emma.adapter import AbstractAdapter
+from emma.adapter.async_adapter import AsyncAdapter, gather
+
+
+class RecordingAdapter(AbstractAdapter):
+    """Echoes each call back, tracking how many are in flight at once"""
+    def __init__(self, auth, **options):
+        self.options = options
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.closed = False
+
+    def _call(self, method, path, params):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.005)
+        with self.lock:
+            self.in_flight -= 1
+        return (method, path, params)
+
+    def get(self, path, params=None, context=None):
+        return self._call('GET', path, params)
+
+    def post(self, path, data=None):
+        return self._call('POST', path, data)
+
+    def put(self, path, data=None):
+        return self._call('PUT', path, data)
+
+    def delete(self, path, params=None):
+        return self._call('DELETE', path, params)
+
+    def close(self):
+        self.closed = True
+
+
+class AsyncAdapterTest(unittest.TestCase):
+    def setUp(self):
+        self.blocking_adapter = AsyncAdapter.blocking_adapter
+        AsyncAdapter.blocking_adapter = RecordingAdapter
+        self.adapter = AsyncAdapter(
+            {"account_id": "100", "public_key": "xxx", "private_key": "yyy"},
+            concurrency=4)
+
+    def tearDown(self):
+        self.adapter.close()
+        AsyncAdapter.blocking_adapter = self.blocking_adapter
+
+    def test_connection_pool_matches_concurrency(self):
+        self.assertEquals(self.adapter.adapter.options, {'pool_maxsize': 4})
+
+    def test_verbs_return_pending_results(self):
+        pending = self.adapter.get('/members/200', {'deleted': True})
+        self.assertEquals(
+            pending.get(1), ('GET', '/members/200', {'deleted': True}))
+        self.assertEquals(
+            self.adapter.post('/members', {}).get(1),
+            ('POST', '/members', {}))
+        self.assertEquals(
+            self.adapter.put('/members/200', {}).get(1),
+            ('PUT', '/members/200', {}))
+        self.assertEquals(
+            self.adapter.delete('/members/200').get(1),
+            ('DELETE', '/members/200', None))
+
+    def test_gather_keeps_submission_order(self):
+        pending = [self.adapter.get('/members/%s' % x) for x in range(20)]
+        self.assertEquals(
+            [x[1] for x in gather(pending, 5)],
+            ['/members/%s' % x for x in range(20)])
+
+    def test_concurrency_is_bounded(self):
+        gather([self.adapter.get('/members/%s' % x) for x in range(40)], 5)
+        self.assertTrue(1 < self.adapter.adapter.peak <= 4)
+
+    def test_errors_surface_when_waited_on(self):
+        def fail():
+            raise ValueError()
+        pending = self.adapter.submit(fail)
+        with self.assertRaises(ValueError):
+            pending.get(1)
+
+    def test_close_releases_blocking_adapter(self):
+        self.adapter.close()
+        self.assertTrue(self.adapter.adapter.closed)
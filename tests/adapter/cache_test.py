@@ -0,0 +1,230 @@
+import json
+import shutil
+import tempfile
+import unittest
+from emma import exceptions as ex
+from emma.adapter.cache import (
+    CacheEntry, DiskCache, MemoryCache, affected, cache_key, resources)
+from emma.adapter.requests_adapter import RequestsAdapter
+from emma.model.account import Account
+from emma.model.group import Group
+from tests.adapter.requests_adapter_test import MockResponse, MockSession
+
+
+class CacheKeyTest(unittest.TestCase):
+    def test_param_order_does_not_matter(self):
+        self.assertEquals(
+            cache_key('/members', {'a': 1, 'b': [2, 3]}),
+            cache_key('/members', {'b': [2, 3], 'a': 1}))
+
+    def test_pagination_window_is_part_of_the_key(self):
+        self.assertNotEquals(
+            cache_key('/members', {}),
+            cache_key('/members', {'start': 500, 'end': 1000}))
+
+    def test_resources_skip_ids(self):
+        self.assertEquals(
+            resources('/members/200/groups'), set(['members', 'groups']))
+
+    def test_writes_affect_the_listings_of_their_objects(self):
+        self.assertEquals(
+            affected('/members'),
+            set(['members', 'groups', 'mailings', 'searches']))
+        self.assertEquals(affected('/webhooks/5'), set(['webhooks']))
+
+
+class CacheEntryTest(unittest.TestCase):
+    def test_freshness_follows_ttl(self):
+        entry = CacheEntry([1], stored=100)
+        self.assertTrue(entry.is_fresh(10, now=105))
+        self.assertFalse(entry.is_fresh(10, now=111))
+        self.assertTrue(entry.is_fresh(None, now=10 ** 9))
+
+    def test_conditional_headers(self):
+        self.assertEquals(CacheEntry([1]).conditional_headers(), {})
+        self.assertEquals(
+            CacheEntry([1], '"abc"', "Sat, 01 Jun 2013 00:00:00 GMT")
+                .conditional_headers(),
+            {'If-None-Match': '"abc"',
+             'If-Modified-Since': "Sat, 01 Jun 2013 00:00:00 GMT"})
+
+
+class MemoryCacheTest(unittest.TestCase):
+    def test_least_recently_used_entries_are_dropped(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set('g', 'a', CacheEntry(1))
+        cache.set('g', 'b', CacheEntry(2))
+        cache.get('g', 'a')
+        cache.set('g', 'c', CacheEntry(3))
+        self.assertEquals(len(cache), 2)
+        self.assertIsNone(cache.get('g', 'b'))
+        self.assertEquals(cache.get('g', 'a').value, 1)
+
+    def test_invalidate_drops_only_the_group(self):
+        cache = MemoryCache()
+        cache.set('members', 'a', CacheEntry(1))
+        cache.set('groups', 'b', CacheEntry(2))
+        cache.invalidate('members')
+        self.assertIsNone(cache.get('members', 'a'))
+        self.assertEquals(cache.get('groups', 'b').value, 2)
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = DiskCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_entries_round_trip(self):
+        self.cache.set('https://x/1/members', 'k', CacheEntry([{'a': 1}], 'e'))
+        entry = DiskCache(self.directory).get('https://x/1/members', 'k')
+        self.assertEquals(entry.value, [{'a': 1}])
+        self.assertEquals(entry.etag, 'e')
+
+    def test_missing_entries(self):
+        self.assertIsNone(self.cache.get('members', 'k'))
+
+    def test_entries_are_stored_as_json(self):
+        self.cache.set('members', 'k', CacheEntry({'a': 1}, 'e', 'lm', 5))
+        with open(self.cache._entry_path('members', 'k')) as stored:
+            self.assertEquals(json.load(stored), {
+                'value': {'a': 1}, 'etag': 'e', 'last_modified': 'lm',
+                'stored': 5})
+
+    def test_unreadable_entries_are_missing(self):
+        self.cache.set('members', 'k', CacheEntry(1))
+        for content in ["cos\nsystem\n(S'true'\ntR.", '[1, 2]', '{"value": 1}',
+                        '{"value": 1, "etag": null, "last_modified": null, '
+                        '"stored": "x"}']:
+            with open(self.cache._entry_path('members', 'k'), 'w') as stored:
+                stored.write(content)
+            self.assertIsNone(self.cache.get('members', 'k'))
+
+    def test_invalidate_and_clear(self):
+        self.cache.set('members', 'a', CacheEntry(1))
+        self.cache.set('groups', 'b', CacheEntry(2))
+        self.cache.invalidate('members')
+        self.assertIsNone(self.cache.get('members', 'a'))
+        self.assertEquals(self.cache.get('groups', 'b').value, 2)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('groups', 'b'))
+
+
+class CachingAdapterTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = MemoryCache(ttl=60)
+        self.adapter = RequestsAdapter(
+            {"account_id": "100", "public_key": "xxx", "private_key": "yyy"},
+            cache=self.cache)
+        self.request = MockSession(self.adapter.session)
+        self.adapter.session.request = self.request
+
+    def expire(self):
+        for entry in self.cache._entries.values():
+            entry.stored -= 61
+
+    def test_fresh_entries_are_served_locally(self):
+        self.request.responses = [MockResponse(200, [1])]
+        self.assertEquals(self.adapter.get('/fields', {'deleted': True}), [1])
+        self.assertEquals(self.adapter.get('/fields', {'deleted': True}), [1])
+        self.assertEquals(len(self.request.calls), 1)
+
+    def test_changing_a_value_does_not_change_the_cache(self):
+        self.request.responses = [
+            MockResponse(200, {'member_group_id': 5, 'group_name': "Test"},
+                         {'ETag': '"v1"'}),
+            MockResponse(304)]
+        account = Account(100, "xxx", "yyy", adapter=self.adapter)
+        group = Group(account, self.adapter.get('/groups/5'))
+        group['group_name'] = "Changed"
+        self.assertEquals(
+            self.adapter.get('/groups/5')['group_name'], "Test")
+
+        self.adapter.get('/groups/5')['group_name'] = "Changed"
+        self.expire()
+        self.assertEquals(
+            self.adapter.get('/groups/5')['group_name'], "Test")
+        self.assertEquals(len(self.request.calls), 2)
+
+    def test_params_and_windows_are_cached_apart(self):
+        self.adapter.get('/members')
+        self.adapter.get('/members', {'deleted': True})
+        self.adapter.get('/members', {'start': 500, 'end': 1000})
+        self.assertEquals(len(self.request.calls), 3)
+
+    def test_stale_entries_are_revalidated(self):
+        self.request.responses = [
+            MockResponse(200, [1], {'ETag': '"v1"'}),
+            MockResponse(304)]
+        self.adapter.get('/groups')
+        self.expire()
+        self.assertEquals(self.adapter.get('/groups'), [1])
+        self.assertEquals(
+            self.request.calls[1][2]['headers'], {'If-None-Match': '"v1"'})
+
+        self.assertEquals(self.adapter.get('/groups'), [1])
+        self.assertEquals(len(self.request.calls), 2)
+
+    def test_changed_responses_replace_the_entry(self):
+        self.request.responses = [
+            MockResponse(200, [1], {'Last-Modified': "yesterday"}),
+            MockResponse(200, [2], {'Last-Modified': "today"})]
+        self.adapter.get('/groups')
+        self.expire()
+        self.assertEquals(self.adapter.get('/groups'), [2])
+        self.assertEquals(
+            self.request.calls[1][2]['headers'],
+            {'If-Modified-Since': "yesterday"})
+        self.assertEquals(self.adapter.get('/groups'), [2])
+        self.assertEquals(len(self.request.calls), 2)
+
+    def test_missing_resources_are_not_cached(self):
+        self.request.responses = [MockResponse(404), MockResponse(404)]
+        self.assertIsNone(self.adapter.get('/members/300'))
+        self.assertIsNone(self.adapter.get('/members/300'))
+        self.assertEquals(len(self.request.calls), 2)
+
+    def test_writes_invalidate_overlapping_resources(self):
+        self.adapter.get('/members')
+        self.adapter.get('/groups')
+        self.adapter.get('/fields')
+        self.adapter.put('/members/200/groups', {'group_ids': [1]})
+        self.adapter.get('/members')
+        self.adapter.get('/groups')
+        self.adapter.get('/fields')
+        self.assertEquals(
+            [x[1] for x in self.request.calls[4:]],
+            ["https://api.e2ma.net/100/members",
+             "https://api.e2ma.net/100/groups"])
+
+    def test_member_writes_invalidate_listings_of_members(self):
+        for path in ('/groups/5/members', '/mailings/6/members', '/fields'):
+            self.adapter.get(path)
+        self.adapter.post('/members', {'members': []})
+        for path in ('/groups/5/members', '/mailings/6/members', '/fields'):
+            self.adapter.get(path)
+        self.assertEquals(
+            [x[1] for x in self.request.calls[4:]],
+            ["https://api.e2ma.net/100/groups/5/members",
+             "https://api.e2ma.net/100/mailings/6/members"])
+
+    def test_failed_writes_still_invalidate(self):
+        self.adapter.get('/members')
+        self.request.responses = [MockResponse(400), MockResponse(200, [])]
+        with self.assertRaises(ex.ApiRequest400):
+            self.adapter.delete('/members/200')
+        self.adapter.get('/members')
+        self.assertEquals(len(self.request.calls), 3)
+
+    def test_accounts_sharing_a_cache_are_kept_apart(self):
+        other = RequestsAdapter(
+            {"account_id": "200", "public_key": "xxx", "private_key": "yyy"},
+            cache=self.cache)
+        other.session.request = self.request
+        self.adapter.get('/fields')
+        other.get('/fields')
+        other.post('/fields', {})
+        self.adapter.get('/fields')
+        self.assertEquals(len(self.request.calls), 3)
@@ -0,0 +1,218 @@
+import threading
+import time
+import unittest
+from emma.adapter import (AbstractAdapter, RequestContext, imap_bounded,
+                          map_concurrently)
+
+
+class PagingAdapter(AbstractAdapter):
+    """Serves a listing of ``total`` rows a window at a time"""
+    def __init__(self, total, grow_by=0):
+        super(PagingAdapter, self).__init__()
+        self.total = total
+        self.grow_by = grow_by
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, path, params=None, context=None):
+        params = dict(params or {}, **self.pagination_add_ons(context))
+        with self.lock:
+            self.calls.append(params)
+        if params.get('count'):
+            total = self.total
+            self.total += self.grow_by
+            return total
+        start = params.get('start', 0)
+        end = params.get('end', self.MAX_PAGE_SIZE)
+        return [{'row': x} for x in range(start, min(end, self.total))]
+
+
+class SlowPagingAdapter(AbstractAdapter):
+    """Serves a differently sized listing per path, yielding between calls"""
+    def get(self, path, params=None, context=None):
+        total = int(path.strip('/'))
+        time.sleep(0.0001)
+        if context.count_only:
+            return total
+        time.sleep(0.0001)
+        return [(path, x)
+                for x in range(context.start, min(context.end, total))]
+
+
+class MapConcurrentlyTest(unittest.TestCase):
+    def test_preserves_order(self):
+        self.assertEquals(
+            map_concurrently(lambda x: x * 2, range(50), 8),
+            [x * 2 for x in range(50)])
+
+    def test_runs_serially_without_workers(self):
+        self.assertEquals(map_concurrently(str, [1, 2], None), ['1', '2'])
+
+    def test_propagates_errors(self):
+        def fail(x):
+            raise ValueError(x)
+        with self.assertRaises(ValueError):
+            map_concurrently(fail, range(5), 3)
+
+
+class ImapBoundedTest(unittest.TestCase):
+    def test_preserves_order(self):
+        self.assertEquals(
+            list(imap_bounded(lambda x: x * 2, range(50), 8)),
+            [x * 2 for x in range(50)])
+
+    def test_runs_serially_without_workers(self):
+        self.assertEquals(list(imap_bounded(str, [1, 2], None)), ['1', '2'])
+
+    def test_draws_items_lazily(self):
+        drawn = []
+        def items():
+            for x in range(100):
+                drawn.append(x)
+                yield x
+        results = imap_bounded(lambda x: x, items(), 4)
+        self.assertEquals(next(results), 0)
+        self.assertTrue(len(drawn) <= 5)
+        results.close()
+
+    def test_propagates_errors(self):
+        def fail(x):
+            raise ValueError(x)
+        with self.assertRaises(ValueError):
+            list(imap_bounded(fail, range(5), 3))
+
+
+class PaginatedGetTest(unittest.TestCase):
+    def test_serial_pagination_walks_windows(self):
+        adapter = PagingAdapter(1200)
+        items = adapter.paginated_get('/members')
+        self.assertEquals([x['row'] for x in items], list(range(1200)))
+        self.assertEquals(len(adapter.calls), 3)
+
+    def test_concurrent_pagination_counts_first(self):
+        adapter = PagingAdapter(1200)
+        adapter.paginated_get('/members', {'deleted': True}, workers=4)
+        self.assertEquals(adapter.calls[0], {'deleted': True, 'count': True})
+
+    def test_concurrent_pagination_reassembles_in_order(self):
+        adapter = PagingAdapter(2250)
+        items = adapter.paginated_get('/members', workers=4)
+        self.assertEquals([x['row'] for x in items], list(range(2250)))
+        self.assertEquals(len(adapter.calls), 6)
+        self.assertEquals(
+            sorted((x.get('start', 0), x.get('end', 500))
+                   for x in adapter.calls[1:]),
+            [(0, 500), (500, 1000), (1000, 1500), (1500, 2000),
+             (2000, 2500)])
+
+    def test_concurrent_pagination_of_empty_listing(self):
+        adapter = PagingAdapter(0)
+        self.assertEquals(adapter.paginated_get('/members', workers=4), [])
+        self.assertEquals(len(adapter.calls), 1)
+
+    def test_concurrent_pagination_picks_up_rows_added_after_count(self):
+        adapter = PagingAdapter(1000, grow_by=20)
+        items = adapter.paginated_get('/members', workers=4)
+        self.assertEquals([x['row'] for x in items], list(range(1020)))
+
+    def test_pagination_leaves_callers_params_alone(self):
+        adapter = PagingAdapter(1200)
+        params = {'deleted': True}
+        adapter.paginated_get('/members', params)
+        adapter.paginated_get('/members', params, workers=4)
+        self.assertEquals(params, {'deleted': True})
+
+
+class IterPaginatedTest(unittest.TestCase):
+    def test_yields_every_item_in_order(self):
+        adapter = PagingAdapter(1200)
+        items = adapter.iter_paginated('/members', {'deleted': True})
+        self.assertEquals([x['row'] for x in items], list(range(1200)))
+        self.assertEquals(
+            adapter.calls,
+            [{'deleted': True},
+             {'deleted': True, 'start': 500, 'end': 1000},
+             {'deleted': True, 'start': 1000, 'end': 1500}])
+
+    def test_fetches_pages_lazily(self):
+        adapter = PagingAdapter(1200)
+        items = adapter.iter_paginated('/members')
+        self.assertEquals(len(adapter.calls), 0)
+        next(items)
+        self.assertEquals(len(adapter.calls), 1)
+        for _ in range(500):
+            next(items)
+        self.assertEquals(len(adapter.calls), 2)
+
+    def test_stops_after_a_full_final_page(self):
+        adapter = PagingAdapter(1000)
+        self.assertEquals(len(list(adapter.iter_paginated('/members'))), 1000)
+        self.assertEquals(len(adapter.calls), 3)
+
+    def test_resumes_from_an_offset(self):
+        adapter = PagingAdapter(1200)
+        items = adapter.iter_paginated('/members', start=750)
+        self.assertEquals([x['row'] for x in items], list(range(750, 1200)))
+        self.assertEquals(
+            adapter.calls,
+            [{'start': 750, 'end': 1250}])
+
+    def test_interleaved_listings_do_not_interfere(self):
+        adapter = PagingAdapter(1200)
+        items = adapter.iter_paginated('/members')
+        next(items)
+        adapter.paginated_get('/groups')
+        self.assertEquals(len(list(items)), 1199)
+
+
+class RequestContextTest(unittest.TestCase):
+    def setUp(self):
+        self.adapter = AbstractAdapter()
+
+    def test_no_context_adds_nothing(self):
+        self.assertEquals(self.adapter.pagination_add_ons(), {})
+
+    def test_first_window_adds_nothing(self):
+        self.assertEquals(
+            self.adapter.pagination_add_ons(self.adapter.window(0)), {})
+
+    def test_later_windows_add_start_and_end(self):
+        self.assertEquals(
+            self.adapter.pagination_add_ons(self.adapter.window(500)),
+            {'start': 500, 'end': 1000})
+
+    def test_partial_windows_add_start_and_end(self):
+        self.assertEquals(
+            self.adapter.pagination_add_ons(RequestContext(0, 20)),
+            {'start': 0, 'end': 20})
+
+    def test_count_only_adds_count(self):
+        self.assertEquals(
+            self.adapter.pagination_add_ons(RequestContext(count_only=True)),
+            {'count': True})
+
+
+class SharedAdapterStressTest(unittest.TestCase):
+    def test_threads_sharing_an_adapter_see_no_cross_talk(self):
+        adapter = SlowPagingAdapter()
+        failures = []
+
+        def worker(total):
+            path = '/%s' % total
+            for workers in (None, 3, None):
+                items = adapter.paginated_get(path, {}, workers)
+                if items != [(path, x) for x in range(total)]:
+                    failures.append((path, workers, len(items)))
+            streamed = list(adapter.iter_paginated(path))
+            if streamed != [(path, x) for x in range(total)]:
+                failures.append((path, 'iter', len(streamed)))
+
+        threads = [threading.Thread(target=worker, args=(x,))
+                   for x in (1750, 1200, 999, 501, 2000, 10, 1500, 700)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEquals(failures, [])
+
@@ -0,0 +1,151 @@
+import threading
+import unittest
+from emma.adapter import AbstractAdapter
+from emma.adapter.ratelimit import TokenBucket
+from emma.adapter.requests_adapter import RequestsAdapter
+from tests.adapter.requests_adapter_test import MockSession
+
+
+class MockTokenBucket(TokenBucket):
+    """Runs on a fake clock which only moves when the bucket sleeps"""
+    def __init__(self, rate, capacity=None):
+        self.now = 1000.0
+        self.slept = []
+        super(MockTokenBucket, self).__init__(rate, capacity)
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_starts_full(self):
+        bucket = MockTokenBucket(10, 5)
+        for _ in range(5):
+            self.assertTrue(bucket.acquire())
+        self.assertEquals(bucket.slept, [])
+
+    def test_capacity_defaults_to_rate(self):
+        self.assertEquals(MockTokenBucket(4).capacity, 4.0)
+
+    def test_slow_rates_still_hold_a_whole_token(self):
+        bucket = MockTokenBucket(0.5)
+        self.assertEquals(bucket.capacity, 1.0)
+        self.assertTrue(bucket.acquire())
+        self.assertTrue(bucket.acquire())
+        self.assertEquals(bucket.slept, [2.0])
+
+    def test_more_tokens_than_capacity_are_refused(self):
+        bucket = MockTokenBucket(10, 5)
+        with self.assertRaises(ValueError):
+            bucket.acquire(6)
+        with self.assertRaises(ValueError):
+            bucket.wait_time(6)
+        self.assertEquals(bucket.slept, [])
+
+    def test_blocks_until_a_token_accrues(self):
+        bucket = MockTokenBucket(10, 1)
+        bucket.acquire()
+        self.assertTrue(bucket.acquire())
+        self.assertEquals(len(bucket.slept), 1)
+        self.assertAlmostEqual(bucket.slept[0], 0.1)
+
+    def test_sustained_rate_matches_refill(self):
+        bucket = MockTokenBucket(20, 5)
+        start = bucket.now
+        for _ in range(105):
+            bucket.acquire()
+        self.assertAlmostEqual(bucket.now - start, 5.0)
+
+    def test_non_blocking_acquire_fails_fast(self):
+        bucket = MockTokenBucket(10, 1)
+        bucket.acquire()
+        self.assertFalse(bucket.acquire(blocking=False))
+        self.assertEquals(bucket.slept, [])
+
+    def test_timeout_gives_up_without_waiting(self):
+        bucket = MockTokenBucket(1, 1)
+        bucket.acquire()
+        self.assertFalse(bucket.acquire(timeout=0.5))
+        self.assertTrue(bucket.acquire(timeout=2))
+
+    def test_wait_time_does_not_spend(self):
+        bucket = MockTokenBucket(10, 1)
+        self.assertEquals(bucket.wait_time(), 0.0)
+        bucket.acquire()
+        self.assertAlmostEqual(bucket.wait_time(), 0.1)
+        bucket.now += 0.1
+        self.assertAlmostEqual(bucket.wait_time(), 0.0)
+        self.assertTrue(bucket.acquire(blocking=False))
+
+    def test_tokens_never_exceed_capacity(self):
+        bucket = MockTokenBucket(10, 3)
+        bucket.now += 60
+        bucket.wait_time()
+        self.assertEquals(bucket.tokens, 3.0)
+
+    def test_threads_never_overspend(self):
+        bucket = TokenBucket(1, 50)
+        taken = []
+
+        def worker():
+            while bucket.acquire(blocking=False):
+                taken.append(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIn(len(taken), (50, 51))
+
+
+class AdapterRateLimitTest(unittest.TestCase):
+    def setUp(self):
+        self.shared = MockTokenBucket(5, 2)
+        AbstractAdapter.global_rate_limit = self.shared
+
+    def tearDown(self):
+        AbstractAdapter.global_rate_limit = None
+
+    def make_adapter(self, account_id, rate_limit=None):
+        adapter = RequestsAdapter(
+            {"account_id": account_id, "public_key": "xxx",
+             "private_key": "yyy"},
+            rate_limit=rate_limit)
+        adapter.session.request = MockSession(adapter.session)
+        return adapter
+
+    def test_no_limit_by_default(self):
+        AbstractAdapter.global_rate_limit = None
+        adapter = self.make_adapter("100")
+        self.assertIsNone(adapter.rate_limit)
+        adapter.get('/members')
+
+    def test_number_becomes_a_bucket(self):
+        adapter = self.make_adapter("100", 3)
+        self.assertIsInstance(adapter.rate_limit, TokenBucket)
+        self.assertEquals(adapter.rate_limit.rate, 3.0)
+
+    def test_every_verb_is_throttled(self):
+        own = MockTokenBucket(100, 4)
+        adapter = self.make_adapter("100", own)
+        adapter.get('/members')
+        adapter.post('/members', {})
+        adapter.put('/members/200', {})
+        adapter.delete('/members/200')
+        self.assertEquals(own.tokens, 0)
+
+    def test_global_limit_is_shared_across_accounts(self):
+        first = self.make_adapter("100")
+        second = self.make_adapter("200")
+        first.get('/members')
+        second.get('/members')
+        self.assertEquals(self.shared.slept, [])
+        first.get('/groups')
+        self.assertEquals(len(self.shared.slept), 1)
+        self.assertAlmostEqual(self.shared.slept[0], 0.2)
@@ -0,0 +1,257 @@
+from datetime import datetime, timedelta
+import json
+import unittest
+import requests.exceptions
+from emma import exceptions as ex
+from emma.adapter.requests_adapter import RequestsAdapter, process_response
+from emma.adapter.retry import RetryPolicy
+
+
+class MockResponse(object):
+    def __init__(self, status_code=200, content=None, headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self):
+        return self.content
+
+
+class MockSession(object):
+    def __init__(self, session, responses=None):
+        self.session = session
+        self.responses = responses or []
+        self.calls = []
+
+    def __call__(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        response = (self.responses.pop(0) if self.responses
+                    else MockResponse(200, True))
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class MockRetryPolicy(RetryPolicy):
+    def __init__(self, **kwargs):
+        super(MockRetryPolicy, self).__init__(**kwargs)
+        self.slept = []
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+
+
+class ProcessResponseTest(unittest.TestCase):
+    def test_returns_decoded_json(self):
+        self.assertEquals(process_response(MockResponse(200, [1])), [1])
+
+    def test_returns_none_for_404(self):
+        self.assertIsNone(process_response(MockResponse(404)))
+
+    def test_raises_for_400(self):
+        with self.assertRaises(ex.ApiRequest400):
+            process_response(MockResponse(400))
+
+    def test_raises_for_other_failures(self):
+        with self.assertRaises(ex.ApiRequestFailed):
+            process_response(MockResponse(500))
+
+
+class RequestsAdapterTest(unittest.TestCase):
+    def setUp(self):
+        self.adapter = RequestsAdapter({
+            "account_id": "100",
+            "public_key": "xxx",
+            "private_key": "yyy"})
+        self.request = MockSession(self.adapter.session)
+        self.adapter.session.request = self.request
+
+    def test_session_carries_authentication(self):
+        self.assertIs(self.adapter.session.auth, self.adapter.auth)
+
+    def test_pool_sizes_default_from_class(self):
+        poolmanager = self.adapter.http.poolmanager
+        self.assertEquals(
+            poolmanager.connection_pool_kw['maxsize'],
+            RequestsAdapter.POOL_MAXSIZE)
+        self.assertEquals(
+            poolmanager.pools._maxsize,
+            RequestsAdapter.POOL_CONNECTIONS)
+
+    def test_pool_sizes_can_be_configured(self):
+        adapter = RequestsAdapter(
+            {"account_id": "100", "public_key": "xxx", "private_key": "yyy"},
+            pool_connections=2,
+            pool_maxsize=25,
+            idle_timeout=5)
+        poolmanager = adapter.http.poolmanager
+        self.assertEquals(poolmanager.connection_pool_kw['maxsize'], 25)
+        self.assertEquals(poolmanager.pools._maxsize, 2)
+        self.assertEquals(adapter.idle_timeout, 5)
+
+    def test_server_time_follows_the_date_header(self):
+        self.request.responses = [MockResponse(200, 3, {
+            'Date': "Tue, 01 May 2012 09:30:12 GMT"})]
+        server_time = self.adapter.server_time()
+        self.assertEquals(self.request.calls[0][2]['params'], {'count': True})
+        self.assertTrue(abs(server_time - datetime(2012, 5, 1, 9, 30, 12))
+                        <= timedelta(seconds=1))
+
+        self.adapter.server_time()
+        self.assertEquals(len(self.request.calls), 1)
+
+    def test_server_time_is_unknown_without_a_date_header(self):
+        self.assertIsNone(self.adapter.server_time())
+
+    def test_every_verb_uses_the_shared_session(self):
+        self.adapter.get('/members', {'deleted': True})
+        self.adapter.post('/members', {'members': []})
+        self.adapter.put('/members/200', {'email': "test@example.com"})
+        self.adapter.delete('/members/200')
+
+        self.assertEquals(len(self.request.calls), 4)
+        self.assertEquals(
+            self.request.calls[0],
+            ('GET', "https://api.e2ma.net/100/members",
+             {'params': {'deleted': True}}))
+        self.assertEquals(
+            self.request.calls[1],
+            ('POST', "https://api.e2ma.net/100/members",
+             {'data': json.dumps({'members': []})}))
+        self.assertEquals(self.request.calls[2][0], 'PUT')
+        self.assertEquals(
+            self.request.calls[3],
+            ('DELETE', "https://api.e2ma.net/100/members/200",
+             {'params': None}))
+
+    def test_idle_connections_are_evicted(self):
+        poolmanager = self.adapter.http.poolmanager
+        pool = poolmanager.connection_from_url("https://api.e2ma.net/")
+        pool.num_connections = 1
+        self.adapter._last_used -= self.adapter.idle_timeout + 1
+
+        self.adapter.get('/members')
+
+        self.assertEquals(len(poolmanager.pools), 0)
+        self.assertEquals(self.adapter.connection_stats()['connections'], 1)
+
+    def test_recent_connections_are_kept(self):
+        poolmanager = self.adapter.http.poolmanager
+        poolmanager.connection_from_url("https://api.e2ma.net/")
+
+        self.adapter.get('/members')
+
+        self.assertEquals(len(poolmanager.pools), 1)
+
+    def test_connection_stats_report_reuse(self):
+        pool = self.adapter.http.poolmanager.connection_from_url(
+            "https://api.e2ma.net/")
+        pool.num_connections = 2
+        for _ in range(5):
+            self.adapter.get('/members')
+
+        self.assertEquals(
+            self.adapter.connection_stats(),
+            {'requests': 5, 'connections': 2, 'reused': 3})
+
+    def test_close_releases_pooled_connections(self):
+        poolmanager = self.adapter.http.poolmanager
+        pool = poolmanager.connection_from_url("https://api.e2ma.net/")
+        pool.num_connections = 1
+
+        self.adapter.close()
+
+        self.assertEquals(len(poolmanager.pools), 0)
+        self.assertEquals(self.adapter.connection_stats()['connections'], 1)
+
+
+class RequestsAdapterRetryTest(unittest.TestCase):
+    def setUp(self):
+        self.retry = MockRetryPolicy(budget=3, budget_refill=0.5)
+        self.adapter = RequestsAdapter(
+            {"account_id": "100", "public_key": "xxx", "private_key": "yyy"},
+            retry=self.retry)
+        self.request = MockSession(self.adapter.session)
+        self.adapter.session.request = self.request
+
+    def test_each_adapter_gets_its_own_policy(self):
+        adapter = RequestsAdapter(
+            {"account_id": "100", "public_key": "xxx", "private_key": "yyy"})
+        other = RequestsAdapter(
+            {"account_id": "200", "public_key": "xxx", "private_key": "yyy"})
+        self.assertIsInstance(adapter.retry, RetryPolicy)
+        self.assertIsNot(adapter.retry, other.retry)
+
+    def test_get_is_retried_after_throttling(self):
+        self.request.responses = [
+            MockResponse(429), MockResponse(503), MockResponse(200, [1])]
+        self.assertEquals(self.adapter.get('/members'), [1])
+        self.assertEquals(len(self.request.calls), 3)
+        self.assertEquals(len(self.retry.slept), 2)
+
+    def test_retry_after_is_honoured(self):
+        self.request.responses = [
+            MockResponse(429, headers={'Retry-After': "7"}),
+            MockResponse(200, [1])]
+        self.adapter.get('/members')
+        self.assertEquals(self.retry.slept, [7.0])
+
+    def test_post_is_not_retried_by_default(self):
+        self.request.responses = [MockResponse(503), MockResponse(200, 1)]
+        with self.assertRaises(ex.ApiRequestFailed):
+            self.adapter.post('/members', {})
+        self.assertEquals(len(self.request.calls), 1)
+
+    def test_client_errors_are_not_retried(self):
+        self.request.responses = [MockResponse(400)]
+        with self.assertRaises(ex.ApiRequest400):
+            self.adapter.put('/members/200', {})
+        self.assertEquals(len(self.request.calls), 1)
+
+    def test_connection_errors_are_retried_for_idempotent_methods(self):
+        self.request.responses = [
+            requests.exceptions.ConnectionError(), MockResponse(200, True)]
+        self.assertTrue(self.adapter.delete('/members/200'))
+        self.assertEquals(len(self.request.calls), 2)
+
+    def test_connection_errors_are_raised_for_post(self):
+        self.request.responses = [requests.exceptions.ConnectionError()]
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.adapter.post('/members', {})
+
+    def test_gives_up_after_max_attempts(self):
+        self.retry.budget = self.retry.tokens = 100
+        self.request.responses = [MockResponse(503)] * 10
+        with self.assertRaises(ex.ApiRequestFailed):
+            self.adapter.get('/members')
+        self.assertEquals(len(self.request.calls), self.retry.max_attempts)
+
+    def test_budget_is_shared_across_requests(self):
+        self.request.responses = [MockResponse(503)] * 4
+        with self.assertRaises(ex.ApiRequestFailed):
+            self.adapter.get('/members')
+        self.assertEquals(len(self.request.calls), 4)
+        self.assertEquals(self.retry.tokens, 0)
+
+        self.request.responses = [MockResponse(503)] * 2
+        with self.assertRaises(ex.ApiRequestFailed):
+            self.adapter.get('/groups')
+        self.assertEquals(len(self.request.calls), 5)
+
+    def test_pagination_resumes_from_the_failing_window(self):
+        class SmallPageAdapter(RequestsAdapter):
+            MAX_PAGE_SIZE = 2
+        adapter = SmallPageAdapter(
+            {"account_id": "100", "public_key": "xxx", "private_key": "yyy"},
+            retry=self.retry)
+        adapter.session.request = self.request
+        self.request.responses = [
+            MockResponse(200, [1, 2]),
+            MockResponse(503),
+            MockResponse(200, [3, 4]),
+            MockResponse(200, [5])]
+        self.assertEquals(adapter.paginated_get('/members'), [1, 2, 3, 4, 5])
+        self.assertEquals(
+            [x[2]['params'] for x in self.request.calls],
+            [{}, {'start': 2, 'end': 4}, {'start': 2, 'end': 4},
+             {'start': 4, 'end': 6}])
@@ -0,0 +1,83 @@
+import time
+import unittest
+from email.utils import formatdate
+from emma.adapter.retry import RetryPolicy, retry_after
+
+
+class MockResponse(object):
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class RetryAfterTest(unittest.TestCase):
+    def test_reads_seconds(self):
+        self.assertEquals(
+            retry_after(MockResponse(429, {'Retry-After': "12"})), 12.0)
+
+    def test_reads_http_dates(self):
+        when = formatdate(time.time() + 30, usegmt=True)
+        wait = retry_after(MockResponse(503, {'Retry-After': when}))
+        self.assertTrue(25 <= wait <= 30)
+
+    def test_ignores_missing_or_garbled_values(self):
+        self.assertIsNone(retry_after(MockResponse(503)))
+        self.assertIsNone(
+            retry_after(MockResponse(503, {'Retry-After': "soon"})))
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, backoff=1, max_backoff=5,
+                                  budget=2, budget_refill=0.5)
+
+    def test_retries_idempotent_methods(self):
+        self.assertTrue(self.policy.allow_retry('GET', 0, MockResponse(503)))
+        self.assertTrue(self.policy.allow_retry('DELETE', 0))
+
+    def test_does_not_retry_post_by_default(self):
+        self.assertFalse(self.policy.allow_retry('POST', 0, MockResponse(503)))
+
+    def test_post_can_be_opted_in(self):
+        policy = RetryPolicy(methods=('GET', 'POST'))
+        self.assertTrue(policy.allow_retry('POST', 0, MockResponse(429)))
+
+    def test_does_not_retry_other_statuses(self):
+        self.assertFalse(self.policy.allow_retry('GET', 0, MockResponse(401)))
+
+    def test_stops_at_max_attempts(self):
+        self.assertFalse(self.policy.allow_retry('GET', 2, MockResponse(503)))
+
+    def test_budget_is_spent_and_refilled(self):
+        self.assertTrue(self.policy.allow_retry('GET', 0))
+        self.assertTrue(self.policy.allow_retry('GET', 0))
+        self.assertFalse(self.policy.allow_retry('GET', 0))
+        self.policy.record_success()
+        self.policy.record_success()
+        self.assertTrue(self.policy.allow_retry('GET', 0))
+
+    def test_budget_refill_is_capped(self):
+        for _ in range(10):
+            self.policy.record_success()
+        self.assertEquals(self.policy.tokens, 2)
+
+    def test_delay_grows_exponentially_with_jitter(self):
+        for attempt, ceiling in ((0, 1), (1, 2), (2, 4), (5, 5)):
+            for _ in range(20):
+                delay = self.policy.delay(attempt)
+                self.assertTrue(0 <= delay <= ceiling)
+
+    def test_delay_follows_retry_after(self):
+        response = MockResponse(429, {'Retry-After': "3"})
+        self.assertEquals(self.policy.delay(0, response), 3)
+
+    def test_retry_after_may_exceed_max_backoff(self):
+        response = MockResponse(429, {'Retry-After': "60"})
+        self.assertEquals(self.policy.delay(0, response), 60)
+
+    def test_retry_after_is_capped(self):
+        response = MockResponse(429, {'Retry-After': "3600"})
+        self.assertEquals(
+            self.policy.delay(0, response), RetryPolicy.MAX_RETRY_AFTER)
+        policy = RetryPolicy(max_retry_after=120)
+        self.assertEquals(policy.delay(0, response), 120)
@@ -0,0 +1,130 @@
+from datetime import datetime
+import math
+import unittest
+from emma import columns
+from emma.columns import MISSING_ID, ReportColumns
+from emma.enumerations import Report
+from emma.model.account import Account
+from tests.model import MockAdapter
+
+
+CLICKS = [
+    {'member_id': 200, 'link_id': 300, 'email': "a@Example.com",
+     'timestamp': "@D:2013-06-01T12:10:00"},
+    {'member_id': 201, 'link_id': 301, 'email': "b@example.org",
+     'timestamp': "@D:2013-06-01T12:50:00"},
+    {'member_id': 200, 'link_id': 300, 'email': "a@example.com",
+     'timestamp': "@D:2013-06-01T14:05:30"},
+    {'member_id': None, 'link_id': 300, 'email': None,
+     'timestamp': None},
+]
+
+
+class PagedAdapter(MockAdapter):
+    """Serves the clicks a page of two at a time"""
+    MAX_PAGE_SIZE = 2
+
+    def get(self, path, params=None, context=None):
+        super(PagedAdapter, self).get(path, params, context)
+        return CLICKS[context.start:context.end]
+
+
+class ReportColumnsTest(unittest.TestCase):
+    """Runs without NumPy (columns are lists)"""
+    numpy = None
+
+    def setUp(self):
+        self.installed = columns.numpy
+        columns.numpy = self.numpy
+        self.clicks = ReportColumns(CLICKS)
+
+    def tearDown(self):
+        columns.numpy = self.installed
+
+    def test_columns_are_typed(self):
+        self.assertEquals(len(self.clicks), 4)
+        self.assertEquals(sorted(self.clicks.columns),
+                          ['email', 'link_id', 'member_id', 'timestamp'])
+        self.assertEquals(self.clicks.kinds['timestamp'], 'datetime')
+        self.assertEquals(self.clicks.kinds['member_id'], 'id')
+        self.assertEquals(self.clicks.kinds['email'], 'object')
+        self.assertEquals(list(self.clicks['link_id']), [300, 301, 300, 300])
+
+    def test_fields_can_be_chosen(self):
+        clicks = ReportColumns(CLICKS, ['link_id'])
+        self.assertEquals(list(clicks.columns), ['link_id'])
+        self.assertFalse('email' in clicks)
+
+    def test_count_by_skips_missing_values(self):
+        self.assertEquals(self.clicks.count_by('member_id'),
+                          {200: 2, 201: 1})
+        self.assertEquals(self.clicks.count_by('link_id'),
+                          {300: 3, 301: 1})
+
+    def test_count_by_domain(self):
+        self.assertEquals(
+            self.clicks.count_by(self.clicks.domains()),
+            {'example.com': 2, 'example.org': 1})
+
+    def test_bucket_counts_by_interval(self):
+        self.assertEquals(
+            list(self.clicks.bucket('timestamp', 3600).items()),
+            [(datetime(2013, 6, 1, 12), 2), (datetime(2013, 6, 1, 14), 1)])
+
+    def test_elapsed_since_a_time(self):
+        elapsed = self.clicks.elapsed('timestamp', datetime(2013, 6, 1, 12))
+        self.assertEquals(list(elapsed[:3]), [600.0, 3000.0, 7530.0])
+        self.assertTrue(elapsed[3] is None or math.isnan(elapsed[3]))
+
+    def test_elapsed_since_another_column(self):
+        self.clicks['delivery_ts'] = ReportColumns(
+            [{'delivery_ts': "@D:2013-06-01T12:00:00"}] * 4)['delivery_ts']
+        elapsed = self.clicks.elapsed('timestamp', 'delivery_ts')
+        self.assertEquals(list(elapsed[:3]), [600.0, 3000.0, 7530.0])
+
+    def test_kinds_are_judged_from_the_first_values(self):
+        sample = columns.SAMPLE_SIZE
+        columns.SAMPLE_SIZE = 1
+        try:
+            clicks = ReportColumns(CLICKS + [
+                {'link_id': "302", 'timestamp': "yesterday"}])
+        finally:
+            columns.SAMPLE_SIZE = sample
+        self.assertEquals(clicks.kinds['link_id'], 'object')
+        self.assertEquals(clicks.kinds['timestamp'], 'object')
+        self.assertEquals(clicks.kinds['member_id'], 'id')
+        self.assertEquals(list(clicks['link_id'])[-1], "302")
+
+    def test_columns_must_match_in_length(self):
+        with self.assertRaises(ValueError):
+            self.clicks['other'] = [1]
+
+    def test_fetch_reads_a_report(self):
+        Account.default_adapter = MockAdapter
+        MockAdapter.expected = CLICKS
+        account = Account(
+            account_id="100", public_key="xxx", private_key="yyy")
+        clicks = ReportColumns.fetch(account, Report.ClickList, 123)
+        self.assertEquals(len(clicks), 4)
+        self.assertEquals(account.adapter.call[1], "/response/123/clicks")
+
+    def test_fetch_reads_a_report_a_page_at_a_time(self):
+        Account.default_adapter = PagedAdapter
+        account = Account(
+            account_id="100", public_key="xxx", private_key="yyy")
+        clicks = ReportColumns.fetch(account, Report.ClickList, 123)
+        self.assertEquals(len(clicks), 4)
+        self.assertEquals(list(clicks['link_id']), [300, 301, 300, 300])
+        self.assertEquals(account.adapter.called, 3)
+
+
+@unittest.skipIf(columns.numpy is None, "NumPy is not installed")
+class NumpyReportColumnsTest(ReportColumnsTest):
+    """Runs with NumPy (columns are arrays)"""
+    numpy = columns.numpy
+
+    def test_columns_are_arrays(self):
+        self.assertEquals(str(self.clicks['timestamp'].dtype),
+                          'datetime64[s]')
+        self.assertEquals(str(self.clicks['member_id'].dtype), 'int64')
+        self.assertEquals(self.clicks['member_id'][3], MISSING_ID)
@@ -1,3 +1,4 @@
+import threading
 from emma.adapter import AbstractAdapter
 
 class MockAdapter(AbstractAdapter):
@@ -13,10 +14,14 @@ class MockAdapter(AbstractAdapter):
         self.called += 1
         self.call = (method, path, params)
 
-    def get(self, path, params=None):
-        self._capture('GET', path, params if params else {})
+    def get(self, path, params=None, context=None):
+        params = dict(params or {}, **self.pagination_add_ons(context))
+        self._capture('GET', path, params)
         if self.__class__.raised:
             raise self.__class__.raised
+        if (context and context.count_only
+                and isinstance(self.__class__.expected, list)):
+            return len(self.__class__.expected)
         return self.__class__.expected
 
     def post(self, path, data=None):
@@ -35,4 +40,48 @@ class MockAdapter(AbstractAdapter):
         self._capture('DELETE', path, params if params else {})
         if self.__class__.raised:
             raise self.__class__.raised
-        return self.__class__.expected
\ No newline at end of file
+        return self.__class__.expected
+
+
+class ImportingAdapter(MockAdapter):
+    """
+    Answers each POST with a new import, and reports an import finished once
+    its status has been read ``finish_after`` times
+    """
+    def __init__(self, *args, **kwargs):
+        self.finish_after = kwargs.pop('finish_after', 2)
+        super(ImportingAdapter, self).__init__(*args, **kwargs)
+        self.posted = []
+        self.imports = []
+        self.reads = {}
+        self.paths = []
+        self.lock = threading.Lock()
+
+    def post(self, path, data=None):
+        with self.lock:
+            self.posted.append(data)
+            import_id = 2000 + len(self.posted)
+            self.imports.append(import_id)
+            return {'import_id': import_id}
+
+    def _status(self, import_id):
+        self.reads[import_id] = self.reads.get(import_id, 0) + 1
+        finished = self.reads[import_id] >= self.finish_after
+        return {
+            'import_id': import_id,
+            'status': "o",
+            'import_finished': "@D:2012-01-01T00:00:00" if finished else None
+        }
+
+    def get(self, path, params=None, context=None):
+        with self.lock:
+            self.called += 1
+            self.paths.append(path)
+        if path == '/members/imports':
+            return [self._status(x) for x in self.imports]
+        if path.endswith('/members'):
+            import_id = int(path.split('/')[-2])
+            return [{'member_id': import_id * 10 + x} for x in range(2)]
+        if path.startswith('/members/imports/'):
+            return self._status(int(path.split('/')[-1]))
+        return []
@@ -1,8 +1,14 @@
+from datetime import datetime
+import gc
+import threading
+import time
 import unittest
 from emma.adapter.requests_adapter import RequestsAdapter
 from emma import exceptions as ex
-from emma.enumerations import GroupType, MemberStatus, MailingStatus, MailingType
-from emma.model.account import (Account, AccountFieldCollection,
+from emma.enumerations import (GroupType, MemberStatus, MailingStatus,
+                               MailingType, Report)
+from emma.adapter.async_adapter import AsyncAdapter, gather
+from emma.model.account import (Account, AsyncAccount, AccountFieldCollection,
                                   AccountImportCollection,
                                   AccountGroupCollection,
                                   AccountMemberCollection,
@@ -13,13 +19,13 @@ from emma.model.account import (Account, AccountFieldCollection,
 from emma.model.field import Field
 from emma.model.group import Group
 from emma.model.mailing import Mailing
-from emma.model.member_import import MemberImport
+from emma.model.member_import import ImportTracker, MemberImport
 from emma.model.member import Member
 from emma.model.search import Search
 from emma.model.trigger import Trigger
 from emma.model.webhook import WebHook
 from emma.model.automation import Workflow
-from tests.model import MockAdapter
+from tests.model import ImportingAdapter, MockAdapter
 
 
 class AccountDefaultAdapterTest(unittest.TestCase):
@@ -45,6 +51,142 @@ class AccountTest(unittest.TestCase):
         self.assertIsInstance(self.account.members, AccountMemberCollection)
 
 
+class AccountIdentityMapTest(unittest.TestCase):
+    def setUp(self):
+        Account.default_adapter = MockAdapter
+        self.account = Account(
+            account_id="100",
+            public_key="xxx",
+            private_key="yyy")
+
+    def test_collections_share_member_instances(self):
+        MockAdapter.expected = [{'member_id': 201, 'email': u"a@example.com"}]
+        member = self.account.members.fetch_all()[201]
+        group = self.account.groups.factory({'member_group_id': 1024})
+        self.assertIs(group.members.fetch_all()[201], member)
+        self.assertIs(self.account.identities.get(Member, 201), member)
+
+    def test_reloading_refreshes_the_shared_instance(self):
+        MockAdapter.expected = [{'member_id': 201, 'email': u"a@example.com"}]
+        member = self.account.members.fetch_all()[201]
+        MockAdapter.expected = [{'member_id': 201, 'email': u"b@example.com"}]
+        group = self.account.groups.factory({'member_group_id': 1024})
+        group.members.fetch_all()
+        self.assertEquals(member['email'], u"b@example.com")
+        self.assertIs(
+            self.account.members.find_one_by_email("b@example.com"), member)
+
+    def test_trigger_shares_parent_mailing(self):
+        MockAdapter.expected = [{'mailing_id': 300}]
+        mailing = self.account.mailings.fetch_all()[300]
+        MockAdapter.expected = {
+            'trigger_id': 400, 'parent_mailing': {'mailing_id': 300}}
+        trigger = self.account.triggers.find_one_by_trigger_id(400)
+        self.assertIs(trigger['parent_mailing'], mailing)
+
+    def test_unused_instances_are_forgotten(self):
+        MockAdapter.expected = [{'member_id': 201}]
+        self.account.members.fetch_all()
+        self.assertEquals(len(self.account.identities), 1)
+        self.account.members.clear()
+        gc.collect()
+        self.assertEquals(len(self.account.identities), 0)
+
+    def test_instances_without_a_key_are_not_shared(self):
+        self.assertIsNot(
+            Member.load(self.account, {'email': u"a@example.com"}),
+            Member.load(self.account, {'email': u"a@example.com"}))
+
+
+class AccountSharedAdapterTest(unittest.TestCase):
+    def test_an_existing_adapter_can_be_shared(self):
+        adapter = MockAdapter()
+        account = Account(
+            account_id="100",
+            public_key="xxx",
+            private_key="yyy",
+            adapter=adapter)
+        self.assertIs(account.adapter, adapter)
+        self.assertIs(account.members.account.adapter, adapter)
+
+
+class AsyncAccountTest(unittest.TestCase):
+    def setUp(self):
+        self.blocking_adapter = AsyncAdapter.blocking_adapter
+        AsyncAdapter.blocking_adapter = MockAdapter
+        self.account = AsyncAccount(
+            account_id="100",
+            public_key="xxx",
+            private_key="yyy",
+            concurrency=4)
+
+    def tearDown(self):
+        self.account.close()
+        AsyncAdapter.blocking_adapter = self.blocking_adapter
+
+    def test_collections_share_the_blocking_adapter(self):
+        self.assertIs(self.account.account.adapter, self.account.adapter.adapter)
+
+    def test_collection_methods_return_pending_results(self):
+        MockAdapter.expected = {'member_id': 200, 'email': u"test@example.com"}
+        pending = self.account.members.find_one_by_member_id(200)
+        member = pending.get(1)
+        self.assertIsInstance(member, Member)
+        self.assertIs(self.account.account.members[200], member)
+
+    def test_fetch_all_returns_a_pending_result(self):
+        MockAdapter.expected = [{'member_group_id': 200}]
+        self.assertIsInstance(self.account.groups.fetch_all().get(1), dict)
+
+    def test_calls_on_one_collection_run_side_by_side(self):
+        lock = threading.Lock()
+        seen = {'in_flight': 0, 'peak': 0}
+
+        def get(path, params=None, context=None):
+            with lock:
+                seen['in_flight'] += 1
+                seen['peak'] = max(seen['peak'], seen['in_flight'])
+            time.sleep(0.01)
+            with lock:
+                seen['in_flight'] -= 1
+            member_id = int(path.split('/')[-1])
+            return {'member_id': member_id,
+                    'email': u"%s@example.com" % member_id}
+        self.account.account.adapter.get = get
+
+        members = gather([self.account.members.find_one_by_member_id(x)
+                          for x in range(200, 208)])
+        self.assertEquals(seen['peak'], 4)
+        cached = self.account.account.members
+        self.assertEquals(sorted(cached._dict), range(200, 208))
+        for member in members:
+            self.assertIs(
+                cached.find_one_by_email(member['email']), member)
+
+    def test_calls_on_different_collections_run_side_by_side(self):
+        met = threading.Event()
+        self.account.account.members.meet = lambda: met.wait(1)
+        self.account.account.groups.meet = met.set
+        self.assertEquals(
+            gather([self.account.members.meet(),
+                    self.account.groups.meet()]),
+            [True, None])
+
+    def test_local_methods_do_not_use_the_pool(self):
+        self.assertIsInstance(
+            self.account.members.factory({'email': u"test@example.com"}),
+            Member)
+
+    def test_get_report_returns_a_pending_result(self):
+        MockAdapter.expected = {'sent': 10}
+        self.assertEquals(
+            self.account.get_report(Report.MailingSummary, 123).get(1),
+            {'sent': 10})
+        self.assertEquals(
+            self.account.adapter.adapter.call,
+            ('GET', '/response/123', {}))
+
+
 class AccountFieldCollectionTest(unittest.TestCase):
     def setUp(self):
         Account.default_adapter = MockAdapter
@@ -179,6 +321,41 @@ class AccountFieldCollectionTest(unittest.TestCase):
             [u"first_name", u"last_name", u"work_phone"]
         )
 
+    def test_shortcut_set_is_worked_out_once(self):
+        MockAdapter.expected = [
+            {'field_id': 200, 'shortcut_name': u"first_name"},
+            {'field_id': 201, 'shortcut_name': u"last_name"}]
+        shortcuts = self.fields.shortcut_set()
+        self.assertEquals(shortcuts, frozenset([u"first_name", u"last_name"]))
+        self.assertIs(self.fields.shortcut_set(), shortcuts)
+        self.fields.export_shortcuts()
+        self.assertEquals(self.fields.account.adapter.called, 1)
+
+    def test_shortcut_set_follows_field_changes(self):
+        MockAdapter.expected = [
+            {'field_id': 200, 'shortcut_name': u"first_name"},
+            {'field_id': 201, 'shortcut_name': u"last_name"}]
+        self.fields.shortcut_set()
+
+        self.fields[200]['shortcut_name'] = u"given_name"
+        self.assertEquals(
+            self.fields.shortcut_set(),
+            frozenset([u"given_name", u"last_name"]))
+
+        MockAdapter.expected = True
+        self.fields[201].delete()
+        self.assertEquals(self.fields.shortcut_set(), frozenset([u"given_name"]))
+
+        MockAdapter.expected = 202
+        self.fields.factory({'shortcut_name': u"work_phone"}).save()
+        self.assertEquals(
+            self.fields.shortcut_set(),
+            frozenset([u"given_name", u"work_phone"]))
+
+        MockAdapter.expected = [{'field_id': 203, 'shortcut_name': u"city"}]
+        self.fields.clear()
+        self.assertEquals(self.fields.shortcut_set(), frozenset([u"city"]))
+
     def test_can_delete_a_single_group_with_del(self):
         # Setup
         MockAdapter.expected = True
@@ -237,6 +414,54 @@ class AccountGroupCollectionTest(unittest.TestCase):
         self.groups.fetch_all()
         self.assertEquals(self.groups.account.adapter.called, 1)
 
+    def test_fetch_all_keys_results_by_group_types(self):
+        MockAdapter.expected = [{'member_group_id': 201, 'group_type': "g"}]
+        self.groups.fetch_all()
+        MockAdapter.expected = [{'member_group_id': 202, 'group_type': "t"}]
+        test_groups = self.groups.fetch_all([GroupType.TestGroup])
+        self.assertEquals(self.groups.account.adapter.called, 2)
+        self.assertEquals(test_groups.keys(), [202])
+        self.assertEquals(self.groups.fetch_all().keys(), [201])
+        self.assertEquals(self.groups.account.adapter.called, 2)
+        self.assertEquals(2, len(self.groups))
+
+    def test_fetch_all_narrows_a_wider_listing_locally(self):
+        MockAdapter.expected = [
+            {'member_group_id': 201, 'group_type': "g"},
+            {'member_group_id': 202, 'group_type': "t"},
+            {'member_group_id': 203, 'group_type': "h"}]
+        self.groups.fetch_all([GroupType.RegularGroup, GroupType.TestGroup,
+                               GroupType.HiddenGroup])
+        self.assertEquals(
+            sorted(self.groups.fetch_all([GroupType.HiddenGroup,
+                                          GroupType.TestGroup])),
+            [202, 203])
+        self.assertEquals(self.groups.fetch_all().keys(), [201])
+        self.assertEquals(self.groups.account.adapter.called, 1)
+
+    def test_fetch_all_downloads_when_types_are_unknown(self):
+        MockAdapter.expected = [{'member_group_id': 201}]
+        self.groups.fetch_all([GroupType.RegularGroup, GroupType.TestGroup])
+        self.groups.fetch_all([GroupType.TestGroup])
+        self.assertEquals(self.groups.account.adapter.called, 2)
+
+    def test_save_forgets_listings(self):
+        MockAdapter.expected = [{'member_group_id': 201, 'group_type': "g"}]
+        self.groups.fetch_all()
+        self.groups.save([self.groups.factory({'group_name': u"New"})])
+        self.groups.fetch_all()
+        self.assertEquals(self.groups.account.adapter.called, 3)
+
+    def test_iter_all_streams_groups(self):
+        MockAdapter.expected = [{'member_group_id': 201}]
+        groups = list(self.groups.iter_all([GroupType.TestGroup]))
+        self.assertIsInstance(groups[0], Group)
+        self.assertEquals(self.groups.account.adapter.called, 1)
+        self.assertEquals(
+            self.groups.account.adapter.call,
+            ('GET', '/groups', {'group_types': [u"t"]}))
+        self.assertEquals(0, len(self.groups))
+
     def test_group_collection_object_can_be_accessed_like_a_dictionary(self):
         MockAdapter.expected = [{'member_group_id': 201}]
         self.groups.fetch_all()
@@ -489,6 +714,32 @@ class AccountImportCollectionTest(unittest.TestCase):
         self.assertIn(203, self.imports)
 
 
+    def test_wait_polls_until_every_import_finishes(self):
+        adapter = self.imports.account.adapter = ImportingAdapter()
+        adapter.imports = [2001, 2002]
+        finished = self.imports.wait([2001, 2002], interval=0)
+        self.assertEquals(sorted(finished.keys()), [2001, 2002])
+        self.assertTrue(all(x.is_finished() for x in finished.values()))
+        self.assertEquals(adapter.paths, ['/members/imports'] * 2)
+
+    def test_wait_keeps_collection_up_to_date(self):
+        self.imports.account.adapter = ImportingAdapter(finish_after=1)
+        self.imports.wait([2001])
+        self.assertTrue(self.imports[2001].is_finished())
+        self.assertEquals(self.imports.account.adapter.called, 1)
+
+    def test_wait_times_out(self):
+        self.imports.account.adapter = ImportingAdapter()
+        with self.assertRaises(ex.ImportTimeoutError):
+            self.imports.wait([2001], timeout=0)
+
+    def test_track_returns_a_tracker(self):
+        tracker = self.imports.track([2001, "2002"], interval=3)
+        self.assertIsInstance(tracker, ImportTracker)
+        self.assertEquals(tracker.pending, [2001, 2002])
+        self.assertEquals(tracker.interval, 3)
+
+
 class AccountMemberCollectionTest(unittest.TestCase):
     def setUp(self):
         Account.default_adapter = MockAdapter
@@ -497,6 +748,80 @@ class AccountMemberCollectionTest(unittest.TestCase):
             public_key="xxx",
             private_key="yyy").members
 
+    def test_bulk_import_chunks_members_by_count(self):
+        self.members.account.adapter = ImportingAdapter()
+        self.members.account.fields._dict = {
+            200: Field(self.members.account, {'shortcut_name': u"first_name"})
+        }
+        members = (
+            self.members.factory({
+                'email': u"test%s@example.com" % x,
+                'first_name': u"Emma"})
+            for x in range(25))
+        import_ids = self.members.bulk_import(
+            members, group_ids=[1024], chunk_size=10, workers=3)
+        posted = self.members.account.adapter.posted
+        self.assertEquals(import_ids, [2001, 2002, 2003])
+        self.assertEquals(
+            sorted(len(x['members']) for x in posted), [5, 10, 10])
+        self.assertTrue(all(x['group_ids'] == [1024] for x in posted))
+        self.assertEquals(
+            posted[0]['members'][0],
+            {'email': u"test0@example.com", 'fields': {'first_name': u"Emma"}})
+
+    def test_bulk_import_chunks_members_by_size(self):
+        self.members.account.adapter = ImportingAdapter()
+        members = [
+            self.members.factory({'email': u"test%s@example.com" % x})
+            for x in range(4)]
+        self.members.bulk_import(members, chunk_bytes=80, workers=1)
+        self.assertEquals(
+            [len(x['members']) for x in self.members.account.adapter.posted],
+            [2, 2])
+
+    def test_bulk_import_of_nothing_posts_nothing(self):
+        self.members.account.adapter = ImportingAdapter()
+        self.assertEquals(self.members.bulk_import([], wait=True), [])
+        self.assertEquals(self.members.account.adapter.posted, [])
+
+    def test_bulk_import_reports_what_was_and_was_not_accepted(self):
+        adapter = self.members.account.adapter = ImportingAdapter()
+        post = adapter.post
+
+        def failing(path, data=None):
+            if data['members'][0]['email'] == u"test2@example.com":
+                raise ex.ApiRequestFailed()
+            if data['members'][0]['email'] == u"test4@example.com":
+                return None
+            return post(path, data)
+        adapter.post = failing
+
+        members = [
+            self.members.factory({'email': u"test%s@example.com" % x})
+            for x in range(8)]
+        with self.assertRaises(ex.ImportSubmitError) as raised:
+            self.members.bulk_import(
+                members, chunk_size=2, workers=1, wait=True)
+        self.assertEquals(raised.exception.import_ids, [2001, 2002])
+        failures = raised.exception.failures
+        self.assertEquals(
+            [[x['email'] for x in chunk] for chunk, _ in failures],
+            [[u"test2@example.com", u"test3@example.com"],
+             [u"test4@example.com", u"test5@example.com"]])
+        self.assertIsInstance(failures[0][1], ex.ApiRequestFailed)
+        self.assertIsInstance(failures[1][1], ex.NoImportIdError)
+        self.assertEquals(adapter.reads, {})
+
+    def test_bulk_import_can_wait_for_imports(self):
+        self.members.account.adapter = ImportingAdapter(finish_after=1)
+        members = [
+            self.members.factory({'email': u"test%s@example.com" % x})
+            for x in range(3)]
+        import_ids = self.members.bulk_import(members, chunk_size=2, wait=True)
+        imports = self.members.account.imports
+        self.assertEquals(import_ids, [2001, 2002])
+        self.assertTrue(all(imports[x].is_finished() for x in import_ids))
+
     def test_fetch_all_returns_a_dictionary(self):
         # Setup
         MockAdapter.expected = [{'member_id': 201}]
@@ -517,6 +842,18 @@ class AccountMemberCollectionTest(unittest.TestCase):
             self.members.account.adapter.call,
             ('GET', '/members', {"deleted":True}))
 
+    def test_fetch_all_can_fetch_pages_concurrently(self):
+        # Setup
+        MockAdapter.expected = [{'member_id': 201},{'member_id': 204}]
+
+        self.assertEquals(
+            self.members.fetch_all(deleted=True, workers=4).keys(),
+            [201, 204])
+        self.assertEquals(self.members.account.adapter.called, 2)
+        self.assertEquals(
+            self.members.account.adapter.call,
+            ('GET', '/members', {"deleted":True}))
+
     def test_fetch_all_populates_collection(self):
         # Setup
         MockAdapter.expected = [{'member_id': 201}]
@@ -535,6 +872,63 @@ class AccountMemberCollectionTest(unittest.TestCase):
 
         self.assertEquals(self.members.account.adapter.called, 1)
 
+    def test_fetch_all_keys_results_by_deleted(self):
+        MockAdapter.expected = [{'member_id': 201}]
+        self.members.fetch_all()
+        MockAdapter.expected = [
+            {'member_id': 201},
+            {'member_id': 202, 'deleted_at': "@D:2011-01-02T11:14:32"}]
+        self.assertEquals(
+            sorted(self.members.fetch_all(deleted=True)), [201, 202])
+        self.assertEquals(self.members.fetch_all().keys(), [201])
+        self.assertEquals(self.members.account.adapter.called, 2)
+
+    def test_fetch_all_narrows_deleted_listing_locally(self):
+        MockAdapter.expected = [
+            {'member_id': 201, 'deleted_at': None},
+            {'member_id': 202, 'deleted_at': "@D:2011-01-02T11:14:32"}]
+        self.members.fetch_all(deleted=True)
+        self.assertEquals(self.members.fetch_all().keys(), [201])
+        self.assertEquals(self.members.account.adapter.called, 1)
+
+    def test_fetch_all_does_not_narrow_without_deleted_at(self):
+        MockAdapter.expected = [
+            {'member_id': 201},
+            {'member_id': 202, 'deleted_at': "@D:2011-01-02T11:14:32"}]
+        self.members.fetch_all(deleted=True)
+        MockAdapter.expected = [{'member_id': 201}]
+        self.assertEquals(self.members.fetch_all().keys(), [201])
+        self.assertEquals(self.members.account.adapter.called, 2)
+
+    def test_fetch_all_leaves_out_members_deleted_since(self):
+        MockAdapter.expected = [{'member_id': 201}, {'member_id': 202}]
+        self.members.fetch_all()
+        self.members.delete([201])
+        self.assertEquals(self.members.fetch_all().keys(), [202])
+        self.assertEquals(self.members.account.adapter.called, 2)
+
+    def test_fetch_all_forgets_least_recently_used_listings(self):
+        MockAdapter.expected = [{'member_id': 201, 'deleted_at': None}]
+        self.members.fetch_all(deleted=True)
+        self.members._result_sets.max_entries = 1
+        self.members.fetch_all()
+        self.members.fetch_all()
+        self.assertEquals(self.members.account.adapter.called, 1)
+        self.members.fetch_all(deleted=True)
+        self.assertEquals(self.members.account.adapter.called, 2)
+
+    def test_fetch_all_drops_members_only_forgotten_listings_had(self):
+        MockAdapter.expected = [
+            {'member_id': 201, 'deleted_at': None},
+            {'member_id': 202, 'deleted_at': "@D:2011-01-02T11:14:32"},
+            {'member_id': 203, 'deleted_at': "@D:2011-01-02T11:14:32"}]
+        self.members.fetch_all(deleted=True)
+        self.members._result_sets.max_entries = 1
+        self.members._dict[203]['first_name'] = u"Unsaved"
+        MockAdapter.expected = [{'member_id': 201, 'deleted_at': None}]
+        self.assertEquals(self.members.fetch_all().keys(), [201])
+        self.assertEquals(sorted(self.members._dict), [201, 203])
+
     def test_members_collection_object_can_be_accessed_like_a_dictionary(self):
         # Setup
         MockAdapter.expected = [{'member_id': 201}]
@@ -545,6 +939,20 @@ class AccountMemberCollectionTest(unittest.TestCase):
         self.assertEquals(1, len(self.members))
         self.assertIsInstance(self.members[201], Member)
 
+    def test_iter_all_streams_members(self):
+        # Setup
+        MockAdapter.expected = [{'member_id': 201},{'member_id': 204}]
+
+        members = self.members.iter_all(deleted=True)
+
+        self.assertEquals(self.members.account.adapter.called, 0)
+        self.assertEquals([x['member_id'] for x in members], [201, 204])
+        self.assertEquals(self.members.account.adapter.called, 1)
+        self.assertEquals(
+            self.members.account.adapter.call,
+            ('GET', '/members', {"deleted":True}))
+        self.assertEquals(0, len(self.members))
+
     def test_fetch_all_by_import_id_returns_a_dictionary(self):
         # Setup
         MockAdapter.expected = [{'member_id': 201}]
@@ -756,6 +1164,121 @@ class AccountMemberCollectionTest(unittest.TestCase):
 
         self.assertEquals(self.members.account.adapter.called, 1)
 
+    def test_find_one_by_email_ignores_case_and_whitespace(self):
+        MockAdapter.expected = {'member_id': 201, 'email': u"Test@Example.com"}
+        member = self.members.find_one_by_email("test@example.com")
+        self.assertIs(
+            self.members.find_one_by_email(" TEST@example.com"), member)
+        self.assertEquals(self.members.account.adapter.called, 1)
+
+    def test_find_one_by_email_uses_fetched_members(self):
+        MockAdapter.expected = [
+            {'member_id': 201, 'email': u"test@example.com"},
+            {'member_id': 202, 'email': u"other@example.com"}]
+        self.members.fetch_all()
+        member = self.members.find_one_by_email("other@example.com")
+        self.assertEquals(member['member_id'], 202)
+        self.assertEquals(self.members.account.adapter.called, 1)
+
+    def test_email_index_follows_email_changes(self):
+        self.members._dict = {
+            201: Member(
+                self.members.account,
+                {'member_id': 201, 'email': u"test@example.com"})}
+        self.members.find_one_by_email("test@example.com")
+        self.members[201]['email'] = u"new@example.com"
+        member = self.members.find_one_by_email("new@example.com")
+        self.assertEquals(member['member_id'], 201)
+        self.assertEquals(self.members.account.adapter.called, 0)
+
+    def test_email_index_forgets_deleted_members(self):
+        MockAdapter.expected = [
+            {'member_id': 201, 'email': u"test@example.com"},
+            {'member_id': 202, 'email': u"other@example.com"}]
+        self.members.fetch_all()
+        self.members.find_one_by_email("test@example.com")
+        self.members.delete([201])
+        MockAdapter.expected = None
+        self.assertIsNone(self.members.find_one_by_email("test@example.com"))
+        self.assertEquals(
+            self.members.account.adapter.call,
+            ('GET', '/members/email/test@example.com', {}))
+
+    def test_find_many_by_member_id_serves_cached_members(self):
+        self.members._dict = {
+            201: Member(self.members.account, {'member_id': 201}),
+            202: Member(self.members.account, {'member_id': 202})}
+        members = self.members.find_many_by_member_id([201, 202])
+        self.assertEquals(sorted(members.keys()), [201, 202])
+        self.assertEquals(self.members.account.adapter.called, 0)
+
+    def test_find_many_by_member_id_fetches_misses(self):
+        class LookupAdapter(MockAdapter):
+            def get(self, path, params=None, context=None):
+                super(LookupAdapter, self).get(path, params, context)
+                member_id = int(path.split('/')[-1])
+                if member_id < 300:
+                    return {'member_id': member_id}
+        self.members.account.adapter = LookupAdapter()
+        self.members._dict = {
+            201: Member(self.members.account, {'member_id': 201})}
+        members = self.members.find_many_by_member_id(
+            [201, 202, 203, 999], workers=3)
+        self.assertEquals(sorted(members.keys()), [201, 202, 203])
+        self.assertEquals(sorted(self.members._dict), [201, 202, 203])
+
+    def test_find_many_by_member_id_scans_for_a_large_share(self):
+        MockAdapter.expected = [
+            {'member_id': 201}, {'member_id': 202}, {'member_id': 203}]
+        members = self.members.find_many_by_member_id(
+            [201, 202, 999], workers=2)
+        self.assertEquals(sorted(members.keys()), [201, 202])
+        self.assertEquals(self.members.account.adapter.called, 2)
+        self.assertEquals(
+            self.members.account.adapter.call, ('GET', '/members', {}))
+
+    def test_find_many_by_member_id_looks_up_a_small_share(self):
+        class LookupAdapter(MockAdapter):
+            MAX_PAGE_SIZE = 2
+            paths = []
+
+            def get(self, path, params=None, context=None):
+                super(LookupAdapter, self).get(path, params, context)
+                self.paths.append(path)
+                if context is not None and context.count_only:
+                    return 5000
+                return {'member_id': int(path.split('/')[-1])}
+        self.members.account.adapter = LookupAdapter()
+        members = self.members.find_many_by_member_id(
+            range(200, 210), workers=2)
+        self.assertEquals(sorted(members.keys()), range(200, 210))
+        self.assertEquals(
+            sorted(LookupAdapter.paths),
+            ['/members'] + ['/members/%s' % x for x in range(200, 210)])
+
+    def test_find_many_by_email_keys_by_email_asked_for(self):
+        MockAdapter.expected = [
+            {'member_id': 201, 'email': u"test@example.com"},
+            {'member_id': 202, 'email': u"other@example.com"}]
+        members = self.members.find_many_by_email(
+            ["Test@example.com", "other@example.com", "null@example.com"],
+            workers=1)
+        self.assertEquals(
+            sorted(members.keys()), ["Test@example.com", "other@example.com"])
+        self.assertEquals(members["other@example.com"]['member_id'], 202)
+        self.assertEquals(
+            self.members.find_many_by_email(["test@example.com"]).keys(),
+            ["test@example.com"])
+        self.assertEquals(self.members.account.adapter.called, 2)
+
+    def test_find_many_by_email_fetches_misses(self):
+        MockAdapter.expected = {'member_id': 201, 'email': u"test@example.com"}
+        members = self.members.find_many_by_email(["test@example.com"])
+        self.assertEquals(members["test@example.com"]['member_id'], 201)
+        self.assertEquals(
+            self.members.account.adapter.call,
+            ('GET', '/members/email/test@example.com', {}))
+
     def test_dictionary_access_lazy_loads_by_email(self):
         # Setup
         MockAdapter.expected = {'member_id': 201, 'email': u"test@example.com"}
@@ -916,6 +1439,36 @@ class AccountMemberCollectionTest(unittest.TestCase):
             }
         ))
 
+    def test_save_skips_unchanged_members(self):
+        MockAdapter.expected = {'import_id': 1024}
+        self.members._dict = {
+            200: Member.load(self.members.account, {
+                'member_id': 200,
+                'email': u"test1@example.com"})
+        }
+        self.assertIsNone(self.members.save())
+        self.assertEquals(self.members.account.adapter.called, 0)
+
+    def test_save_leaves_changes_it_cannot_send_dirty(self):
+        MockAdapter.expected = {'import_id': 1024}
+        self.members.account.fields._dict = {
+            2000: {'shortcut_name': u"first_name"}}
+        member = Member.load(self.members.account, {
+            'member_id': 200,
+            'email': u"test1@example.com",
+            'member_status_id': MemberStatus.Active})
+        self.members._dict = {200: member}
+        member['member_status_id'] = MemberStatus.OptOut
+        self.assertIsNone(self.members.save())
+        self.assertEquals(self.members.account.adapter.called, 0)
+
+        member['email'] = u"new1@example.com"
+        self.members.save()
+        self.assertEquals(self.members.account.adapter.call[2], {
+            'members': [{'member_id': 200, 'email': u"new1@example.com"}]})
+        self.assertEquals(
+            member.dirty_keys(), frozenset(['member_status_id']))
+
     def test_can_add_members_in_bulk5(self):
         # Setup
         MockAdapter.expected = {'import_id': 1024}
@@ -1456,6 +2009,117 @@ class AccountMemberCollectionTest(unittest.TestCase):
         ))
 
 
+class SyncAdapter(MockAdapter):
+    """Serves the full audience, or its recent changes through a search"""
+    def __init__(self, *args, **kwargs):
+        super(SyncAdapter, self).__init__(*args, **kwargs)
+        self.audience = []
+        self.changes = []
+        self.calls = []
+        self.now = None
+
+    def server_time(self):
+        return self.now
+
+    def post(self, path, data=None):
+        self.calls.append(('POST', path, data))
+        return 900
+
+    def get(self, path, params=None, context=None):
+        self.calls.append(('GET', path, params))
+        if path == '/searches/900/members':
+            return self.changes
+        return self.audience
+
+    def delete(self, path, params=None):
+        self.calls.append(('DELETE', path, params))
+        return True
+
+
+class AccountMemberSyncTest(unittest.TestCase):
+    def setUp(self):
+        Account.default_adapter = SyncAdapter
+        self.members = Account(
+            account_id="100",
+            public_key="xxx",
+            private_key="yyy").members
+        self.adapter = self.members.account.adapter
+        self.adapter.audience = [
+            {'member_id': 200, 'email': u"a@example.com",
+             'last_modified_at': "@D:2012-05-01T09:00:00"},
+            {'member_id': 201, 'email': u"b@example.com",
+             'last_modified_at': "@D:2012-05-01T09:30:12"}]
+
+    def test_first_sync_fetches_every_member(self):
+        result = self.members.sync()
+        self.assertEquals(sorted(result['updated']), [200, 201])
+        self.assertEquals(self.adapter.calls[0][1], '/members')
+        self.assertEquals(
+            self.members.sync_mark, datetime(2012, 5, 1, 9, 30, 12))
+
+    def test_first_sync_does_not_answer_from_a_remembered_listing(self):
+        self.members.fetch_all()
+        self.adapter.calls = []
+        self.adapter.audience[0]['email'] = u"new@example.com"
+
+        self.members.sync()
+
+        self.assertEquals(self.adapter.calls[0][1], '/members')
+        self.assertEquals(self.members[200]['email'], u"new@example.com")
+
+    def test_later_syncs_search_for_changes_since_the_mark(self):
+        self.members.sync()
+        member = self.members[200]
+        self.adapter.calls = []
+        self.adapter.changes = [
+            {'member_id': 200, 'email': u"new@example.com",
+             'last_modified_at': "@D:2012-05-02T10:00:00"},
+            {'member_id': 202, 'email': u"c@example.com",
+             'last_modified_at': "@D:2012-05-02T09:00:00"}]
+
+        result = self.members.sync()
+
+        self.assertEquals(result, {'updated': [200, 202]})
+        self.assertEquals(
+            self.adapter.calls[0],
+            ('POST', '/searches', {
+                'name': u"sync 2012-05-01 09:30:12",
+                'criteria': (
+                    'last_modified_at', 'gt', "@D:2012-05-01T09:30:11")}))
+        self.assertEquals(
+            self.adapter.calls[-1], ('DELETE', '/searches/900', None))
+        self.assertEquals(sorted(self.members._dict), [200, 201, 202])
+        self.assertIs(self.members._dict[200], member)
+        self.assertEquals(member['email'], u"new@example.com")
+        self.assertIs(
+            self.members.find_one_by_email("new@example.com"), member)
+        self.assertEquals(
+            self.members.sync_mark, datetime(2012, 5, 2, 10, 0, 0))
+
+    def test_sync_marks_the_api_time_it_began(self):
+        self.adapter.now = datetime(2012, 5, 3, 8, 0, 0)
+        self.members.sync()
+        self.assertEquals(
+            self.members.sync_mark, datetime(2012, 5, 3, 8, 0, 0))
+
+    def test_sync_keeps_the_mark_when_nothing_changed(self):
+        mark = datetime(2012, 5, 1, 9, 30, 12)
+        self.members.sync(since=mark)
+        self.assertEquals(self.members.sync_mark, mark)
+
+    def test_sync_within_an_interval(self):
+        self.members.sync(in_last={"day": 1})
+        self.assertEquals(
+            self.adapter.calls[0][2]['criteria'],
+            ('last_modified_at', 'in last', {"day": 1}))
+
+    def test_sync_refuses_both_a_time_and_an_interval(self):
+        with self.assertRaises(ValueError):
+            self.members.sync(
+                since=datetime(2012, 5, 1, 9, 30, 12), in_last={"day": 1})
+        self.assertEquals(self.adapter.calls, [])
+
+
 class AccountMailingCollectionTest(unittest.TestCase):
     def setUp(self):
         Account.default_adapter = MockAdapter
@@ -1538,6 +2202,16 @@ class AccountMailingCollectionTest(unittest.TestCase):
             self.mailings.account.adapter.call,
             ('GET', '/mailings', {"with_plaintext":True}))
 
+    def test_iter_all_streams_mailings(self):
+        MockAdapter.expected = [{'mailing_id': 201}]
+        mailings = list(self.mailings.iter_all(include_archived=True))
+        self.assertIsInstance(mailings[0], Mailing)
+        self.assertEquals(self.mailings.account.adapter.called, 1)
+        self.assertEquals(
+            self.mailings.account.adapter.call,
+            ('GET', '/mailings', {"include_archived":True}))
+        self.assertEquals(0, len(self.mailings))
+
     def test_fetch_all_populates_collection(self):
         MockAdapter.expected = [{'mailing_id': 201}]
         self.assertEquals(0, len(self.mailings))
@@ -1550,6 +2224,37 @@ class AccountMailingCollectionTest(unittest.TestCase):
         self.mailings.fetch_all()
         self.assertEquals(self.mailings.account.adapter.called, 1)
 
+    def test_fetch_all_keys_results_by_parameters(self):
+        MockAdapter.expected = [{'mailing_id': 201}]
+        self.mailings.fetch_all()
+        MockAdapter.expected = [{'mailing_id': 202}]
+        archived = self.mailings.fetch_all(include_archived=True)
+        self.assertEquals(archived.keys(), [202])
+        self.assertEquals(self.mailings.fetch_all().keys(), [201])
+        self.assertEquals(self.mailings.account.adapter.called, 2)
+
+    def test_fetch_all_narrows_a_wider_listing_locally(self):
+        MockAdapter.expected = [
+            {'mailing_id': 201, 'mailing_type': "m", 'mailing_status': "c"},
+            {'mailing_id': 202, 'mailing_type': "t", 'mailing_status': "c"},
+            {'mailing_id': 203, 'mailing_type': "m", 'mailing_status': "p"}]
+        self.mailings.fetch_all()
+        self.assertEquals(
+            self.mailings.fetch_all(
+                mailing_types=[MailingType.Standard],
+                mailing_statuses=[MailingStatus.Complete]).keys(),
+            [201])
+        self.assertEquals(self.mailings.account.adapter.called, 1)
+
+    def test_fetch_all_does_not_narrow_across_other_parameters(self):
+        MockAdapter.expected = [
+            {'mailing_id': 201, 'mailing_type': "m", 'mailing_status': "c"}]
+        self.mailings.fetch_all()
+        self.mailings.fetch_all(mailing_types=[MailingType.Standard],
+                                with_html_body=True)
+        self.mailings.fetch_all(mailing_types=[MailingType.Trigger])
+        self.assertEquals(self.mailings.account.adapter.called, 3)
+
     def test_mailing_collection_object_can_be_accessed_like_a_dictionary(self):
         MockAdapter.expected = [{'mailing_id': 201}]
         self.mailings.fetch_all()
@@ -1708,6 +2413,16 @@ class AccountSearchCollectionTest(unittest.TestCase):
         self.searches.fetch_all()
         self.assertEquals(self.searches.account.adapter.called, 1)
 
+    def test_iter_all_streams_searches(self):
+        MockAdapter.expected = [{'search_id': 201}]
+        searches = list(self.searches.iter_all(deleted=True))
+        self.assertIsInstance(searches[0], Search)
+        self.assertEquals(self.searches.account.adapter.called, 1)
+        self.assertEquals(
+            self.searches.account.adapter.call,
+            ('GET', '/searches', {"deleted":True}))
+        self.assertEquals(0, len(self.searches))
+
     def test_search_collection_object_can_be_accessed_like_a_dictionary(self):
         MockAdapter.expected = [{'search_id': 201}]
         self.searches.fetch_all()
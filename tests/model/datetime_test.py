@@ -0,0 +1,65 @@
+from datetime import datetime
+import unittest
+from emma.model import (SERIALIZED_DATETIME_FORMAT,
+                        SERIALIZED_DATETIME_ALT_FORMAT, parse_datetime,
+                        parse_datetime_column)
+
+
+class ParseDatetimeTest(unittest.TestCase):
+    def assertSameAsStrptime(self, value, date_format):
+        try:
+            expected = datetime.strptime(value, date_format)
+        except (TypeError, ValueError) as error:
+            with self.assertRaises(type(error)) as raised:
+                parse_datetime(value, date_format)
+            self.assertEquals(str(raised.exception), str(error))
+        else:
+            self.assertEquals(parse_datetime(value, date_format), expected)
+
+    def test_parses_the_serialized_format(self):
+        self.assertEquals(
+            parse_datetime("@D:2013-06-01T12:30:05"),
+            datetime(2013, 6, 1, 12, 30, 5))
+        self.assertEquals(
+            parse_datetime(u"@D:2013-06-01T12:30:05"),
+            datetime(2013, 6, 1, 12, 30, 5))
+
+    def test_parses_the_alternate_format(self):
+        self.assertEquals(
+            parse_datetime("2013-06-01 12:30:05.25",
+                           SERIALIZED_DATETIME_ALT_FORMAT),
+            datetime(2013, 6, 1, 12, 30, 5, 250000))
+
+    def test_matches_strptime_on_good_and_bad_input(self):
+        for value in ["@D:2013-06-01T12:30:05", "@D:2013-6-1T1:2:3",
+                      "@D:2013-02-30T12:30:05", "@D:2013-13-01T12:30:05",
+                      "@D:2013-06-01T24:00:00", "@D:2013-06-01T12:30:60",
+                      "@D:2013-06-01T12:30:05\n", "@D:2013-06-01T12:30",
+                      "2013-06-01T12:30:05", u"@D:\u0662013-06-01T12:30:05",
+                      "", 20130601]:
+            self.assertSameAsStrptime(value, SERIALIZED_DATETIME_FORMAT)
+
+        for value in ["2013-06-01 12:30:05.123456", "2013-06-01 12:30:05.1",
+                      "2013-06-01 12:30:05", "2013-06-01 12:30:05.1234567",
+                      "2013-00-01 12:30:05.5", "2013-06-01T12:30:05.5"]:
+            self.assertSameAsStrptime(value, SERIALIZED_DATETIME_ALT_FORMAT)
+
+    def test_other_formats_use_strptime(self):
+        self.assertEquals(
+            parse_datetime("01/06/2013", "%d/%m/%Y"), datetime(2013, 6, 1))
+
+
+class ParseDatetimeColumnTest(unittest.TestCase):
+    def test_parses_every_value_in_order(self):
+        self.assertEquals(
+            parse_datetime_column(
+                ["@D:2013-06-01T12:30:05", None, "@D:2012-01-01T00:00:00"]),
+            [datetime(2013, 6, 1, 12, 30, 5), None, datetime(2012, 1, 1)])
+
+    def test_repeated_values_are_parsed_once(self):
+        column = parse_datetime_column(["@D:2013-06-01T12:30:05"] * 3)
+        self.assertIs(column[0], column[2])
+
+    def test_malformed_values_raise(self):
+        with self.assertRaises(ValueError):
+            parse_datetime_column(["@D:2013-06-01T12:30:05", "yesterday"])
@@ -99,6 +99,16 @@ class FieldTest(unittest.TestCase):
                 }
             ))
 
+    def test_saving_an_unchanged_field_sends_nothing(self):
+        fld = Field.load(self.field.account, dict(self.field._dict))
+        self.assertIsNone(fld.save())
+        self.assertEquals(fld.account.adapter.called, 0)
+
+    def test_a_field_made_with_values_is_dirty(self):
+        fld = Field(self.field.account, {'field_id': 201, 'column_order': 3})
+        self.assertEquals(fld.dirty_keys(),
+                          frozenset(['field_id', 'column_order']))
+
     def test_can_delete_a_field(self):
         fld = Field(self.field.account)
 
@@ -107,6 +107,24 @@ class GroupTest(unittest.TestCase):
             grp.account.adapter.call,
             ('PUT', '/groups/200', {'group_name':u"Renamed Group"}))
 
+    def test_a_group_from_the_factory_is_saved(self):
+        grp = self.group.account.groups.factory(
+            {'member_group_id': 5, 'group_name': u"Renamed"})
+        MockAdapter.expected = True
+        grp.save()
+        self.assertEquals(
+            grp.account.adapter.call,
+            ('PUT', '/groups/5', {'group_name': u"Renamed"}))
+        self.assertFalse(grp.is_dirty())
+
+    def test_a_loaded_group_starts_clean(self):
+        grp = Group.load(
+            self.group.account,
+            {'member_group_id': 5, 'group_name': u"Renamed"})
+        self.assertFalse(grp.is_dirty())
+        grp.save()
+        self.assertEquals(grp.account.adapter.called, 0)
+
 
 class GroupMemberCollectionTest(unittest.TestCase):
     def setUp(self):
@@ -146,6 +164,30 @@ class GroupMemberCollectionTest(unittest.TestCase):
         self.assertEquals(self.members[201]['email'], u"test02@example.org")
         self.assertEquals(self.members[202]['email'], u"test03@example.org")
 
+    def test_can_iterate_all_members(self):
+        del(self.members.group['member_group_id'])
+        with self.assertRaises(ex.NoGroupIdError):
+            self.members.iter_all()
+        self.assertEquals(self.members.group.account.adapter.called, 0)
+
+    def test_can_iterate_all_members2(self):
+        # Setup
+        MockAdapter.expected = [
+            {'member_id': 200, 'email': u"test01@example.org"},
+            {'member_id': 201, 'email': u"test02@example.org"},
+            {'member_id': 202, 'email': u"test03@example.org"}
+        ]
+
+        members = list(self.members.iter_all(deleted=True))
+
+        self.assertEquals(self.members.group.account.adapter.called, 1)
+        self.assertEquals(
+            self.members.group.account.adapter.call,
+            ('GET', '/groups/200/members', {'deleted': True}))
+        self.assertEquals([x['member_id'] for x in members], [200, 201, 202])
+        self.assertIsInstance(members[0], Member)
+        self.assertEquals(0, len(self.members))
+
     def test_can_fetch_all_members3(self):
         # Setup
         MockAdapter.expected = [
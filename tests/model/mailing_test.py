@@ -88,6 +88,14 @@ class MailingTest(unittest.TestCase):
         self.assertIsNone(result)
         self.assertEquals(self.mailing.account.adapter.called, 0)
 
+    def test_is_finished_once_complete_and_send_finished(self):
+        self.assertFalse(self.mailing.is_finished())
+        self.mailing['mailing_status'] = MailingStatus.Sending
+        self.mailing['send_finished'] = datetime.now()
+        self.assertFalse(self.mailing.is_finished())
+        self.mailing['mailing_status'] = MailingStatus.Complete
+        self.assertTrue(self.mailing.is_finished())
+
     def test_can_cancel_a_mailing(self):
         MockAdapter.expected = False
         with self.assertRaises(ex.MailingCancelError):
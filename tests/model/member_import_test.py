@@ -4,9 +4,10 @@ from emma import exceptions as ex
 from emma.enumerations import ImportStatus, ImportStyle
 from emma.model.account import Account
 from emma.model.member import Member
-from emma.model.member_import import MemberImport, ImportMemberCollection
+from emma.model.member_import import (MemberImport, ImportMemberCollection,
+                                      ImportTracker)
 from emma.model import SERIALIZED_DATETIME_FORMAT
-from tests.model import MockAdapter
+from tests.model import ImportingAdapter, MockAdapter
 
 
 class MemberImportTest(unittest.TestCase):
@@ -73,4 +74,107 @@ class ImportMemberCollectionTest(unittest.TestCase):
         self.assertIsInstance(self.members[202], Member)
         self.assertEquals(self.members[200]['email'], u"test01@example.org")
         self.assertEquals(self.members[201]['email'], u"test02@example.org")
-        self.assertEquals(self.members[202]['email'], u"test03@example.org")
\ No newline at end of file
+        self.assertEquals(self.members[202]['email'], u"test03@example.org")
+
+    def test_can_iterate_all_members(self):
+        with self.assertRaises(ex.NoImportIdError):
+            self.members.iter_all()
+        self.assertEquals(self.members.member_import.account.adapter.called, 0)
+
+    def test_can_iterate_all_members2(self):
+        # Setup
+        MockAdapter.expected = [
+            {'member_id': 200, 'email': u"test01@example.org"},
+            {'member_id': 201, 'email': u"test02@example.org"},
+            {'member_id': 202, 'email': u"test03@example.org"}
+        ]
+        self.members.member_import['import_id'] = 1024
+
+        members = list(self.members.iter_all())
+
+        self.assertEquals(self.members.member_import.account.adapter.called, 1)
+        self.assertEquals(
+            self.members.member_import.account.adapter.call,
+            ('GET', '/members/imports/1024/members', {}))
+        self.assertEquals([x['member_id'] for x in members], [200, 201, 202])
+        self.assertIsInstance(members[0], Member)
+        self.assertEquals(0, len(self.members))
+
+
+class MockImportTracker(ImportTracker):
+    def __init__(self, *args, **kwargs):
+        self.now = 0.0
+        self.slept = []
+        super(MockImportTracker, self).__init__(*args, **kwargs)
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class ImportTrackerTest(unittest.TestCase):
+    def setUp(self):
+        Account.default_adapter = ImportingAdapter
+        self.account = Account(
+            account_id="100", public_key="xxx", private_key="yyy")
+        self.adapter = self.account.adapter
+        self.adapter.imports = [2001, 2002, 2003]
+
+    def test_several_imports_are_checked_in_one_request(self):
+        tracker = MockImportTracker(self.account.imports, [2001, 2003])
+        self.assertEquals(tracker.poll(), [])
+        self.assertEquals(self.adapter.paths, ['/members/imports'])
+        self.assertEquals(
+            [x['import_id'] for x in tracker.poll()], [2001, 2003])
+        self.assertEquals(tracker.pending, [])
+
+    def test_single_import_is_checked_directly(self):
+        tracker = MockImportTracker(self.account.imports, [2002])
+        tracker.poll()
+        self.assertEquals(self.adapter.paths, ['/members/imports/2002'])
+
+    def test_imports_missing_from_listing_are_checked_directly(self):
+        tracker = MockImportTracker(self.account.imports, [2001, 2009])
+        tracker.poll()
+        self.assertEquals(
+            self.adapter.paths,
+            ['/members/imports', '/members/imports/2009'])
+
+    def test_interval_backs_off_until_an_import_finishes(self):
+        self.adapter.finish_after = 4
+        tracker = MockImportTracker(
+            self.account.imports, [2001, 2002], interval=1, max_interval=3)
+        tracker.wait()
+        self.assertEquals(tracker.slept, [2, 3, 3])
+        self.assertEquals(tracker.delay, 1)
+
+    def test_wait_times_out(self):
+        self.adapter.finish_after = 10
+        tracker = MockImportTracker(self.account.imports, [2001], interval=1)
+        with self.assertRaises(ex.ImportTimeoutError):
+            tracker.wait(timeout=5)
+        self.assertEquals(tracker.now, 5)
+        self.assertEquals(tracker.pending, [2001])
+
+    def test_wait_calls_back_as_imports_finish(self):
+        finished = []
+        tracker = MockImportTracker(self.account.imports, [2001, 2002])
+        result = tracker.wait(callback=lambda x: finished.append(x))
+        self.assertEquals(sorted(result.keys()), [2001, 2002])
+        self.assertEquals(
+            sorted(x['import_id'] for x in finished), [2001, 2002])
+
+    def test_wait_async_returns_pending_result(self):
+        tracker = MockImportTracker(self.account.imports, [2001, 2002])
+        pending = tracker.wait_async()
+        self.assertEquals(sorted(pending.get(5).keys()), [2001, 2002])
+
+    def test_iter_members_streams_each_finished_import(self):
+        tracker = MockImportTracker(self.account.imports, [2001, 2002])
+        members = list(tracker.iter_members())
+        self.assertTrue(all(isinstance(x, Member) for x in members))
+        self.assertEquals(
+            [x['member_id'] for x in members], [20010, 20011, 20020, 20021])
@@ -1,8 +1,9 @@
 from datetime import datetime
+import gc
 import unittest
 from emma import exceptions as ex
 from emma.enumerations import DeliveryType, MemberStatus, MemberChangeType
-from emma.model import SERIALIZED_DATETIME_FORMAT
+from emma.model import SERIALIZED_DATETIME_FORMAT, CompactRecord, Schema
 from emma.model.account import Account
 from emma.model.member import (Member, MemberGroupCollection,
                                  MemberMailingCollection)
@@ -37,6 +38,41 @@ class MemberTest(unittest.TestCase):
         self.assertIsInstance(self.member['member_since'], datetime)
         self.assertIsNone(self.member.get('deleted_at'))
 
+    def test_dates_are_parsed_on_first_access(self):
+        self.assertIsInstance(self.member._dict['member_since'], basestring)
+        member_since = self.member['member_since']
+        self.assertIsInstance(member_since, datetime)
+        self.assertIs(self.member._dict['member_since'], member_since)
+        self.assertIs(self.member['member_since'], member_since)
+
+    def test_dates_are_parsed_when_read_as_a_mapping(self):
+        self.assertIsInstance(dict(self.member.items())['last_modified_at'],
+                              datetime)
+
+    def test_unread_dates_are_never_parsed(self):
+        member = Member(self.member.account, {
+            'member_id': 1001,
+            'member_since': u"not a date"})
+        self.assertEquals(member['member_id'], 1001)
+        with self.assertRaises(ValueError):
+            member['member_since']
+
+    def test_extract_keeps_only_shortcut_fields(self):
+        self.member['first_name'] = u"Emma"
+        self.member['favorite_food'] = u"Pizza"
+        self.assertEquals(self.member.extract(), {
+            'member_id': 1000,
+            'email': u"test@example.com",
+            'fields': {'first_name': u"Emma"}})
+
+    def test_extract_can_be_given_the_shortcuts(self):
+        self.member['favorite_food'] = u"Pizza"
+        self.member.account.fields._dict = {}
+        self.assertEquals(
+            self.member.extract(frozenset([u"favorite_food"]))['fields'],
+            {'favorite_food': u"Pizza"})
+        self.assertEquals(self.member.account.adapter.called, 0)
+
     def test_can_represent_a_member(self):
         self.assertEquals(
             u"<Member" + repr(self.member._dict) + u">",
@@ -232,6 +268,55 @@ class MemberTest(unittest.TestCase):
                 }
             ))
 
+    def test_setting_the_same_value_is_not_a_change(self):
+        mbr = Member.load(
+            self.member.account,
+            {'member_id': 200, 'email': u"test@example.com",
+             'member_since': "@D:2011-01-02T11:14:32"})
+        mbr['email'] = u"test@example.com"
+        mbr['member_since'] = datetime(2011, 1, 2, 11, 14, 32)
+        self.assertFalse(mbr.is_dirty())
+        mbr['email'] = u"new@example.com"
+        self.assertEquals(mbr.dirty_keys(), frozenset(['email']))
+
+    def test_changes_which_cannot_be_sent_stay_dirty(self):
+        mbr = Member.load(
+            self.member.account,
+            {'member_id': 200, 'email': u"test@example.com",
+             'member_status_id': MemberStatus.Active})
+        mbr['member_status_id'] = MemberStatus.Forwarded
+        self.assertIsNone(mbr.save())
+        self.assertEquals(mbr.account.adapter.called, 0)
+        self.assertEquals(mbr.dirty_keys(), frozenset(['member_status_id']))
+
+        mbr['email'] = u"new@example.com"
+        MockAdapter.expected = True
+        mbr.save()
+        self.assertEquals(
+            mbr.account.adapter.call,
+            ('PUT', '/members/200', {'email': u"new@example.com"}))
+        self.assertEquals(mbr.dirty_keys(), frozenset(['member_status_id']))
+
+    def test_saving_an_unchanged_member_sends_nothing(self):
+        mbr = Member.load(
+            self.member.account,
+            {'member_id': 200, 'email':u"test@example.com"})
+        self.assertIsNone(mbr.save())
+        self.assertEquals(mbr.account.adapter.called, 0)
+
+    def test_refresh_keeps_unsaved_changes(self):
+        mbr = Member.load(
+            self.member.account,
+            {'member_id': 200, 'email':u"test@example.com"})
+        mbr['first_name'] = u"Emma"
+        mbr._refresh({
+            'member_id': 200,
+            'email': u"new@example.com",
+            'fields': {'first_name': u"Other"}})
+        self.assertEquals(mbr['email'], u"new@example.com")
+        self.assertEquals(mbr['first_name'], u"Emma")
+        self.assertEquals(mbr.dirty_keys(), frozenset(['first_name']))
+
     def test_can_save_a_member6(self):
         mbr = Member(
             self.member.account,
@@ -304,6 +389,84 @@ class MemberTest(unittest.TestCase):
         self.assertTrue(mbr.is_deleted())
 
 
+class MemberStorageTest(unittest.TestCase):
+    def setUp(self):
+        Account.default_adapter = MockAdapter
+        self.account = Account(
+            account_id="100", public_key="xxx", private_key="yyy")
+
+    def test_members_share_a_schema(self):
+        first = Member(self.account, {'member_id': 200, 'email': u"a@b.c"})
+        second = Member(self.account, {'email': u"d@e.f", 'member_id': 201})
+        self.assertIsInstance(first._dict, CompactRecord)
+        self.assertIs(first._dict._schema, second._dict._schema)
+        self.assertEquals(second['email'], u"d@e.f")
+
+    def test_accounts_keep_their_own_schema(self):
+        other = Account(account_id="200", public_key="xxx", private_key="yyy")
+        Member(self.account, {'member_id': 200, 'first_name': u"Emma"})
+        member = Member(other, {'member_id': 200, 'email': u"a@b.c"})
+        self.assertIs(member._dict._schema, other.members.schema)
+        self.assertNotIn('first_name', other.members.schema.index)
+        self.assertEquals(len(member._dict._values), 2)
+
+    def test_members_have_no_instance_dictionary(self):
+        member = Member(self.account, {'member_id': 200})
+        member.groups
+        self.assertFalse(
+            any(isinstance(x, dict) for x in gc.get_referents(member)))
+
+    def test_child_collections_are_created_on_first_use(self):
+        member = Member(self.account, {'member_id': 200})
+        self.assertIsNone(member._groups)
+        self.assertIsNone(member._mailings)
+        self.assertIsInstance(member.groups, MemberGroupCollection)
+        self.assertIs(member.groups, member.groups)
+        self.assertIsInstance(member.mailings, MemberMailingCollection)
+
+    def test_members_keep_custom_fields_flat(self):
+        member = Member(self.account, {
+            'member_id': 200,
+            'fields': {'first_name': u"Emma"}})
+        self.assertEquals(member['first_name'], u"Emma")
+        self.assertNotIn('fields', member)
+
+
+class CompactRecordTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = Schema()
+        self.record = CompactRecord(self.schema, {'a': 1, 'b': None})
+
+    def test_behaves_like_a_dictionary(self):
+        self.assertEquals(self.record, {'a': 1, 'b': None})
+        self.assertEquals(len(self.record), 2)
+        self.assertIn('b', self.record)
+        self.assertNotIn('c', self.record)
+        self.assertEquals(self.record.get('c', 3), 3)
+        self.assertEquals(dict(self.record), {'a': 1, 'b': None})
+        self.assertEquals(repr(self.record), repr({'a': 1, 'b': None}))
+
+    def test_can_add_and_remove_fields(self):
+        self.record['c'] = 3
+        del self.record['a']
+        self.assertEquals(self.record, {'b': None, 'c': 3})
+        with self.assertRaises(KeyError):
+            del self.record['a']
+        with self.assertRaises(KeyError):
+            self.record['a']
+
+    def test_fields_added_to_one_record_are_absent_from_others(self):
+        other = CompactRecord(self.schema, {'a': 2})
+        self.record['c'] = 3
+        self.assertEquals(other, {'a': 2})
+        self.assertEquals(self.schema.names, ['a', 'b', 'c'])
+
+    def test_empty_record(self):
+        record = CompactRecord(self.schema)
+        self.assertEquals(len(record), 0)
+        self.assertEquals(record.items(), [])
+
+
 class MemberGroupCollectionTest(unittest.TestCase):
     def setUp(self):
         Account.default_adapter = MockAdapter
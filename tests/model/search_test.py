@@ -131,3 +131,27 @@ class SearchMemberCollectionTest(unittest.TestCase):
         self.assertEquals(self.members[200]['email'], u"test01@example.org")
         self.assertEquals(self.members[201]['email'], u"test02@example.org")
         self.assertEquals(self.members[202]['email'], u"test03@example.org")
+
+    def test_can_iterate_all_members(self):
+        del(self.members.search['search_id'])
+        with self.assertRaises(ex.NoSearchIdError):
+            self.members.iter_all()
+        self.assertEquals(self.members.search.account.adapter.called, 0)
+
+    def test_can_iterate_all_members2(self):
+        # Setup
+        MockAdapter.expected = [
+            {'member_id': 200, 'email': u"test01@example.org"},
+            {'member_id': 201, 'email': u"test02@example.org"},
+            {'member_id': 202, 'email': u"test03@example.org"}
+        ]
+
+        members = list(self.members.iter_all())
+
+        self.assertEquals(self.members.search.account.adapter.called, 1)
+        self.assertEquals(
+            self.members.search.account.adapter.call,
+            ('GET', '/searches/1024/members', {}))
+        self.assertEquals([x['member_id'] for x in members], [200, 201, 202])
+        self.assertIsInstance(members[0], Member)
+        self.assertEquals(0, len(self.members))
@@ -1,7 +1,7 @@
 import unittest
 from emma.model.account import Account
 from emma.enumerations import Report, DeliveryType
-from emma import get_report
+from emma import get_report, iter_report
 from tests.model import MockAdapter
 
 
@@ -58,6 +58,15 @@ class ReportingTest(unittest.TestCase):
             self.account.adapter.call,
             ('GET', '/response/123/sends', {}))
 
+    def test_can_get_sent_list_for_mailing_concurrently(self):
+        MockAdapter.expected = [{'member_id': 200}]
+        report = get_report(self.account, Report.SentList, 123, workers=4)
+        self.assertEquals(report, [{'member_id': 200}])
+        self.assertEquals(self.account.adapter.called, 2)
+        self.assertEquals(
+            self.account.adapter.call,
+            ('GET', '/response/123/sends', {}))
+
     def test_can_get_in_progress_list_for_mailing(self):
         MockAdapter.expected = []
         report = get_report(self.account, Report.InProgressList, 123)
@@ -200,4 +209,35 @@ class ReportingTest(unittest.TestCase):
         self.assertEquals(self.account.adapter.called, 1)
         self.assertEquals(
             self.account.adapter.call,
-            ('GET', '/response/123/shares/overview', {}))
\ No newline at end of file
+            ('GET', '/response/123/shares/overview', {}))
+
+
+class IterReportTest(unittest.TestCase):
+    def setUp(self):
+        Account.default_adapter = MockAdapter
+        self.account = Account(
+            account_id="100",
+            public_key="xxx",
+            private_key="yyy")
+
+    def test_streams_a_list_report(self):
+        MockAdapter.expected = [{'member_id': 200}, {'member_id': 201}]
+        rows = iter_report(self.account, Report.OpenList, 123)
+        self.assertEquals(self.account.adapter.called, 0)
+        self.assertEquals(list(rows), MockAdapter.expected)
+        self.assertEquals(
+            self.account.adapter.call,
+            ('GET', '/response/123/opens', {}))
+
+    def test_resumes_from_an_offset(self):
+        MockAdapter.expected = [{'member_id': 200}]
+        list(iter_report(
+            self.account, Report.ClickList, 123, {'clicked': True}, 1500))
+        self.assertEquals(
+            self.account.adapter.call,
+            ('GET', '/response/123/clicks',
+             {'clicked': True, 'start': 1500, 'end': 2000}))
+
+    def test_rejects_summary_reports(self):
+        with self.assertRaises(ValueError):
+            iter_report(self.account, Report.MailingSummary, 123)
@@ -0,0 +1,94 @@
+import unittest
+from emma import exceptions as ex
+from emma.enumerations import Report
+from emma.model.account import Account
+from emma.reports import HarvestedReport, harvest_reports
+from tests.model import MockAdapter
+
+
+class ReportAdapter(MockAdapter):
+    """Serves ``rows`` rows for every list report, a page of two at a time"""
+    MAX_PAGE_SIZE = 2
+
+    def __init__(self, *args, **kwargs):
+        super(ReportAdapter, self).__init__(*args, **kwargs)
+        self.rows = 5
+        self.failing = None
+
+    def get(self, path, params=None, context=None):
+        super(ReportAdapter, self).get(path, params, context)
+        if path == self.failing:
+            raise ex.ApiRequestFailed()
+        mailing_id = int(path.split('/')[2])
+        if path.count('/') == 2:
+            return {'mailing_id': mailing_id}
+        if context.count_only:
+            return self.rows
+        return [{'mailing_id': mailing_id, 'row': x}
+                for x in range(context.start, min(context.end, self.rows))]
+
+
+class HarvestReportsTest(unittest.TestCase):
+    def setUp(self):
+        Account.default_adapter = ReportAdapter
+        self.account = Account(
+            account_id="100",
+            public_key="xxx",
+            private_key="yyy")
+
+    def test_harvests_every_report_of_every_mailing(self):
+        harvested = harvest_reports(
+            self.account, [123, 124],
+            [Report.MailingSummary, Report.OpenList], workers=4)
+
+        self.assertEquals(sorted(harvested.keys()), [123, 124])
+        summary = harvested[124][Report.MailingSummary]
+        self.assertIsInstance(summary, HarvestedReport)
+        self.assertEquals(summary.data, {'mailing_id': 124})
+        self.assertEquals(summary.requests, 1)
+
+        opens = harvested[123][Report.OpenList]
+        self.assertEquals([x['row'] for x in opens.data], range(5))
+        self.assertEquals(opens.requests, 4)
+        self.assertTrue(opens.seconds >= 0)
+        self.assertIsNone(opens.error)
+        self.assertEquals(self.account.adapter.called, 10)
+
+    def test_lists_which_grew_are_read_to_the_end(self):
+        self.account.adapter.rows = 4
+        self.account.adapter.get = self._growing(self.account.adapter.get)
+        harvested = harvest_reports(self.account, [123], [Report.SentList])
+        self.assertEquals(
+            [x['row'] for x in harvested[123][Report.SentList].data],
+            range(7))
+
+    def test_lists_which_end_on_a_short_page_are_not_probed_past(self):
+        self.account.adapter.rows = 3
+        harvested = harvest_reports(self.account, [123], [Report.SentList])
+        self.assertEquals(len(harvested[123][Report.SentList].data), 3)
+        self.assertEquals(self.account.adapter.called, 3)
+
+    def _growing(self, get):
+        def growing(path, params=None, context=None):
+            if context and context.count_only:
+                result = get(path, params, context)
+                self.account.adapter.rows = 7
+                return result
+            return get(path, params, context)
+        return growing
+
+    def test_failures_are_kept_with_their_report(self):
+        self.account.adapter.failing = '/response/124/clicks'
+        harvested = harvest_reports(
+            self.account, [123, 124], [Report.ClickList])
+        failed = harvested[124][Report.ClickList]
+        self.assertIsNone(failed.data)
+        self.assertIsInstance(failed.error, ex.ApiRequestFailed)
+        self.assertEquals(len(harvested[123][Report.ClickList].data), 5)
+
+    def test_programming_errors_are_raised(self):
+        def broken(path, params=None, context=None):
+            raise TypeError()
+        self.account.adapter.get = broken
+        with self.assertRaises(TypeError):
+            harvest_reports(self.account, [123], [Report.ClickList])
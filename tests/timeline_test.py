@@ -0,0 +1,88 @@
+from datetime import datetime
+import unittest
+from emma.enumerations import Report
+from emma.model.account import Account
+from emma.timeline import (EngagementTimeline, MemberEngagement,
+                           engagement_timeline)
+from tests.model import MockAdapter
+
+
+ROWS = {
+    'sends': [{'member_id': 200, 'email': "a@example.com"},
+              {'member_id': 201, 'email': "b@example.com"},
+              {'member_id': 202, 'email': "c@example.com"}],
+    'deliveries': [{'member_id': 200, 'timestamp': "@D:2013-06-01T12:00:00"},
+                   {'member_id': 201, 'timestamp': "@D:2013-06-01T12:00:05"}],
+    'opens': [{'member_id': 200, 'timestamp': "@D:2013-06-01T12:30:00"},
+              {'member_id': 200, 'timestamp': "@D:2013-06-01T12:10:00"},
+              {'member_id': 201, 'timestamp': "@D:2013-06-01T13:00:00"}],
+    'clicks': [{'member_id': 200, 'timestamp': "@D:2013-06-01T12:11:35"},
+               {'member_id': None, 'timestamp': "@D:2013-06-01T12:12:00"}],
+    'forwards': [],
+    'optouts': [{'member_id': 201, 'timestamp': "@D:2013-06-02T09:00:00"}],
+}
+
+
+class TimelineAdapter(MockAdapter):
+    """Serves the rows of each report, a page of two at a time"""
+    MAX_PAGE_SIZE = 2
+
+    def __init__(self, *args, **kwargs):
+        super(TimelineAdapter, self).__init__(*args, **kwargs)
+        self.paths = []
+
+    def get(self, path, params=None, context=None):
+        super(TimelineAdapter, self).get(path, params, context)
+        self.paths.append(path)
+        return ROWS[path.split('/')[-1]][context.start:context.end]
+
+
+class EngagementTimelineTest(unittest.TestCase):
+    def setUp(self):
+        Account.default_adapter = TimelineAdapter
+        self.account = Account(
+            account_id="100",
+            public_key="xxx",
+            private_key="yyy")
+        self.timeline = engagement_timeline(self.account, 123)
+
+    def test_reports_are_joined_by_member(self):
+        self.assertIsInstance(self.timeline, EngagementTimeline)
+        self.assertEquals(self.timeline.mailing_id, 123)
+        self.assertEquals(len(self.timeline), 3)
+        self.assertEquals(sorted(x.member_id for x in self.timeline),
+                          [200, 201, 202])
+        self.assertFalse(None in self.timeline)
+
+        member = self.timeline[200]
+        self.assertIsInstance(member, MemberEngagement)
+        self.assertEquals(member.email, "a@example.com")
+        self.assertTrue(member.reached('sent'))
+        self.assertIsNone(member.sent)
+        self.assertEquals(member.delivered, datetime(2013, 6, 1, 12))
+        self.assertEquals(member.opened, datetime(2013, 6, 1, 12, 10))
+        self.assertEquals((member.clicked - member.opened).seconds, 95)
+        self.assertEquals((member.opens, member.clicks), (2, 1))
+        self.assertFalse(member.reached('opted_out'))
+
+    def test_funnel_counts_members_by_stage(self):
+        self.assertEquals(
+            list(self.timeline.funnel().items()),
+            [('sent', 3), ('delivered', 2), ('opened', 2), ('clicked', 1),
+             ('forwarded', 0), ('opted_out', 1)])
+        self.assertEquals(
+            repr(self.timeline[201]),
+            "<MemberEngagement 201: sent, delivered, opened, opted_out>")
+
+    def test_reports_are_streamed_once(self):
+        self.assertEquals(
+            self.account.adapter.paths,
+            ["/response/123/sends"] * 2 + ["/response/123/deliveries"] * 2
+            + ["/response/123/opens"] * 2 + ["/response/123/clicks"] * 2
+            + ["/response/123/forwards", "/response/123/optouts"])
+
+    def test_reports_can_be_chosen(self):
+        timeline = engagement_timeline(
+            self.account, 123, [Report.OpenList, Report.ClickList])
+        self.assertEquals(sorted(timeline.members), [200, 201])
+        self.assertFalse(timeline[200].reached('sent'))
@@ -0,0 +1,180 @@
+import threading
+import time
+import unittest
+from emma import exceptions as ex
+from emma.enumerations import MailingStatus, Report
+from emma.model.account import Account
+from emma.warehouse import ReportWarehouse
+from tests.model import MockAdapter
+
+
+class WarehouseAdapter(MockAdapter):
+    """
+    Serves a mailing (finished once its id is in ``finished``), a summary
+    report and three rows for every list report, a page of two at a time
+    """
+    MAX_PAGE_SIZE = 2
+
+    def __init__(self, *args, **kwargs):
+        super(WarehouseAdapter, self).__init__(*args, **kwargs)
+        self.finished = set()
+        self.paths = []
+
+    def get(self, path, params=None, context=None):
+        super(WarehouseAdapter, self).get(path, params, context)
+        self.paths.append(path)
+        parts = path.strip('/').split('/')
+        mailing_id = int(parts[1])
+        if parts[0] == 'mailings':
+            done = mailing_id in self.finished
+            return {
+                'mailing_id': mailing_id,
+                'mailing_status': (MailingStatus.Complete if done
+                                   else MailingStatus.Sending),
+                'send_finished': "@D:2013-01-01T12:00:00" if done else None}
+        if len(parts) == 2:
+            return {'mailing_id': mailing_id, 'opened': len(self.paths)}
+        if context.count_only:
+            return 3
+        return [{'mailing_id': mailing_id, 'row': x}
+                for x in range(context.start, min(context.end, 3))]
+
+
+class ReportWarehouseTest(unittest.TestCase):
+    def setUp(self):
+        Account.default_adapter = WarehouseAdapter
+        self.account = Account(
+            account_id="100",
+            public_key="xxx",
+            private_key="yyy")
+        self.adapter = self.account.adapter
+        self.warehouse = ReportWarehouse()
+
+    def tearDown(self):
+        self.warehouse.close()
+
+    def test_finished_mailings_are_served_from_the_warehouse(self):
+        self.adapter.finished.add(123)
+        opens = self.warehouse.get_report(
+            self.account, Report.OpenList, 123)
+        self.assertEquals([x['row'] for x in opens], [0, 1, 2])
+        self.assertTrue(self.warehouse.is_final(123, Report.OpenList))
+        called = self.adapter.called
+
+        self.assertEquals(
+            self.warehouse.get_report(self.account, Report.OpenList, 123),
+            opens)
+        self.assertEquals(self.adapter.called, called)
+
+    def test_mailings_in_flight_are_fetched_again(self):
+        first = self.warehouse.get_report(
+            self.account, Report.MailingSummary, 123)
+        self.assertFalse(self.warehouse.is_final(123, Report.MailingSummary))
+        second = self.warehouse.get_report(
+            self.account, Report.MailingSummary, 123)
+        self.assertNotEquals(first, second)
+        self.assertEquals(
+            self.warehouse.load(123, Report.MailingSummary), second)
+
+    def test_reports_are_stored_by_params(self):
+        self.adapter.finished.add(123)
+        self.warehouse.get_report(
+            self.account, Report.MailingSummary, 123, {'x': 1})
+        self.assertTrue(
+            self.warehouse.is_final(123, Report.MailingSummary, {'x': 1}))
+        self.assertFalse(self.warehouse.is_final(123, Report.MailingSummary))
+        self.assertIsNone(self.warehouse.load(123, Report.MailingSummary))
+
+    def test_reports_not_found_are_not_stored(self):
+        self.adapter.finished.add(123)
+        get = self.adapter.get
+        self.adapter.get = lambda path, params=None, context=None: (
+            None if path == '/response/123' else get(path, params, context))
+
+        self.assertIsNone(self.warehouse.get_report(
+            self.account, Report.MailingSummary, 123))
+        self.warehouse.refresh(self.account, [123], [Report.MailingSummary])
+        self.assertFalse(self.warehouse.is_final(123, Report.MailingSummary))
+        self.assertIsNone(self.warehouse.load(123, Report.MailingSummary))
+
+    def test_refresh_harvests_only_what_is_not_final(self):
+        self.adapter.finished.add(123)
+        reports = [Report.MailingSummary, Report.OpenList]
+        self.assertEquals(
+            self.warehouse.refresh(self.account, [123, 124], reports), [])
+        self.assertTrue(self.warehouse.is_final(123, Report.OpenList))
+        self.assertFalse(self.warehouse.is_final(124, Report.OpenList))
+
+        del self.adapter.paths[:]
+        self.warehouse.refresh(self.account, [123, 124], reports)
+        self.assertFalse(any('/123' in x for x in self.adapter.paths))
+        self.assertTrue(any('/124' in x for x in self.adapter.paths))
+
+    def test_refresh_asks_after_the_mailings_side_by_side(self):
+        get = self.adapter.get
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        def slow(path, params=None, context=None):
+            if not path.startswith('/mailings/'):
+                return get(path, params, context)
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            return get(path, params, context)
+        self.adapter.get = slow
+
+        self.warehouse.refresh(
+            self.account, [123, 124, 125, 126], [Report.MailingSummary],
+            workers=2)
+        self.assertEquals(in_flight[1], 2)
+
+    def test_rows_are_queried_across_mailings(self):
+        self.warehouse.refresh(
+            self.account, [123, 124, 125], [Report.OpenList])
+        rows = list(self.warehouse.rows(Report.OpenList))
+        self.assertEquals(len(rows), 9)
+        self.assertEquals(rows[3], (124, {'mailing_id': 124, 'row': 0}))
+        self.assertEquals(
+            [x[0] for x in self.warehouse.rows(Report.OpenList, [125])],
+            [125, 125, 125])
+
+    def test_rows_are_read_in_batches(self):
+        self.warehouse.BATCH_SIZE = 2
+        self.warehouse.MAX_IDS = 2
+        self.warehouse.refresh(
+            self.account, [123, 124, 125], [Report.OpenList])
+        rows = self.warehouse.rows(Report.OpenList, [125, 123, 124, 123])
+        self.assertEquals(
+            [x[0] for x in rows], [123] * 3 + [124] * 3 + [125] * 3)
+        rows = list(self.warehouse.rows(Report.OpenList))
+        self.assertEquals(
+            [(x, y['row']) for x, y in rows],
+            [(x, y) for x in [123, 124, 125] for y in range(3)])
+
+    def test_rows_can_be_read_while_reports_are_stored(self):
+        self.warehouse.BATCH_SIZE = 2
+        self.warehouse.refresh(self.account, [123], [Report.OpenList])
+        rows = self.warehouse.rows(Report.OpenList)
+        self.assertEquals(next(rows)[1]['row'], 0)
+        self.warehouse.store(123, Report.OpenList, [{'row': 5}] * 4, True)
+        self.assertEquals([x[1]['row'] for x in rows], [1, 5, 5])
+
+    def test_failed_reports_are_returned_and_not_stored(self):
+        get = self.adapter.get
+
+        def failing(path, params=None, context=None):
+            if path.endswith('/124/opens'):
+                raise ex.ApiRequestFailed()
+            return get(path, params, context)
+        self.adapter.get = failing
+
+        failed = self.warehouse.refresh(
+            self.account, [123, 124], [Report.OpenList])
+        self.assertEquals([(x.mailing_id, x.report) for x in failed],
+                          [(124, Report.OpenList)])
+        self.assertIsNone(self.warehouse.load(124, Report.OpenList))
+        self.assertEquals(len(self.warehouse.load(123, Report.OpenList)), 3)